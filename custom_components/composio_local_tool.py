@@ -1,4 +1,9 @@
 # Standard library imports
+import hashlib
+import sys
+import threading
+import time
+import types
 from collections.abc import Sequence
 from typing import Any
 
@@ -11,9 +16,54 @@ from loguru import logger
 
 # Local imports
 from langflow.base.langchain_utilities.model import LCToolComponent
-from langflow.inputs import DropdownInput, LinkInput, MessageTextInput, MultiselectInput, SecretStrInput, StrInput
+from langflow.inputs import DropdownInput, IntInput, LinkInput, MessageTextInput, MultiselectInput, SecretStrInput, StrInput
 from langflow.io import Output
 
+# Langflow re-executes this file on every flow build, so state that must outlive
+# a single build is kept in a module registered in sys.modules.
+_CACHE = sys.modules.setdefault("_composio_local_tool_cache", types.ModuleType("_composio_local_tool_cache"))
+_CACHE.__dict__.setdefault("lock", threading.Lock())
+_CACHE.__dict__.setdefault("entries", {})  # key -> (expires_at, toolset, tools)
+_CACHE.__dict__.setdefault("build_locks", {})  # key -> lock, only while a build is running
+
+
+def _cache_key(api_key: str, actions: Sequence[str]) -> tuple[str, tuple[str, ...]]:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16], tuple(sorted(actions))
+
+
+def _cached_tools(api_key: str, actions: Sequence[str], ttl: int) -> tuple[list[Tool], bool]:
+    """Return tools for `actions`, building the toolset at most once per TTL.
+
+    Concurrent flow executions asking for the same key wait for a single build
+    instead of each creating a toolset and fetching schemas.
+    """
+    key = _cache_key(api_key, actions)
+    now = time.monotonic()
+    with _CACHE.lock:
+        for stale in [k for k, (expires_at, _, _) in _CACHE.entries.items() if expires_at <= now]:
+            del _CACHE.entries[stale]
+        entry = _CACHE.entries.get(key)
+        if entry is not None:
+            return list(entry[2]), True
+        build_lock = _CACHE.build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _CACHE.lock:
+            entry = _CACHE.entries.get(key)
+        if entry is not None:
+            return list(entry[2]), True
+        try:
+            toolset = ComposioToolSet(api_key=api_key)
+            tools = toolset.get_tools(actions=list(actions))
+            with _CACHE.lock:
+                _CACHE.entries[key] = (time.monotonic() + ttl, toolset, tools)
+        finally:
+            # Waiters hold their own reference; later callers find the entry or start a new build
+            with _CACHE.lock:
+                if _CACHE.build_locks.get(key) is build_lock:
+                    del _CACHE.build_locks[key]
+        return list(tools), False
+
 
 class ComposioAPIComponent(LCToolComponent):
     display_name: str = "Composio Local Git and File Tools"
@@ -30,15 +80,22 @@ class ComposioAPIComponent(LCToolComponent):
             info="Refer to https://docs.composio.dev/faq/api_key/api_key",
             real_time_refresh=True,
         ),
-        DropdownInput(
+        MultiselectInput(
             name="tool_actions",
             display_name="Tool Names",
             options=['FILETOOL_GIT_CLONE','FILETOOL_GIT_REPO_TREE','FILETOOL_GIT_CUSTOM','FILETOOL_LIST_FILES','FILETOOL_CREATE_FILE','FILETOOL_EDIT_FILE'],
-            value="",
-            info="The tool name to use. Please refresh after selecting app name",
+            value=[],
+            info="The tools to use. All selected tools are built from one toolset, so a single node can serve an agent.",
             refresh_button=True,
             required=True,
-        )
+        ),
+        IntInput(
+            name="cache_ttl",
+            display_name="Cache TTL (seconds)",
+            value=900,
+            info="How long the toolset and tool schemas are reused across flow runs. Set to 0 to disable caching.",
+            advanced=True,
+        ),
     ]
 
     outputs = [
@@ -46,11 +103,24 @@ class ComposioAPIComponent(LCToolComponent):
     ]
 
     def build_tool(self) -> Sequence[Tool]:
-        """Build Composio tools based on selected actions.
+        """Build Composio tools for all selected actions with one toolset and one schema request.
 
         Returns:
             Sequence[Tool]: List of configured Composio tools.
         """
-        composio_toolset = ComposioToolSet(api_key=self.api_key)
-        return composio_toolset.get_tools(actions=[self.tool_actions])
+        start = time.perf_counter()
+        # Flows saved with the single-select input store a plain string
+        selected = [self.tool_actions] if isinstance(self.tool_actions, str) else self.tool_actions
+        actions = list(dict.fromkeys(action for action in selected if action))
+        if not actions:
+            raise ValueError("Select at least one tool")
+        if self.cache_ttl and self.cache_ttl > 0:
+            tools, hit = _cached_tools(self.api_key, actions, self.cache_ttl)
+        else:
+            composio_toolset = ComposioToolSet(api_key=self.api_key)
+            tools, hit = composio_toolset.get_tools(actions=actions), False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Composio tools {actions} built in {elapsed_ms:.1f}ms (cache {'hit' if hit else 'miss'})")
+        self.status = f"Built {len(tools)} tool(s) in {elapsed_ms:.1f}ms (cache {'hit' if hit else 'miss'})"
+        return tools
 
@@ -1,104 +1,198 @@
 # Standard library imports
+import hashlib
+import sys
+import threading
+import time
+import types
+import typing as t
 from collections.abc import Sequence
-from typing import Any
 
 # Third-party imports
-from composio.client.collections import AppAuthScheme
-from composio.client.exceptions import NoItemsFound
 from composio_langchain import Action, App, ComposioToolSet, WorkspaceType
 from langchain_core.tools import Tool
 from loguru import logger
 
-# from langflow.field_typing import Data
+# Local imports
 from langflow.custom import Component
-from langflow.io import MessageTextInput, Output
-from langflow.schema import Data
+from langflow.io import BoolInput, DropdownInput, MessageTextInput, Output, SecretStrInput
 
+# Langflow re-executes this file on every flow build, so the shared workspace,
+# toolset and tool schemas are kept in a module registered in sys.modules.
+_SHARED = sys.modules.setdefault("_swe_toolset", types.ModuleType("_swe_toolset"))
+_SHARED.__dict__.setdefault("lock", threading.Lock())
+_SHARED.__dict__.setdefault("toolsets", {})  # key -> ComposioToolSet
+_SHARED.__dict__.setdefault("tools", {})  # (key, group) -> tools
+_SHARED.__dict__.setdefault("build_locks", {})  # key -> lock, only while a build is running
 
-class CustomComponent(Component):
-    display_name = "Custom Component"
-    description = "Use as a template to create your own component."
-    documentation: str = "https://docs.langflow.org/components-custom-components"
-    icon = "code"
-    name = "CustomComponent"
+# Same tool groups as the SWE graph in examples/agent/agent.py
+TOOL_GROUPS = {
+    "code": [
+        Action.CODE_ANALYSIS_TOOL_GET_CLASS_INFO,
+        Action.CODE_ANALYSIS_TOOL_GET_METHOD_BODY,
+        Action.CODE_ANALYSIS_TOOL_GET_METHOD_SIGNATURE,
+    ],
+    "file": [
+        Action.FILETOOL_GIT_REPO_TREE,
+        Action.FILETOOL_LIST_FILES,
+        Action.FILETOOL_CHANGE_WORKING_DIRECTORY,
+        Action.FILETOOL_OPEN_FILE,
+        Action.FILETOOL_SCROLL,
+        Action.FILETOOL_EDIT_FILE,
+        Action.FILETOOL_CREATE_FILE,
+        Action.FILETOOL_FIND_FILE,
+        Action.FILETOOL_SEARCH_WORD,
+        Action.FILETOOL_WRITE,
+    ],
+}
 
-    inputs = [
-        MessageTextInput(
-            name="input_value",
-            display_name="Input Value",
-            info="This is a custom component Input",
-            value="Hello, World!",
-            tool_mode=True,
-        ),
-    ]
 
-    outputs = [
-        Output(display_name="Output", name="output", method="build_output"),
-        Output(name="code_tools", display_name="Code_Tools", method="code_tool"),
-        Output(name="file_tools", display_name="File_Tools", method="file_tool"),
-    ]
+def add_thought_to_request(request: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    request["thought"] = {
+        "type": "string",
+        "description": "Provide the thought of the agent in a small paragraph in concise way. This is a required field.",
+        "required": True,
+    }
+    return request
+
+
+def pop_thought_from_request(request: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    request.pop("thought", None)
+    return request
 
-    def build_output(self) -> Data:
-        data = Data(value=self.input_value)
-        self.status = data
-        return data
-    
-    
-    composio_toolset = ComposioToolSet(
-        workspace_config=WorkspaceType.Docker(),
+
+def _toolset_key(api_key: str, repo_name: str, workspace_id: str, workspace_type: str, thought: bool) -> tuple:
+    return (hashlib.sha256(api_key.encode()).hexdigest()[:16], repo_name, workspace_id, workspace_type, thought)
+
+
+def _create_toolset(api_key: str, repo_name: str, workspace_id: str, workspace_type: str, thought: bool) -> ComposioToolSet:
+    apps = (App.FILETOOL, App.CODE_ANALYSIS_TOOL, App.SHELLTOOL)
+    processors = (
+        {
+            "pre": {app: pop_thought_from_request for app in apps},
+            "schema": {app: add_thought_to_request for app in apps},
+        }
+        if thought
+        else {}
+    )
+    toolset = ComposioToolSet(
+        api_key=api_key or None,
+        workspace_config=WorkspaceType.Docker() if workspace_type == "Docker" else WorkspaceType.Host(),
         metadata={
             App.CODE_ANALYSIS_TOOL: {
                 "dir_to_index_path": f"/home/user/{repo_name}",
             }
         },
-        processors={
-            "pre": {
-                App.FILETOOL: pop_thought_from_request,
-                App.CODE_ANALYSIS_TOOL: pop_thought_from_request,
-                App.SHELLTOOL: pop_thought_from_request,
-            },
-            "schema": {
-                App.FILETOOL: add_thought_to_request,
-                App.CODE_ANALYSIS_TOOL: add_thought_to_request,
-                App.SHELLTOOL: add_thought_to_request,
-            },
-        },
+        processors=processors,
     )
-    composio_toolset.set_workspace_id(workspace_id)
-
-    swe_tools = [
-        *composio_toolset.get_actions(
-            actions=[
-                # Action.FILETOOL_OPEN_FILE,
-                Action.FILETOOL_GIT_REPO_TREE,
-                Action.FILETOOL_GIT_PATCH,
-            ]
+    if workspace_id:
+        toolset.set_workspace_id(workspace_id)
+    return toolset
+
+
+def shared_tools(
+    group: str, api_key: str, repo_name: str, workspace_id: str, workspace_type: str, thought: bool
+) -> tuple[list[Tool], bool]:
+    """Return the tools of `group`, creating the toolset and schemas once per process.
+
+    The toolset is only created when a tool group is first requested, and its
+    workspace is started by Composio on the first tool call, then reused by
+    every later flow run with the same settings.
+    """
+    key = _toolset_key(api_key, repo_name, workspace_id, workspace_type, thought)
+    with _SHARED.lock:
+        tools = _SHARED.tools.get((key, group))
+        if tools is not None:
+            return list(tools), True
+        build_lock = _SHARED.build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _SHARED.lock:
+            tools = _SHARED.tools.get((key, group))
+            toolset = _SHARED.toolsets.get(key)
+        if tools is not None:
+            return list(tools), True
+        try:
+            if toolset is None:
+                toolset = _create_toolset(api_key, repo_name, workspace_id, workspace_type, thought)
+            tools = toolset.get_actions(actions=TOOL_GROUPS[group])
+            with _SHARED.lock:
+                _SHARED.toolsets[key] = toolset
+                _SHARED.tools[(key, group)] = tools
+        finally:
+            # Waiters hold their own reference; later callers find the tools or start a new build
+            with _SHARED.lock:
+                if _SHARED.build_locks.get(key) is build_lock:
+                    del _SHARED.build_locks[key]
+        return list(tools), False
+
+
+class SWEToolsetComponent(Component):
+    display_name = "SWE Toolset"
+    description = "File and code analysis tools of the SWE agent, backed by one shared Composio workspace."
+    documentation: str = "https://docs.composio.dev"
+    icon = "code"
+    name = "SWEToolset"
+
+    inputs = [
+        SecretStrInput(
+            name="api_key",
+            display_name="Composio API Key",
+            info="Refer to https://docs.composio.dev/faq/api_key/api_key; leave empty to use COMPOSIO_API_KEY",
+            required=False,
         ),
-    ]
-    # Separate tools into two groups
-    code_analysis_tools = [
-        *composio_toolset.get_actions(
-            actions=[
-                Action.CODE_ANALYSIS_TOOL_GET_CLASS_INFO,
-                Action.CODE_ANALYSIS_TOOL_GET_METHOD_BODY,
-                Action.CODE_ANALYSIS_TOOL_GET_METHOD_SIGNATURE,
-                # Action.CODE_ANALYSIS_TOOL_GET_RELEVANT_CODE
-            ]
+        MessageTextInput(
+            name="repo_name",
+            display_name="Repository Name",
+            info="Directory under /home/user in the workspace that the code analysis tools index",
+            value="",
+            required=True,
         ),
-    ]
-    file_tools = [
-        *composio_toolset.get_actions(
-            actions=[
-                Action.FILETOOL_GIT_REPO_TREE,
-                Action.FILETOOL_LIST_FILES,
-                Action.FILETOOL_CHANGE_WORKING_DIRECTORY,
-                Action.FILETOOL_OPEN_FILE,
-                Action.FILETOOL_SCROLL,
-                Action.FILETOOL_EDIT_FILE,
-                Action.FILETOOL_CREATE_FILE,
-                Action.FILETOOL_FIND_FILE,
-                Action.FILETOOL_SEARCH_WORD,
-                Action.FILETOOL_WRITE,
-            ]
+        MessageTextInput(
+            name="workspace_id",
+            display_name="Workspace ID",
+            info="Attach to an existing Composio workspace; leave empty to start one shared by all flow runs",
+            value="",
+            advanced=True,
         ),
-    ]
\ No newline at end of file
+        DropdownInput(
+            name="workspace_type",
+            display_name="Workspace Type",
+            options=["Docker", "Host"],
+            value="Docker",
+            info="Where the tools run when no workspace ID is given",
+            advanced=True,
+        ),
+        BoolInput(
+            name="add_thought",
+            display_name="Thought Field",
+            info="Add a required `thought` argument to every tool, as the SWE graph does",
+            value=True,
+            advanced=True,
+        ),
+    ]
+
+    outputs = [
+        Output(name="file_tools", display_name="File Tools", method="file_tool"),
+        Output(name="code_tools", display_name="Code Tools", method="code_tool"),
+    ]
+
+    def _tools(self, group: str) -> Sequence[Tool]:
+        start = time.perf_counter()
+        tools, hit = shared_tools(
+            group,
+            self.api_key or "",
+            self.repo_name,
+            self.workspace_id or "",
+            self.workspace_type,
+            bool(self.add_thought),
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"SWE {group} tools for {self.repo_name} ready in {elapsed_ms:.1f}ms ({'shared' if hit else 'new'})")
+        self.status = f"{len(tools)} {group} tool(s) in {elapsed_ms:.1f}ms ({'shared' if hit else 'new'})"
+        return tools
+
+    def file_tool(self) -> Sequence[Tool]:
+        return self._tools("file")
+
+    def code_tool(self) -> Sequence[Tool]:
+        return self._tools("code")
@@ -1,11 +1,211 @@
 # This is just a protype not intended for use was just validating the concept
 
+import hashlib
+import json
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
 from langflow.custom import Component
 from langflow.schema import Data
-from langflow.io import MessageTextInput, Output
+from langflow.schema.message import Message
+from langflow.io import BoolInput, IntInput, MessageTextInput, MultilineInput, Output
 from loguru import logger
 import hvac  # Hashicorp Vault Python client
 
+# Langflow re-executes this file on every flow build, so Vault sessions are kept
+# in a module registered in sys.modules to outlive a single build.
+_SESSIONS = sys.modules.setdefault("_vault_sessions", types.ModuleType("_vault_sessions"))
+_SESSIONS.__dict__.setdefault("lock", threading.Lock())
+_SESSIONS.__dict__.setdefault("sessions", {})  # (url, role_id, secret_id hash) -> VaultSession
+
+
+def split_secret_path(path: str) -> tuple[str, str]:
+    """Split `secret/data/my-secret` into the KV v2 mount point and the secret path."""
+    path = path.strip("/")
+    mount, sep, rest = path.partition("/data/")
+    if sep and mount and "/" not in mount:
+        return mount, rest
+    return "secret", path
+
+
+class VaultSession:
+    """An AppRole login shared by all flow runs, with a KV v2 secret cache.
+
+    The token is renewed in the background ahead of its TTL, or replaced by a
+    new login when it cannot be renewed. Secrets are cached per (path, version)
+    until their lease, or `cache_ttl` when Vault gives none, runs out.
+    """
+
+    def __init__(self, url: str, role_id: str, secret_id: str) -> None:
+        self.url = url
+        self.role_id = role_id
+        self.secret_id = secret_id
+        self.client = hvac.Client(url=url)
+        self.lock = threading.Lock()
+        self.expires_at = 0.0
+        self.renewable = False
+        self.logins = 0
+        self.refresher: threading.Thread | None = None
+        self.secrets: dict[tuple[str, int | None], tuple[dict, float]] = {}
+        self.secrets_lock = threading.Lock()
+
+    def _apply_auth(self, auth: dict) -> None:
+        self.expires_at = time.time() + float(auth.get("lease_duration") or 0)
+        self.renewable = bool(auth.get("renewable"))
+
+    def _login(self) -> None:
+        response = self.client.auth.approle.login(role_id=self.role_id, secret_id=self.secret_id)
+        self.logins += 1
+        self._apply_auth(response["auth"])
+
+    def ensure_token(self) -> None:
+        """Log in if there is no token or it has expired, and start the refresher."""
+        with self.lock:
+            if self.expires_at <= time.time():
+                self._login()
+            if self.refresher is None or not self.refresher.is_alive():
+                self.refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+                self.refresher.start()
+
+    def _refresh_loop(self) -> None:
+        issued_at = time.time()
+        while _SESSIONS.sessions.get(self.key) is self:
+            lifetime = self.expires_at - issued_at
+            refresh_at = self.expires_at - min(300.0, lifetime * 0.2)
+            time.sleep(max(1.0, refresh_at - time.time()))
+            if _SESSIONS.sessions.get(self.key) is not self:
+                return
+            try:
+                with self.lock:
+                    if self.renewable:
+                        try:
+                            self._apply_auth(self.client.auth.token.renew_self()["auth"])
+                        except hvac.exceptions.VaultError:
+                            # Past the token's max TTL or revoked: start a new login
+                            self._login()
+                    else:
+                        self._login()
+            except Exception as e:
+                logger.warning(f"Vault token refresh failed, retrying: {e}")
+                if time.time() >= self.expires_at:
+                    return
+                time.sleep(min(30.0, max(1.0, self.expires_at - time.time()) / 2))
+                continue
+            issued_at = time.time()
+
+    @property
+    def key(self) -> tuple:
+        return session_key(self.url, self.role_id, self.secret_id)
+
+    def read_secret(self, path: str, version: int | None = None, cache_ttl: int = 300) -> tuple[dict, bool]:
+        """Return a copy of the data of a KV v2 secret and whether it came from the cache."""
+        cache_key = (path.strip("/"), version)
+        now = time.time()
+        if cache_ttl > 0:
+            with self.secrets_lock:
+                cached = self.secrets.get(cache_key)
+                if cached is not None and cached[1] > now:
+                    return dict(cached[0]), True
+
+        self.ensure_token()
+        mount, secret_path = split_secret_path(path)
+        try:
+            response = self.client.secrets.kv.v2.read_secret_version(
+                path=secret_path, version=version, mount_point=mount, raise_on_deleted_version=True
+            )
+        except hvac.exceptions.Forbidden:
+            # The token was revoked behind our back; log in again once
+            with self.lock:
+                self._login()
+            response = self.client.secrets.kv.v2.read_secret_version(
+                path=secret_path, version=version, mount_point=mount, raise_on_deleted_version=True
+            )
+        data = response["data"]["data"]
+        ttl = response.get("lease_duration") or cache_ttl
+        if cache_ttl > 0 and ttl > 0:
+            with self.secrets_lock:
+                self.secrets[cache_key] = (dict(data), time.time() + ttl)
+        return data, False
+
+    def invalidate(self, path: str | None = None) -> None:
+        """Drop cached versions of `path`, or every cached secret."""
+        with self.secrets_lock:
+            if path is None:
+                self.secrets.clear()
+                return
+            path = path.strip("/")
+            for cache_key in [k for k in self.secrets if k[0] == path]:
+                del self.secrets[cache_key]
+
+
+def session_key(url: str, role_id: str, secret_id: str) -> tuple:
+    return (url.rstrip("/"), role_id, hashlib.sha256(secret_id.encode()).hexdigest()[:16])
+
+
+def get_session(url: str, role_id: str, secret_id: str) -> VaultSession:
+    """Return the process-wide session for this Vault and AppRole."""
+    key = session_key(url, role_id, secret_id)
+    with _SESSIONS.lock:
+        session = _SESSIONS.sessions.get(key)
+        if session is None:
+            session = _SESSIONS.sessions[key] = VaultSession(url, role_id, secret_id)
+    return session
+
+
+def invalidate_secrets(path: str | None = None) -> None:
+    """Drop cached secrets at `path` (or all of them) in every session, e.g. after a rotation."""
+    with _SESSIONS.lock:
+        sessions = list(_SESSIONS.sessions.values())
+    for session in sessions:
+        session.invalidate(path)
+
+
+def fetch_secrets(session: VaultSession, paths: list[str], cache_ttl: int = 300, workers: int = 8) -> dict[str, dict]:
+    """Read `paths` concurrently over one session.
+
+    Returns `{path: {"data", "cached", "error", "ms"}}`; a failing path does
+    not stop the others.
+    """
+    # Log in once up front so the workers share the token instead of racing to mint one
+    session.ensure_token()
+
+    def read(path: str) -> dict:
+        start = time.perf_counter()
+        try:
+            data, cached = session.read_secret(path, None, cache_ttl)
+            error = None
+        except hvac.exceptions.InvalidPath:
+            data, cached, error = None, False, "secret not found"
+        except Exception as e:
+            data, cached, error = None, False, str(e)
+        return {"data": data, "cached": cached, "error": error, "ms": (time.perf_counter() - start) * 1000}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths)))) as executor:
+        return dict(zip(paths, executor.map(read, paths)))
+
+
+def secret_names(paths: list[str]) -> dict[str, str]:
+    """Short name of each secret path, e.g. `secret/data/github` -> `github`.
+
+    Paths whose last segments are the same are named after their mount and
+    full path instead, e.g. `secret/data/team-a/github` -> `secret_team_a_github`.
+    """
+    short = {path: split_secret_path(path)[1].rsplit("/", 1)[-1].replace("-", "_") for path in paths}
+    counts: dict[str, int] = {}
+    for name in short.values():
+        counts[name] = counts.get(name, 0) + 1
+    names = {}
+    for path, name in short.items():
+        if counts[name] > 1:
+            mount, secret_path = split_secret_path(path)
+            name = f"{mount}/{secret_path}".replace("/", "_").replace("-", "_")
+        names[path] = name
+    return names
+
+
 class VaultSecretRetriever(Component):
     display_name = "Hashicorp Vault Secret Retriever"
     description = "Securely retrieves secrets from Hashicorp Vault"
@@ -42,37 +242,136 @@ class VaultSecretRetriever(Component):
             value="secret/data/my-secret",
             tool_mode=True,
         ),
+        MultilineInput(
+            name="secret_paths",
+            display_name="Secret Paths (bulk)",
+            info="One secret path per line, read concurrently for the Secrets output",
+            value="",
+        ),
+        MessageTextInput(
+            name="secret_key",
+            display_name="Secret Key",
+            info="Key to return from the secret; leave empty to return all keys as JSON",
+            value="",
+        ),
+        IntInput(
+            name="secret_version",
+            display_name="Secret Version",
+            info="KV v2 version to read, 0 for the latest",
+            value=0,
+            advanced=True,
+        ),
+        IntInput(
+            name="cache_ttl",
+            display_name="Cache TTL (seconds)",
+            info="How long secrets without a lease are reused across flow runs, 0 to disable",
+            value=300,
+            advanced=True,
+        ),
+        BoolInput(
+            name="force_refresh",
+            display_name="Force Refresh",
+            info="Drop the cached copy of this secret and read it from Vault",
+            value=False,
+            advanced=True,
+        ),
+        IntInput(
+            name="max_workers",
+            display_name="Max Concurrent Reads",
+            info="Secret paths read in parallel in bulk mode",
+            value=8,
+            advanced=True,
+        ),
     ]
 
     outputs = [
         Output(display_name="Secret Value", name="secret_value", method="get_secret"),
+        Output(display_name="Secrets", name="secrets", method="get_secrets"),
     ]
 
     def get_secret(self) -> Message:
         try:
-            # Initialize the Vault client
-            client = hvac.Client(url=self.vault_url)
-            
-            # Authenticate using AppRole
-            client.auth.approle.login(
-                role_id=self.vault_role_id,
-                secret_id=self.vault_secret_id
+            start = time.perf_counter()
+            session = get_session(self.vault_url, self.vault_role_id, self.vault_secret_id)
+            if self.force_refresh:
+                session.invalidate(self.secret_path)
+
+            # Retrieve the secret, reusing the session token and cached secrets
+            secret_value, cached = session.read_secret(
+                self.secret_path, self.secret_version or None, self.cache_ttl or 0
             )
-            
-            # Retrieve the secret
-            secret = client.secrets.kv.v2.read_secret_version(path=self.secret_path)
-            
-            # Extract the secret value
-            secret_value = secret['data']['data']
-            
+            if self.secret_key:
+                if self.secret_key not in secret_value:
+                    raise KeyError(f"{self.secret_key} is not in {self.secret_path}")
+                text = str(secret_value[self.secret_key])
+            else:
+                text = json.dumps(secret_value)
+
             # Log success
-            self.log("Successfully retrieved secret from Vault", "vault")
-            logger.info(f"Secret retrieved from Vault: {self.secret_path}")
-            
-            return Message(value=secret_value)
-            
+            elapsed = (time.perf_counter() - start) * 1000
+            self.log(f"Retrieved secret from Vault in {elapsed:.1f}ms ({'cached' if cached else 'read'})", "vault")
+            logger.info(f"Secret retrieved from Vault: {self.secret_path} ({'cached' if cached else 'read'}, {elapsed:.1f}ms)")
+
+            return Message(text=text)
+
         except Exception as e:
             error_message = f"Error retrieving secret from Vault: {str(e)}"
             self.log(error_message, "vault")
             logger.error(error_message)
-            return Message(error=error_message)
\ No newline at end of file
+            return Message(text=error_message, error=True)
+
+    def get_secrets(self) -> Data:
+        """All secrets of the bulk paths as one Data object.
+
+        Each secret is available under its short name (`github`) and each of
+        its keys flattened as `github_token`, so a Parse Data template such as
+        `{watsonx_api_key}` can feed an API key input. A name that is already
+        taken by another secret or key is not overwritten but listed in `errors`.
+        """
+        start = time.perf_counter()
+        paths = [line.strip() for line in (self.secret_paths or "").splitlines() if line.strip()]
+        if not paths:
+            paths = [self.secret_path]
+        paths = list(dict.fromkeys(paths))
+
+        try:
+            session = get_session(self.vault_url, self.vault_role_id, self.vault_secret_id)
+            if self.force_refresh:
+                for path in paths:
+                    session.invalidate(path)
+            results = fetch_secrets(session, paths, self.cache_ttl or 0, self.max_workers or 8)
+        except Exception as e:
+            error_message = f"Error retrieving secrets from Vault: {str(e)}"
+            self.log(error_message, "vault")
+            logger.error(error_message)
+            return Data(data={"errors": {path: str(e) for path in paths}})
+
+        data: dict = {}
+        errors = {}
+        names = secret_names(paths)
+        for path, result in results.items():
+            if result["error"] is not None:
+                errors[path] = result["error"]
+                continue
+            entries = {names[path]: result["data"]}
+            entries.update({f"{names[path]}_{key}": value for key, value in result["data"].items()})
+            taken = [name for name in entries if name in data or name == "errors"]
+            if taken:
+                errors[path] = f"{', '.join(taken)} already used by another secret"
+                continue
+            data.update(entries)
+        if errors:
+            data["errors"] = errors
+
+        elapsed = (time.perf_counter() - start) * 1000
+        cached = sum(1 for result in results.values() if result["cached"])
+        summary = (
+            f"Retrieved {len(results) - len(errors)}/{len(results)} secrets from Vault in {elapsed:.1f}ms "
+            f"({cached} cached, {session.logins} logins this process)"
+        )
+        self.log(summary, "vault")
+        logger.info(summary + "; " + ", ".join(f"{path} {result['ms']:.1f}ms" for path, result in results.items()))
+        for path, error in errors.items():
+            logger.error(f"Error retrieving secret from Vault: {path}: {error}")
+        self.status = summary
+        return Data(data=data)
@@ -1,13 +1,178 @@
+import hashlib
+import math
+import sys
+import threading
+import time
+import types
+from collections import deque
 from typing import Any, Dict
+from uuid import UUID
+
+import requests
 from langflow.custom import Component
-from langflow.io import MultilineInput, MessageTextInput, SecretStrInput, DropdownInput, Output, BoolInput, SliderInput
+from langflow.io import MultilineInput, MessageTextInput, SecretStrInput, DropdownInput, Output, BoolInput, SliderInput, IntInput
 from langflow.schema import Data
 from langflow.field_typing import LanguageModel
 from langflow.field_typing.range_spec import RangeSpec
 from langflow.schema.message import Message
 from ibm_watsonx_ai import APIClient, Credentials
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
 from langchain_ibm import ChatWatsonx
 from langflow.base.models.model import LCModelComponent
+from loguru import logger
+
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+
+# Langflow re-executes this file on every flow build, so the client pool is kept
+# in a module registered in sys.modules to outlive a single build.
+_POOL = sys.modules.setdefault("_watsonx_client_pool", types.ModuleType("_watsonx_client_pool"))
+_POOL.__dict__.setdefault("lock", threading.Lock())
+_POOL.__dict__.setdefault("clients", {})  # key -> {"client", "expires_at", "lock", "refresher"}
+_POOL.__dict__.setdefault("session", requests.Session())
+_POOL.__dict__.setdefault("stats", {})  # model_id -> deque of (latency_s, completion_tokens)
+
+STATS_WINDOW = 200
+
+# Chat models that support native tool calling on watsonx.ai
+TOOL_CALLING_MODELS = [
+    "ibm/granite-3-2-8b-instruct",
+    "ibm/granite-3-8b-instruct",
+    "meta-llama/llama-3-3-70b-instruct",
+    "meta-llama/llama-3-1-70b-instruct",
+    "meta-llama/llama-3-1-8b-instruct",
+    "meta-llama/llama-3-405b-instruct",
+    "mistralai/mistral-large",
+]
+CHAT_MODELS = TOOL_CALLING_MODELS + [
+    "ibm/granite-13b-instruct-v2",
+    "mistralai/mixtral-8x7b-instruct-v01",
+]
+
+
+class GenerationCancelled(Exception):
+    """Raised from a streaming callback to stop a generation that ran past its timeout."""
+
+
+class GenerationStats(BaseCallbackHandler):
+    """Enforce the request timeout while streaming and log completion length and latency per model."""
+
+    raise_error = True
+
+    def __init__(self, model_id: str, timeout: float) -> None:
+        self.model_id = model_id
+        self.timeout = timeout
+        self._runs: dict[UUID, list] = {}  # run_id -> [started_at, chunks]
+
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs[run_id] = [time.monotonic(), 0]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is None:
+            return
+        run[1] += 1
+        if time.monotonic() - run[0] > self.timeout:
+            raise GenerationCancelled(f"Generation with {self.model_id} exceeded {self.timeout:.0f}s")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        latency = time.monotonic() - run[0]
+        completion_tokens = run[1]
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("completion_tokens"):
+            completion_tokens = usage["completion_tokens"]
+        else:
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if metadata and metadata.get("output_tokens"):
+                        completion_tokens = metadata["output_tokens"]
+        with _POOL.lock:
+            samples = _POOL.stats.setdefault(self.model_id, deque(maxlen=STATS_WINDOW))
+            samples.append((latency, completion_tokens))
+            latencies = sorted(sample[0] for sample in samples)
+            average_tokens = sum(sample[1] for sample in samples) / len(samples)
+        p95 = latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]
+        logger.info(
+            f"watsonx {self.model_id}: {completion_tokens} tokens in {latency:.2f}s; "
+            f"avg completion {average_tokens:.0f} tokens, p95 latency {p95:.2f}s over {len(latencies)} calls"
+        )
+
+
+def _request_iam_token(iam_url: str, api_key: str) -> tuple[str, float]:
+    """Exchange an API key for an IAM access token, return it with its expiry time."""
+    response = _POOL.session.post(
+        iam_url,
+        data={"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": api_key},
+        headers={"Accept": "application/json"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    return payload["access_token"], time.time() + float(payload.get("expires_in", 3600))
+
+
+def _refresh_loop(key: tuple, entry: dict, iam_url: str, api_key: str) -> None:
+    """Refresh the token of a pooled client ahead of its expiry, until the entry is dropped."""
+    issued_at = time.time()
+    while _POOL.clients.get(key) is entry:
+        lifetime = entry["expires_at"] - issued_at
+        refresh_at = entry["expires_at"] - min(300.0, lifetime * 0.2)
+        time.sleep(max(1.0, refresh_at - time.time()))
+        if _POOL.clients.get(key) is not entry:
+            return
+        try:
+            token, expires_at = _request_iam_token(iam_url, api_key)
+        except Exception as e:
+            logger.warning(f"watsonx IAM token refresh failed, retrying: {e}")
+            if time.time() >= entry["expires_at"]:
+                with _POOL.lock:
+                    if _POOL.clients.get(key) is entry:
+                        del _POOL.clients[key]
+                return
+            time.sleep(min(30.0, max(1.0, entry["expires_at"] - time.time()) / 2))
+            continue
+        issued_at = time.time()
+        with entry["lock"]:
+            entry["client"].set_token(token)
+            entry["expires_at"] = expires_at
+
+
+def _pooled_client(endpoint: str, project_id: str, api_key: str, iam_url: str) -> tuple[APIClient, bool]:
+    """Return a shared, authenticated APIClient for (endpoint, project_id, api_key hash).
+
+    The first caller exchanges the API key and sets the default project; later
+    callers, including concurrent flow runs, reuse the client and its connections.
+    """
+    key = (endpoint, project_id, hashlib.sha256(api_key.encode()).hexdigest()[:16])
+    with _POOL.lock:
+        entry = _POOL.clients.get(key)
+        if entry is None:
+            entry = _POOL.clients[key] = {
+                "client": None,
+                "expires_at": 0.0,
+                "lock": threading.Lock(),
+                "refresher": None,
+            }
+    with entry["lock"]:
+        if entry["client"] is not None and entry["expires_at"] > time.time():
+            return entry["client"], True
+        token, expires_at = _request_iam_token(iam_url, api_key)
+        client = APIClient(Credentials(url=endpoint, token=token))
+        client.set.default_project(project_id)
+        entry.update(client=client, expires_at=expires_at)
+        if entry["refresher"] is None or not entry["refresher"].is_alive():
+            entry["refresher"] = threading.Thread(
+                target=_refresh_loop, args=(key, entry, iam_url, api_key), daemon=True
+            )
+            entry["refresher"].start()
+    return client, False
 
 
 class WatsonxComponent(LCModelComponent):
@@ -44,10 +209,7 @@ class WatsonxComponent(LCModelComponent):
         DropdownInput(
             name="model_id",
             display_name="Model ID",
-            options=[
-                "ibm/granite-3-2-8b-instruct",
-                "meta-llama/llama-3-3-70b-instruct"
-            ],
+            options=CHAT_MODELS,
             value="ibm/granite-3-2-8b-instruct",
             info="Select the watsonx.ai model to use",
             required=True,
@@ -60,16 +222,60 @@ class WatsonxComponent(LCModelComponent):
             info="Maximum tokens to generate",
             required=False,
         ),
+        DropdownInput(
+            name="decoding_method",
+            display_name="Decoding Method",
+            options=["greedy", "sample"],
+            value="greedy",
+            info="Greedy decoding is deterministic; sampling uses the temperature below",
+            advanced=True,
+        ),
+        SliderInput(
+            name="temperature",
+            display_name="Temperature",
+            value=0.7,
+            range_spec=RangeSpec(min=0, max=2, step=0.05),
+            info="Sampling temperature, only used with the sample decoding method",
+            advanced=True,
+        ),
+        MessageTextInput(
+            name="stop_sequences",
+            display_name="Stop Sequences",
+            info="Comma-separated sequences that end the generation",
+            value="",
+            advanced=True,
+        ),
+        IntInput(
+            name="timeout",
+            display_name="Request Timeout (seconds)",
+            info="Server-side time limit per request; streamed generations are also cancelled client-side after it",
+            value=60,
+            advanced=True,
+        ),
+        MessageTextInput(
+            name="iam_url",
+            display_name="IAM Token URL",
+            info="IAM token endpoint used to exchange the API key, e.g. a local mock for testing",
+            value=IAM_TOKEN_URL,
+            advanced=True,
+        ),
         BoolInput(
             name="enable_tools",
             display_name="Enable Tool Models",
-            info="Toggle to enable additional tool support",
+            info="Only offer models with native tool calling, for use with tool-calling Agents",
             value=False,
-            required=False
-        )
+            required=False,
+            real_time_refresh=True,
+        ),
+        *LCModelComponent._base_inputs,
     ]
 
     outputs = [
+        Output(
+            name="text_output",
+            display_name="Message",
+            method="text_response",
+        ),
         Output(
             name="language_model",
             display_name="Language Model",
@@ -78,20 +284,46 @@ class WatsonxComponent(LCModelComponent):
         ),
     ]
 
+    def update_build_config(self, build_config: dict, field_value: Any, field_name: str | None = None):
+        if field_name == "enable_tools":
+            options = TOOL_CALLING_MODELS if field_value else CHAT_MODELS
+            build_config["model_id"]["options"] = options
+            if build_config["model_id"].get("value") not in options:
+                build_config["model_id"]["value"] = options[0]
+        return build_config
+
     def build_model(self) -> LanguageModel:
             api_key = self.api_key
             endpoint = self.endpoint
             model_id = self.model_id
+            if self.enable_tools and model_id not in TOOL_CALLING_MODELS:
+                raise ValueError(
+                    f"{model_id} does not support native tool calling; pick one of "
+                    f"{', '.join(TOOL_CALLING_MODELS)} or turn off Enable Tool Models"
+                )
+            if model_id not in TOOL_CALLING_MODELS:
+                logger.warning(f"watsonx {model_id} has no native tool calling; tool-calling Agents may fail with it")
             tokens = int(self.max_tokens) if self.max_tokens else 1024
-            
+            if self.timeout is None or self.timeout <= 0:
+                raise ValueError(f"Request Timeout must be a positive number of seconds, got {self.timeout}")
+            timeout = self.timeout
+
             model_params = {
-                "time_limit": 180000,
+                "max_tokens": tokens,
+                "time_limit": timeout * 1000,
+                "temperature": self.temperature if self.decoding_method == "sample" else 0,
             }
+            stop = [sequence.strip() for sequence in (self.stop_sequences or "").split(",") if sequence.strip()]
+            if stop:
+                model_params["stop"] = stop
 
-            # Create credentials and API client, then set the default project
-            credentials = Credentials(api_key=api_key, url=endpoint)
-            client = APIClient(credentials)
-            client.set.default_project(self.project_id)
+            # Reuse a pooled, authenticated client with the default project already set
+            start = time.perf_counter()
+            client, reused = _pooled_client(endpoint, self.project_id, api_key, self.iam_url or IAM_TOKEN_URL)
+            logger.info(
+                f"watsonx client for {model_id} ready in {(time.perf_counter() - start) * 1000:.1f}ms "
+                f"({'pooled' if reused else 'new'})"
+            )
 
             output = ChatWatsonx(
                 model_id=model_id,
@@ -99,7 +331,8 @@ class WatsonxComponent(LCModelComponent):
                 params=model_params,
                 streaming=True,
                 project_id=self.project_id,
-                url=endpoint
+                url=endpoint,
+                callbacks=[GenerationStats(model_id, timeout)],
             )
 
             return output
@@ -1,18 +1,56 @@
 """LangGraph SWE Agent"""
 
 import operator
+import os
 import traceback
 import typing as t
+from pathlib import Path
 from typing import Annotated, Literal, Sequence, TypedDict
 
 import dotenv
 from langchain_aws import ChatBedrock
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode
-from prompts import CODE_ANALYZER_PROMPT, EDITING_AGENT_PROMPT, SOFTWARE_ENGINEER_PROMPT
+from batch_edit import get_batch_edit_tool
+from code_index import CodeIndex, get_code_index, get_code_index_tools
+from fanout_analysis import (
+    AnalysisTimer,
+    add_fanout_analysis,
+    add_findings,
+    content_text,
+    fan_out,
+    parse_questions,
+)
+from file_view import FileViewer, get_file_view_tools
+from local_workspace import WORKSPACE_BACKEND, LocalToolSet, get_workspace
+from model_router import get_router
+from prompt_cache import PROVIDERS, PromptCacheStats, cache_kwargs, system_message
+from prompts import (
+    CODE_ANALYZER_PROMPT,
+    BATCH_EDIT_PROMPT,
+    EDITING_AGENT_PROMPT,
+    EDITOR_PHASE_PROMPT,
+    FILE_VIEW_PROMPT,
+    PARALLEL_ANALYSIS_PROMPT,
+    QUESTION_ANALYZER_PROMPT,
+    SOFTWARE_ENGINEER_PROMPT,
+    TOOL_OUTPUT_PROMPT,
+)
+from tool_output import ToolOutputStore, get_tool_output_read_tool
+from tool_phases import (
+    EDIT_PHASE,
+    THOUGHT_DESCRIPTIONS,
+    ToolSchemaStats,
+    editor_phase,
+    get_start_editing_tool,
+    read_only,
+    thought_prompt,
+    with_thought,
+)
 
 from composio_langgraph import Action, App, ComposioToolSet, WorkspaceType
 
@@ -21,13 +59,21 @@ from composio_langgraph import Action, App, ComposioToolSet, WorkspaceType
 dotenv.load_dotenv()
 
 MODEL = "claude"
+# "parallel" lets the CodeAnalyzer fan out independent questions, see fanout_analysis.py
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "serial")
+# "phased" keeps the Editor on read-only tools until it starts editing, see tool_phases.py
+EDITOR_TOOLS = os.environ.get("EDITOR_TOOLS", "all")
+# "required", "optional" or "off": the thought argument of every tool call
+TOOL_THOUGHT = os.environ.get("TOOL_THOUGHT", "required")
 
 
 def add_thought_to_request(request: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    if TOOL_THOUGHT == "off":
+        return request
     request["thought"] = {
         "type": "string",
-        "description": "Provide the thought of the agent in a small paragraph in concise way. This is a required field.",
-        "required": True,
+        "description": THOUGHT_DESCRIPTIONS[TOOL_THOUGHT],
+        "required": TOOL_THOUGHT == "required",
     }
     return request
 
@@ -37,7 +83,40 @@ def pop_thought_from_request(request: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
     return request
 
 
-def get_agent_graph(repo_name: str, workspace_id: str):
+def _composio_toolset(repo_name: str, repo_path: t.Optional[str]) -> ComposioToolSet:
+    return ComposioToolSet(
+        workspace_config=WorkspaceType.Docker(),
+        metadata={
+            App.CODE_ANALYSIS_TOOL: {
+                "dir_to_index_path": repo_path or f"/home/user/{repo_name}",
+            }
+        },
+        processors={
+            "pre": {
+                App.FILETOOL: pop_thought_from_request,
+                App.CODE_ANALYSIS_TOOL: pop_thought_from_request,
+                App.SHELLTOOL: pop_thought_from_request,
+            },
+            "schema": {
+                App.FILETOOL: add_thought_to_request,
+                App.CODE_ANALYSIS_TOOL: add_thought_to_request,
+                App.SHELLTOOL: add_thought_to_request,
+            },
+        },
+    )
+
+
+def get_agent_graph(
+    repo_name: str,
+    workspace_id: str,
+    code_index: t.Optional[CodeIndex] = None,
+    repo_dir: t.Optional[str] = None,
+    prompt_stats: t.Optional[PromptCacheStats] = None,
+    output_store: t.Optional[ToolOutputStore] = None,
+    analysis_timer: t.Optional[AnalysisTimer] = None,
+    repo_path: t.Optional[str] = None,
+    tool_stats: t.Optional[ToolSchemaStats] = None,
+):
 
     import random
     import string
@@ -58,6 +137,9 @@ def get_agent_graph(repo_name: str, workspace_id: str):
             temperature=0.1,
             max_completion_tokens=8192,
         )
+    elif MODEL == "routed":
+        # Small or large watsonx model per agent and prompt size, see model_routes.json
+        client = None
     else:
         client = ChatBedrock(
             credentials_profile_name="default",
@@ -66,27 +148,19 @@ def get_agent_graph(repo_name: str, workspace_id: str):
             provider="meta",
         )
 
-    composio_toolset = ComposioToolSet(
-        workspace_config=WorkspaceType.Docker(),
-        metadata={
-            App.CODE_ANALYSIS_TOOL: {
-                "dir_to_index_path": f"/home/user/{repo_name}",
-            }
-        },
-        processors={
-            "pre": {
-                App.FILETOOL: pop_thought_from_request,
-                App.CODE_ANALYSIS_TOOL: pop_thought_from_request,
-                App.SHELLTOOL: pop_thought_from_request,
-            },
-            "schema": {
-                App.FILETOOL: add_thought_to_request,
-                App.CODE_ANALYSIS_TOOL: add_thought_to_request,
-                App.SHELLTOOL: add_thought_to_request,
-            },
-        },
-    )
-    composio_toolset.set_workspace_id(workspace_id)
+    if WORKSPACE_BACKEND == "local":
+        # Same actions on a local directory, without a container per workspace
+        workspace = get_workspace(workspace_id)
+        composio_toolset = LocalToolSet(workspace)
+        repo_path = repo_path or str(workspace.home / repo_name)
+        repo_dir = repo_dir or repo_path
+        if code_index is None:
+            # CODE_ANALYSIS_TOOL needs a container, so index the checkout instead
+            head = workspace.git("rev-parse", "HEAD", cwd=Path(repo_path)).strip()
+            code_index = get_code_index(repo_name, head, repo_dir=Path(repo_path))
+    else:
+        composio_toolset = _composio_toolset(repo_name, repo_path)
+        composio_toolset.set_workspace_id(workspace_id)
 
     swe_tools = [
         *composio_toolset.get_actions(
@@ -98,16 +172,20 @@ def get_agent_graph(repo_name: str, workspace_id: str):
         ),
     ]
     # Separate tools into two groups
-    code_analysis_tools = [
-        *composio_toolset.get_actions(
-            actions=[
-                Action.CODE_ANALYSIS_TOOL_GET_CLASS_INFO,
-                Action.CODE_ANALYSIS_TOOL_GET_METHOD_BODY,
-                Action.CODE_ANALYSIS_TOOL_GET_METHOD_SIGNATURE,
-                # Action.CODE_ANALYSIS_TOOL_GET_RELEVANT_CODE
-            ]
-        ),
-    ]
+    if code_index is not None:
+        # Shared (repo, base_commit_id) index, built once for all workspaces
+        code_analysis_tools = get_code_index_tools(code_index)
+    else:
+        code_analysis_tools = [
+            *composio_toolset.get_actions(
+                actions=[
+                    Action.CODE_ANALYSIS_TOOL_GET_CLASS_INFO,
+                    Action.CODE_ANALYSIS_TOOL_GET_METHOD_BODY,
+                    Action.CODE_ANALYSIS_TOOL_GET_METHOD_SIGNATURE,
+                    # Action.CODE_ANALYSIS_TOOL_GET_RELEVANT_CODE
+                ]
+            ),
+        ]
     file_tools = [
         *composio_toolset.get_actions(
             actions=[
@@ -124,17 +202,42 @@ def get_agent_graph(repo_name: str, workspace_id: str):
             ]
         ),
     ]
+    editing_prompt = EDITING_AGENT_PROMPT + TOOL_OUTPUT_PROMPT
+    if repo_dir is not None:
+        # The repo is reachable on this host, so views can slice it directly
+        file_tools.extend(get_file_view_tools(FileViewer(repo_dir)))
+        file_tools.append(get_batch_edit_tool(repo_dir))
+        editing_prompt += FILE_VIEW_PROMPT + BATCH_EDIT_PROMPT
+
+    # Oversized tool outputs are kept on disk; every agent can page through them
+    if output_store is None:
+        output_store = ToolOutputStore()
+    read_output_tool = get_tool_output_read_tool(output_store)
+    for tools in (swe_tools, code_analysis_tools, file_tools):
+        tools.append(read_output_tool)
+    if EDITOR_TOOLS == "phased":
+        file_tools.append(get_start_editing_tool())
+        editing_prompt += EDITOR_PHASE_PROMPT
+    # Every agent binds the same thought argument, whichever toolset built the tool
+    swe_tools, code_analysis_tools, file_tools = (
+        [with_thought(tool, TOOL_THOUGHT) for tool in tools]
+        for tools in (swe_tools, code_analysis_tools, file_tools)
+    )
 
     # Create two separate tool nodes
-    code_analysis_tool_node = ToolNode(code_analysis_tools)
-    file_tool_node = ToolNode(file_tools)
-    swe_tool_node = ToolNode(swe_tools)
+    code_analysis_tool_node = output_store.wrap(ToolNode(code_analysis_tools))
+    file_tool_node = output_store.wrap(ToolNode(file_tools))
+    swe_tool_node = output_store.wrap(ToolNode(swe_tools))
+
+    if analysis_timer is None:
+        analysis_timer = AnalysisTimer()
 
     # Define AgentState
     class AgentState(TypedDict):
         messages: Annotated[Sequence[BaseMessage], operator.add]
         sender: str
         consecutive_visits: dict
+        findings: Annotated[list, add_findings]
 
     # Agent names
     software_engineer_name = "SoftwareEngineer"
@@ -192,30 +295,60 @@ def get_agent_graph(repo_name: str, workspace_id: str):
         return agent_node
 
     # Create agents
-    def create_agent(system_prompt, tools):
+    provider = PROVIDERS.get(MODEL)
+
+    def create_agent(system_prompt, tools, route, name, all_tools=None):
+        # The system prompt and tools form a fixed prefix that providers can cache
         prompt = ChatPromptTemplate.from_messages(
             [
-                ("system", system_prompt),
+                system_message(thought_prompt(system_prompt, TOOL_THOUGHT), provider),
                 MessagesPlaceholder(variable_name="messages"),
             ]
         )
-        llm = client
-        if tools:
-            # return prompt | llm.bind_tools(tools)
-            return prompt | llm.bind_tools(tools)
+        if client is None:
+            agent = prompt | get_router().runnable(route, tools)
         else:
-            return prompt | llm
-
-    software_engineer_agent = create_agent(SOFTWARE_ENGINEER_PROMPT, swe_tools)
+            llm = client.bind_tools(tools) if tools else client
+            if cache_kwargs(provider):
+                llm = llm.bind(**cache_kwargs(provider))
+            agent = prompt | llm
+        if prompt_stats is not None:
+            agent = agent.with_config(callbacks=[prompt_stats], metadata={"agent": name})
+        if tool_stats is not None:
+            agent = tool_stats.counter(name, tools, all_tools or tools) | agent
+        return agent
+
+    software_engineer_agent = create_agent(
+        SOFTWARE_ENGINEER_PROMPT + TOOL_OUTPUT_PROMPT, swe_tools, "planning", software_engineer_name
+    )
     software_engineer_node = create_agent_node(
         software_engineer_agent, software_engineer_name
     )
 
     # Create the new code analyzer agent
-    code_analyzer_agent = create_agent(CODE_ANALYZER_PROMPT, code_analysis_tools)
+    analyzer_prompt = CODE_ANALYZER_PROMPT + TOOL_OUTPUT_PROMPT
+    if ANALYSIS_MODE == "parallel":
+        analyzer_prompt += PARALLEL_ANALYSIS_PROMPT
+    code_analyzer_agent = create_agent(
+        analyzer_prompt, code_analysis_tools, "tool_args", code_analyzer_name
+    )
     code_analyzer_node = create_agent_node(code_analyzer_agent, code_analyzer_name)
 
-    editing_agent = create_agent(EDITING_AGENT_PROMPT, file_tools)
+    if EDITOR_TOOLS == "phased":
+        # Two fixed tool sets, so each stays a cacheable prefix
+        reading_agent = create_agent(
+            editing_prompt, read_only(file_tools), "patch", editor_name, file_tools
+        )
+        writing_agent = create_agent(editing_prompt, file_tools, "patch", editor_name)
+        editing_agent = RunnableLambda(
+            lambda state: (
+                writing_agent
+                if editor_phase(state["messages"], editor_name) == EDIT_PHASE
+                else reading_agent
+            ).invoke(state)
+        )
+    else:
+        editing_agent = create_agent(editing_prompt, file_tools, "patch", editor_name)
     editing_node = create_agent_node(editing_agent, editor_name)
 
     # Update router function
@@ -242,6 +375,7 @@ def get_agent_graph(repo_name: str, workspace_id: str):
         if last_ai_message.tool_calls:
             return "swe_tool"
         if "ANALYZE CODE" in last_ai_message.content:
+            analysis_timer.start()
             return "analyze_code"
         if "EDIT FILE" in last_ai_message.content:
             return "edit_file"
@@ -303,9 +437,15 @@ def get_agent_graph(repo_name: str, workspace_id: str):
 
         if last_ai_message.tool_calls:
             return "code_analysis_tool"
+        if ANALYSIS_MODE == "parallel":
+            questions = parse_questions(content_text(last_ai_message.content))
+            if questions:
+                return fan_out(questions)
         if "ANALYSIS COMPLETE" in last_ai_message.content:
+            analysis_timer.finish("serial")
             return "done"
         if "EDIT FILE" in last_ai_message.content:
+            analysis_timer.finish("serial")
             return "edit_file"
         return "continue"
 
@@ -347,5 +487,21 @@ def get_agent_graph(repo_name: str, workspace_id: str):
         },
     )
 
+    if ANALYSIS_MODE == "parallel":
+        question_agent = create_agent(
+            QUESTION_ANALYZER_PROMPT + TOOL_OUTPUT_PROMPT,
+            code_analysis_tools,
+            "tool_args",
+            f"{code_analyzer_name}Worker",
+        )
+        add_fanout_analysis(
+            workflow,
+            code_analyzer_name,
+            software_engineer_name,
+            question_agent,
+            code_analysis_tool_node,
+            analysis_timer,
+        )
+
     graph = workflow.compile()
     return graph, composio_toolset, run_file
@@ -0,0 +1,200 @@
+"""Per-instance budgets and spend accounting for the benchmark attempts.
+
+``bench()`` starts with one attempt, adds attempts only while the judge asks
+to run again, and stops when the instance's token, time or cost budget would
+be exceeded by another round. Budgets come from BENCH_TOKEN_BUDGET,
+BENCH_TIME_BUDGET (seconds) and BENCH_COST_BUDGET (USD); ``0`` means no
+limit. Every instance appends its spend to BENCH_SPEND_LOG, and
+
+    python attempt_budget.py bench_spend.jsonl --resolved resolved.txt
+
+summarises a run as patches (or resolved instances) per dollar and per hour.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+SPEND_LOG = Path(os.environ.get("BENCH_SPEND_LOG", "bench_spend.jsonl"))
+
+# USD per million input and output tokens, matched by substring of the model id
+PRICES: t.List[t.Tuple[str, float, float]] = [
+    ("claude-3-5-sonnet", 3.0, 15.0),
+    ("claude-3-5-haiku", 0.8, 4.0),
+    ("gpt-4o-mini", 0.15, 0.6),
+    ("gpt-4o", 2.5, 10.0),
+    ("o1-mini", 3.0, 12.0),
+    ("llama3-2-3b", 0.15, 0.15),
+    ("llama-3-3-70b", 0.71, 0.71),
+    ("granite", 0.2, 0.2),
+]
+DEFAULT_PRICE = (3.0, 15.0)
+# Anthropic bills cache reads at a tenth of the input price
+CACHE_READ_FACTOR = 0.1
+
+
+def price_for(model_id: str) -> t.Tuple[float, float]:
+    for name, input_price, output_price in PRICES:
+        if name in model_id:
+            return input_price, output_price
+    return DEFAULT_PRICE
+
+
+class SpendTracker(BaseCallbackHandler):
+    """Token usage and estimated cost of every model call of one instance."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost = 0.0
+        self._models: t.Dict[t.Any, str] = {}
+
+    def on_chat_model_start(
+        self, serialized: t.Dict[str, t.Any], messages: t.Any, *, run_id: t.Any, **kwargs: t.Any
+    ) -> None:
+        metadata = kwargs.get("metadata") or {}
+        params = kwargs.get("invocation_params") or {}
+        self._models[run_id] = str(
+            metadata.get("route_model")
+            or metadata.get("ls_model_name")
+            or params.get("model_id")
+            or params.get("model")
+            or params.get("model_name")
+            or "unknown"
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        input_price, output_price = price_for(self._models.pop(run_id, "unknown"))
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                cache_read = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+                cost = (
+                    (input_tokens - cache_read + cache_read * CACHE_READ_FACTOR) * input_price
+                    + output_tokens * output_price
+                ) / 1e6
+                with self.lock:
+                    self.calls += 1
+                    self.input_tokens += input_tokens
+                    self.output_tokens += output_tokens
+                    self.cost += cost
+
+    def on_llm_error(self, error: BaseException, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        self._models.pop(run_id, None)
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class AttemptBudget:
+    """Decides how many attempts the next round of an instance gets, if any."""
+
+    def __init__(
+        self,
+        max_tokens: int = int(os.environ.get("BENCH_TOKEN_BUDGET", "2000000")),
+        max_seconds: float = float(os.environ.get("BENCH_TIME_BUDGET", "3600")),
+        max_cost: float = float(os.environ.get("BENCH_COST_BUDGET", "10")),
+        initial_attempts: int = 1,
+        max_attempts: int = 3,
+        max_rounds: int = 3,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.max_cost = max_cost
+        self.initial_attempts = initial_attempts
+        self.max_attempts = max_attempts
+        self.max_rounds = max_rounds
+        self.spend = SpendTracker()
+        self.started = time.perf_counter()
+        self.rounds: t.List[int] = []
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _fits(self, used: float, limit: float, attempts: int, done: int) -> bool:
+        if limit <= 0:
+            return True
+        if done == 0:
+            return used < limit
+        # Expect every new attempt to cost as much as the average one so far
+        return used + used / done * attempts <= limit
+
+    def next_round(self) -> int:
+        """Attempts for the next round: one more than the last, 0 when out of budget."""
+        if len(self.rounds) >= self.max_rounds:
+            return 0
+        attempts = min(self.max_attempts, self.rounds[-1] + 1 if self.rounds else self.initial_attempts)
+        done = sum(self.rounds)
+        with self.spend.lock:
+            tokens, cost = self.spend.tokens, self.spend.cost
+        if not (
+            self._fits(tokens, self.max_tokens, attempts, done)
+            and self._fits(self.seconds, self.max_seconds, attempts, done)
+            and self._fits(cost, self.max_cost, attempts, done)
+        ):
+            return 0
+        self.rounds.append(attempts)
+        return attempts
+
+    def record(self, instance_id: str, patched: bool, path: Path = SPEND_LOG) -> t.Dict[str, t.Any]:
+        """Append this instance's spend to `path` and return it."""
+        entry = {
+            "instance_id": instance_id,
+            "patched": patched,
+            "rounds": self.rounds,
+            "attempts": sum(self.rounds),
+            "calls": self.spend.calls,
+            "input_tokens": self.spend.input_tokens,
+            "output_tokens": self.spend.output_tokens,
+            "cost": round(self.spend.cost, 4),
+            "seconds": round(self.seconds, 1),
+        }
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry) + "\n")
+        return entry
+
+
+def report(entries: t.Sequence[t.Dict[str, t.Any]], resolved: t.Optional[t.Set[str]] = None) -> str:
+    cost = sum(entry["cost"] for entry in entries)
+    hours = sum(entry["seconds"] for entry in entries) / 3600
+    patched = sum(1 for entry in entries if entry["patched"])
+    lines = [
+        f"{len(entries)} instances, {sum(entry['attempts'] for entry in entries)} attempts, "
+        f"{sum(entry['input_tokens'] + entry['output_tokens'] for entry in entries)} tokens, "
+        f"${cost:.2f}, {hours:.2f}h",
+        f"patched: {patched} ({patched / cost if cost else 0:.2f}/$, {patched / hours if hours else 0:.2f}/h)",
+    ]
+    if resolved is not None:
+        solved = sum(1 for entry in entries if entry["instance_id"] in resolved)
+        lines.append(
+            f"resolved: {solved} ({solved / cost if cost else 0:.2f}/$, {solved / hours if hours else 0:.2f}/h)"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the spend of benchmark runs.")
+    parser.add_argument("log", type=Path, nargs="?", default=SPEND_LOG)
+    parser.add_argument("--resolved", type=Path, default=None, help="File of resolved instance ids")
+    args = parser.parse_args()
+    entries = [json.loads(line) for line in args.log.read_text(encoding="utf-8").splitlines() if line.strip()]
+    resolved = None
+    if args.resolved is not None:
+        resolved = {line.strip() for line in args.resolved.read_text(encoding="utf-8").splitlines() if line.strip()}
+    print(report(entries, resolved))
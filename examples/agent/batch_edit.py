@@ -0,0 +1,269 @@
+"""Batched, atomic multi-file edits for the Editor.
+
+A fix that touches several locations is applied in one tool call: every
+operation is validated against the original files first, then all files are
+written together, and a single combined diff is returned.
+"""
+
+import argparse
+import difflib
+import os
+import random
+import shutil
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+
+
+class EditOperation(BaseModel):
+    file_path: str = Field(..., description="Path of the file, relative to the repo root")
+    text: str = Field(..., description="Replacement text")
+    start_line: t.Optional[int] = Field(
+        None, description="First line to replace (1-based), used with end_line"
+    )
+    end_line: t.Optional[int] = Field(
+        None, description="Last line to replace (inclusive), used with start_line"
+    )
+    anchor: t.Optional[str] = Field(
+        None,
+        description="Exact snippet to replace instead of a line range; "
+        "it must occur exactly once in the file",
+    )
+
+
+class BatchEditRequest(BaseModel):
+    edits: t.List[EditOperation] = Field(
+        ..., description="All edits of the change, applied together"
+    )
+    thought: str = Field("", description="Short reasoning for the change")
+
+
+class BatchEditError(ValueError):
+    """Raised when an operation in the batch is invalid; nothing is written."""
+
+
+def _resolve(root: Path, file_path: str) -> Path:
+    path = (root / file_path).resolve()
+    if root not in path.parents:
+        raise BatchEditError(f"{file_path} is outside of the repository")
+    if not path.is_file():
+        raise BatchEditError(f"{file_path} does not exist")
+    return path
+
+
+def _read(path: Path) -> str:
+    """Contents of `path` with its line endings as they are on disk."""
+    with open(path, encoding="utf-8", newline="") as handle:
+        return handle.read()
+
+
+def _with_newline(text: str, newline: str) -> str:
+    return text.replace("\r\n", "\n").replace("\n", newline) if newline != "\n" else text
+
+
+def _span(source: str, edit: EditOperation) -> t.Tuple[int, int]:
+    """Character span in `source` that `edit` replaces."""
+    if edit.anchor is not None:
+        anchor = _with_newline(edit.anchor, _newline(source))
+        count = source.count(anchor)
+        if count != 1:
+            raise BatchEditError(
+                f"{edit.file_path}: anchor found {count} times, expected exactly once"
+            )
+        start = source.index(anchor)
+        return start, start + len(anchor)
+
+    if edit.start_line is None or edit.end_line is None:
+        raise BatchEditError(
+            f"{edit.file_path}: give either an anchor or start_line and end_line"
+        )
+    lines = source.splitlines(keepends=True)
+    if not 1 <= edit.start_line <= edit.end_line + 1 or edit.end_line > len(lines):
+        raise BatchEditError(
+            f"{edit.file_path}: lines {edit.start_line}-{edit.end_line} are out of "
+            f"range, the file has {len(lines)} lines"
+        )
+    start = sum(len(line) for line in lines[: edit.start_line - 1])
+    end = start + sum(len(line) for line in lines[edit.start_line - 1 : edit.end_line])
+    return start, end
+
+
+def _newline(source: str) -> str:
+    return "\r\n" if "\r\n" in source else "\n"
+
+
+def plan_edits(
+    root: Path, edits: t.Sequence[EditOperation]
+) -> t.Dict[Path, t.Tuple[str, str]]:
+    """Validate `edits` and return `{path: (old, new)}` without writing.
+
+    Files keep their line endings: the text and anchors of edits to a CRLF
+    file are converted to CRLF.
+    """
+    grouped: t.Dict[Path, t.List[EditOperation]] = {}
+    for edit in edits:
+        grouped.setdefault(_resolve(root, edit.file_path), []).append(edit)
+
+    planned = {}
+    for path, file_edits in grouped.items():
+        source = _read(path)
+        newline = _newline(source)
+        spans = sorted(
+            ((*_span(source, edit), edit) for edit in file_edits),
+            key=lambda item: item[0],
+        )
+        for (_, prev_end, prev), (start, _, edit) in zip(spans, spans[1:]):
+            if start < prev_end:
+                raise BatchEditError(
+                    f"{edit.file_path}: edits overlap ({_describe(prev)} and "
+                    f"{_describe(edit)})"
+                )
+        updated = source
+        for start, end, edit in reversed(spans):
+            text = _with_newline(edit.text, newline)
+            if edit.anchor is None and text and not text.endswith("\n"):
+                text += newline
+            updated = updated[:start] + text + updated[end:]
+        planned[path] = (source, updated)
+    return planned
+
+
+def _describe(edit: EditOperation) -> str:
+    if edit.anchor is not None:
+        return f"anchor {edit.anchor[:30]!r}"
+    return f"lines {edit.start_line}-{edit.end_line}"
+
+
+def apply_edits(root: t.Union[str, Path], edits: t.Sequence[EditOperation]) -> str:
+    """Apply all `edits` atomically and return the combined unified diff."""
+    root = Path(root).resolve()
+    planned = plan_edits(root, edits)
+
+    staged = []
+    try:
+        for path, (_, updated) in planned.items():
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as handle:
+                handle.write(updated)
+            shutil.copymode(path, tmp)
+            staged.append((tmp, path))
+    except OSError:
+        for tmp, _ in staged:
+            os.remove(tmp)
+        raise
+
+    replaced = []
+    try:
+        for tmp, path in staged:
+            os.replace(tmp, path)
+            replaced.append(path)
+    except OSError:
+        for path in replaced:
+            path.write_text(planned[path][0], encoding="utf-8", newline="")
+        for tmp, path in staged[len(replaced) :]:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+
+    diff = []
+    for path, (source, updated) in planned.items():
+        rel = path.relative_to(root).as_posix()
+        diff.extend(
+            difflib.unified_diff(
+                source.splitlines(keepends=True),
+                updated.splitlines(keepends=True),
+                fromfile=f"a/{rel}",
+                tofile=f"b/{rel}",
+            )
+        )
+    return "".join(diff)
+
+
+def get_batch_edit_tool(root: t.Union[str, Path]) -> StructuredTool:
+    """The batch edit tool for a local repository directory."""
+
+    def batch_edit(edits: t.List[EditOperation], thought: str = "") -> t.Dict[str, t.Any]:
+        try:
+            diff = apply_edits(root, edits)
+        except (BatchEditError, OSError, UnicodeDecodeError) as e:
+            return {"successful": False, "data": {}, "error": str(e)}
+        return {"successful": True, "data": {"diff": diff}, "error": None}
+
+    return StructuredTool.from_function(
+        batch_edit,
+        name="FILETOOL_BATCH_EDIT",
+        description="Apply several edits across one or more files in a single "
+        "call. Each edit replaces either a line range (start_line/end_line, "
+        "numbered as in the original file) or a unique anchor snippet. All "
+        "edits are validated first and applied together, or none are. "
+        "Returns the combined diff.",
+        args_schema=BatchEditRequest,
+    )
+
+
+def benchmark(root: Path, locations: int, fixes: int) -> None:
+    """Tool calls and tool time per fix: one EDIT_FILE-style call per location vs one batch.
+
+    Only the tools are timed; how many model turns a batch saves depends on the
+    agent and is not simulated here.
+    """
+    files = [p for p in root.rglob("*.py") if ".git" not in p.parts]
+    random.seed(0)
+    results: t.Dict[str, t.List[float]] = {"sequential": [], "batched": []}
+    calls: t.Dict[str, t.List[int]] = {"sequential": [], "batched": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp) / "repo"
+        for _ in range(fixes):
+            shutil.rmtree(workspace, ignore_errors=True)
+            shutil.copytree(root, workspace, ignore=shutil.ignore_patterns(".git"))
+            edits = []
+            for file in random.sample(files, min(locations, len(files))):
+                count = len(_read(file).splitlines())
+                if count == 0:
+                    continue
+                line = random.randint(1, count)
+                edits.append(
+                    EditOperation(
+                        file_path=file.relative_to(root).as_posix(),
+                        start_line=line,
+                        end_line=line,
+                        text="# edited",
+                    )
+                )
+            if not edits:
+                continue
+
+            start = time.perf_counter()
+            for edit in edits:
+                apply_edits(workspace, [edit])
+            results["sequential"].append(time.perf_counter() - start)
+            calls["sequential"].append(len(edits))
+
+            shutil.rmtree(workspace)
+            shutil.copytree(root, workspace, ignore=shutil.ignore_patterns(".git"))
+            start = time.perf_counter()
+            apply_edits(workspace, edits)
+            results["batched"].append(time.perf_counter() - start)
+            calls["batched"].append(1)
+
+    if not results["batched"]:
+        print(f"No non-empty .py files under {root}")
+        return
+    for mode, timings in results.items():
+        print(
+            f"{mode:>10}: {sum(calls[mode]) / len(calls[mode]):.1f} tool calls/fix, "
+            f"tool time {sum(timings) / len(timings) * 1000:.2f}ms/fix"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched edits.")
+    parser.add_argument("--root", type=Path, required=True, help="Local repo directory")
+    parser.add_argument("--locations", type=int, default=5, help="Edits per fix")
+    parser.add_argument("--fixes", type=int, default=20, help="Fixes to simulate")
+    args = parser.parse_args()
+    benchmark(args.root.resolve(), args.locations, args.fixes)
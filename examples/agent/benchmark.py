@@ -1,10 +1,13 @@
 import argparse
+import json
 import os
 import random
 import re
 import time
 import traceback
+import typing as t
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import List
 
 from langchain_aws import ChatBedrock
@@ -12,12 +15,25 @@ from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 from langgraph.errors import GraphRecursionError
 
-from composio_langgraph import Action
+from composio_langgraph import Action, ComposioToolSet, WorkspaceType
 
-from swekit.benchmark.run_evaluation import evaluate
+from swekit.benchmark.run_evaluation import EvaluationConfig, EvaluationManager
 from swekit.config.store import IssueConfig
 
 from agent import get_agent_graph
+from attempt_budget import AttemptBudget, SpendTracker
+from code_index import CACHE_DIR, CodeIndex, get_code_index, repo_mirror
+from eval_cache import MODEL_NAME, EvalCache, evaluate_predictions
+from eval_cache import summary as eval_summary
+from fanout_analysis import AnalysisTimer
+from local_workspace import WORKSPACE_BACKEND, LocalToolSet, LocalWorkspace, close_workspace
+from metrics import count_tokens, peak_rss_mb
+from model_router import get_router
+from patch_validation import PASSED, comparable, summary, validate_patches
+from prompt_cache import PromptCacheStats
+from tool_output import ToolOutputStore
+from tool_phases import ToolSchemaStats
+from worktrees import AttemptWorktrees
 
 
 max_retries = 5
@@ -25,6 +41,8 @@ base_delay = 1  # in seconds
 
 
 MODEL = "openai"
+# "worktree" runs attempts on host worktrees of the shared mirror instead of workspace clones
+ATTEMPT_BACKEND = os.environ.get("ATTEMPT_BACKEND", "workspace")
 
 
 def retry_with_exponential_backoff(func, *args, **kwargs):
@@ -38,9 +56,22 @@ def retry_with_exponential_backoff(func, *args, **kwargs):
             time.sleep(delay)
 
 
-def get_llm_response(system_prompt: str, human_prompt: str) -> str:
+def get_llm_response(
+    system_prompt: str,
+    human_prompt: str,
+    route: str = "planning",
+    spend: t.Optional[SpendTracker] = None,
+) -> str:
+    config = {"callbacks": [spend]} if spend is not None else None
     try:
-        if MODEL == "claude":
+        if MODEL == "routed":
+            response = retry_with_exponential_backoff(
+                get_router().invoke,
+                route,
+                [("system", system_prompt), ("human", human_prompt)],
+                config,
+            )
+        elif MODEL == "claude":
             client = ChatBedrock(
                 credentials_profile_name="default",
                 model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
@@ -48,7 +79,9 @@ def get_llm_response(system_prompt: str, human_prompt: str) -> str:
                 model_kwargs={"temperature": 0},
             )
             response = retry_with_exponential_backoff(
-                client.invoke, [("system", system_prompt), ("human", human_prompt)]
+                client.invoke,
+                [("system", system_prompt), ("human", human_prompt)],
+                config,
             )
         else:
             client = ChatOpenAI(
@@ -58,7 +91,7 @@ def get_llm_response(system_prompt: str, human_prompt: str) -> str:
                 api_key="<OPENAI_API_KEY>",
             )
             response = retry_with_exponential_backoff(
-                client.invoke, [("human", human_prompt)]
+                client.invoke, [("human", human_prompt)], config
             )
         return response.content
     except Exception:
@@ -146,16 +179,35 @@ Provide your response in the following format:
 
 
 def choose_patch(
-    patches, issue_config: IssueConfig, run_contents: List[str], hard=False
+    patches,
+    issue_config: IssueConfig,
+    run_contents: List[str],
+    hard=False,
+    validations: t.Optional[List[t.Dict[str, t.Any]]] = None,
+    spend: t.Optional[SpendTracker] = None,
 ):
     if not patches:
         return "", False
 
+    # Results only rank patches when all of them ran the same tests to completion
+    if validations and comparable(validations):
+        passing = [i for i, v in enumerate(validations) if v["status"] == PASSED]
+        if len(passing) == 1:
+            print(f"Only patch {passing[0] + 1} passes the local tests, skipping the judge")
+            return patches[passing[0]], True
+        if passing and len(passing) < len(patches):
+            # Only patches that pass the related tests are worth judging
+            patches = [patches[i] for i in passing]
+            run_contents = [run_contents[i] for i in passing]
+            validations = [validations[i] for i in passing]
+
     run_summaries = []
     for run_content in run_contents:
         summary_response = get_llm_response(
             system_prompt="You are an expert summarizer of agent's output.",
             human_prompt=f"The following is the run of the agent after it tried to fix the issue. Analyse the contents and messages of the run and give a short summary of what the agent did. \n{run_content}. Provide the output in the form of 5-7 chronological points.",  # noqa: E501
+            route="summary",
+            spend=spend,
         )
         run_summaries.append(summary_response)
 
@@ -167,6 +219,8 @@ def choose_patch(
         if not hard:
             patch_str += f"\nSummary of the agent:\n{run_summary}\n"
     patch_str += "=" * 50
+    if validations:
+        patch_str += f"\nResults of the related tests in the repo:\n{summary(validations)}\n"
 
     if not hard:
         response = get_llm_response(
@@ -176,6 +230,7 @@ def choose_patch(
                 issue_desc=issue_config.issue_desc,
                 patch_str=patch_str,
             ),
+            spend=spend,
         )
     else:
         response = get_llm_response(
@@ -185,6 +240,7 @@ def choose_patch(
                 issue_desc=issue_config.issue_desc,
                 patch_str=patch_str,
             ),
+            spend=spend,
         )
     if "RUN AGAIN" in response:
         return response, False
@@ -211,39 +267,105 @@ def choose_patch(
 
 
 def bench(workspace_ids: str, issue_config: IssueConfig) -> str:
+    budget = AttemptBudget(max_attempts=len(workspace_ids))
     patch = ""
-    patch_list = []
-    for _ in range(3):
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [
-                executor.submit(run_agent_function, workspace_id, issue_config, patch)
-                for workspace_id in workspace_ids
-            ]
-            patches = []
-            run_contents = []
-            for future in as_completed(futures):
-                try:
-                    patch, run_content = future.result()
-                    if patch:
-                        patches.append(patch)
-                    run_contents.append(run_content)
-                except Exception as e:
-                    print(f"Error in future: {e}")
-            patch_list.extend(patches)
-
-        patch, success = choose_patch(patches, issue_config, run_contents)
+    # Every patch of every round, for the final comparison
+    patch_list, content_list, validation_list = [], [], []
+    try:
+        code_index = get_code_index(
+            issue_config.repo_name, issue_config.base_commit_id
+        )
+    except Exception as e:
+        print(f"Falling back to workspace code analysis tools: {e}")
+        code_index = None
+    try:
+        git_dir = repo_mirror(issue_config.repo_name, issue_config.base_commit_id)
+    except Exception as e:
+        print(f"Patches will not be validated locally: {e}")
+        git_dir = None
+    worktrees = None
+    # Local workspaces live on worktrees too; swekit's workspaces are containers
+    if (ATTEMPT_BACKEND == "worktree" or WORKSPACE_BACKEND == "local") and git_dir is not None:
+        worktrees = AttemptWorktrees(
+            issue_config.repo_name, issue_config.base_commit_id, git_dir=git_dir
+        )
 
-        if success:
-            return patch
+    try:
+        success = False
+        # Start with one attempt and add one per round while the judge asks to run again
+        while not success:
+            attempts = budget.next_round()
+            if not attempts:
+                break
+            print(f"Round {len(budget.rounds)}: {attempts} attempts")
+            with ThreadPoolExecutor(max_workers=attempts) as executor:
+                futures = [
+                    executor.submit(
+                        run_agent_function,
+                        workspace_id,
+                        issue_config,
+                        patch,
+                        code_index,
+                        budget.spend,
+                        worktrees,
+                    )
+                    for workspace_id in workspace_ids[:attempts]
+                ]
+                patches = []
+                run_contents = []
+                for future in as_completed(futures):
+                    try:
+                        patch, run_content = future.result()
+                        # Keep run contents aligned with their patches
+                        if patch:
+                            patches.append(patch)
+                            run_contents.append(run_content)
+                    except Exception as e:
+                        print(f"Error in future: {e}")
+
+            validations = None
+            if git_dir is not None and patches:
+                validations = validate_patches(git_dir, issue_config.base_commit_id, patches)
+                print(f"Local validation:\n{summary(validations)}")
+                validation_list.extend(validations)
+            patch_list.extend(patches)
+            content_list.extend(run_contents)
+            patch, success = choose_patch(
+                patches,
+                issue_config,
+                run_contents,
+                validations=validations,
+                spend=budget.spend,
+            )
 
-    patch, success = choose_patch(patches, issue_config, run_contents, hard=True)
+        if not success:
+            # Out of rounds or budget: pick the best of everything generated so far
+            patch, success = choose_patch(
+                patch_list,
+                issue_config,
+                content_list,
+                hard=True,
+                validations=validation_list or None,
+                spend=budget.spend,
+            )
+    finally:
+        if worktrees is not None:
+            worktrees.close()
+    entry = budget.record(issue_config.issue_id, bool(patch))
+    print(
+        f"Spend for {issue_config.issue_id}: rounds {entry['rounds']}, {entry['calls']} calls, "
+        f"{entry['input_tokens']} in / {entry['output_tokens']} out tokens, "
+        f"${entry['cost']:.2f}, {entry['seconds']:.0f}s"
+    )
+    if MODEL == "routed":
+        print(f"Route stats so far:\n{get_router().stats.report()}")
     return patch
 
 
-def get_patch_from_response(composio_toolset, repo_name):
+def get_patch_from_response(composio_toolset, repo_name, repo_path=None):
     composio_toolset.execute_action(
         action=Action.FILETOOL_CHANGE_WORKING_DIRECTORY,
-        params={"path": f"/home/user/{repo_name}"},
+        params={"path": repo_path or f"/home/user/{repo_name}"},
     )
     # if "astropy" in repo_name:
     #     composio_toolset.execute_action(
@@ -300,51 +422,132 @@ def get_patch_from_response(composio_toolset, repo_name):
 
 
 def run_agent_function(
-    workspace_id: str, issue_config: IssueConfig, previous_patch_str: str = ""
+    workspace_id: str,
+    issue_config: IssueConfig,
+    previous_patch_str: str = "",
+    code_index: t.Optional[CodeIndex] = None,
+    spend: t.Optional[SpendTracker] = None,
+    worktrees: t.Optional[AttemptWorktrees] = None,
 ):
     """Run benchmark on the agent."""
 
-    graph, composio_toolset, run_file = get_agent_graph(
-        repo_name=issue_config.repo_name.split("/")[-1], workspace_id=workspace_id
-    )
+    repo_name = issue_config.repo_name.split("/")[-1]
+    repo_path = None
+    attempt = workspace_id
+    local_clone = None
+    # Workspaces made for this attempt, released when it ends
+    host_toolset = None
+    worktree_workspace = None
+    if worktrees is not None:
+        # A host workspace on this attempt's worktree instead of the container clone
+        repo_path = str(worktrees.get(attempt))
+        if WORKSPACE_BACKEND == "local":
+            worktree_workspace = LocalWorkspace(home=Path(repo_path).parent)
+            workspace_id = worktree_workspace.id
+        else:
+            host_toolset = ComposioToolSet(workspace_config=WorkspaceType.Host())
+            workspace_id = host_toolset.workspace.id
+    elif WORKSPACE_BACKEND == "local":
+        # No mirror for worktrees, so clone into a fresh local workspace
+        local_clone = LocalToolSet()
+        workspace_id = local_clone.workspace.id
 
-    # get the git tree
-    git_tree_response = composio_toolset.execute_action(
-        action=Action.FILETOOL_GIT_REPO_TREE,
-        params={},
-    )
+    try:
+        if local_clone is not None:
+            clone = local_clone.execute_action(
+                action=Action.FILETOOL_GIT_CLONE,
+                params={"repo_name": issue_config.repo_name, "commit_id": issue_config.base_commit_id},
+            )
+            if not clone.get("successful"):
+                raise RuntimeError(f"Could not clone {issue_config.repo_name}: {clone.get('error')}")
+            repo_path = str(local_clone.workspace.home / repo_name)
+
+        prompt_stats = PromptCacheStats()
+        output_store = ToolOutputStore()
+        analysis_timer = AnalysisTimer()
+        tool_stats = ToolSchemaStats()
+        graph, composio_toolset, run_file = get_agent_graph(
+            repo_name=issue_config.repo_name.split("/")[-1],
+            workspace_id=workspace_id,
+            code_index=code_index,
+            prompt_stats=prompt_stats,
+            output_store=output_store,
+            analysis_timer=analysis_timer,
+            repo_dir=repo_path,
+            repo_path=repo_path,
+            tool_stats=tool_stats,
+        )
+        if repo_path is not None:
+            composio_toolset.execute_action(
+                action=Action.FILETOOL_CHANGE_WORKING_DIRECTORY,
+                params={"path": repo_path},
+            )
 
-    composio_toolset.execute_action(
-        action=Action.SHELLTOOL_EXEC_COMMAND,
-        params={"cmd": f"cd ~/{issue_config.repo_name.split('/')[-1]}"},
-    )
+        # get the git tree
+        git_tree_response = composio_toolset.execute_action(
+            action=Action.FILETOOL_GIT_REPO_TREE,
+            params={},
+        )
+        git_tree_response = output_store.spill(json.dumps(git_tree_response), "FILETOOL_GIT_REPO_TREE")
 
-    if previous_patch_str != "":
-        issue_desc = f"{issue_config.issue_desc}\n. I have already tried to solve this problem before, but failed for the following reason: \n {previous_patch_str}.\n The previous patches did not fix the issue. Now try again to fix the issue. {issue_config.issue_desc}. \n Output to git tree command {git_tree_response}. Pay attention to the reason why patch failed to solve the issue and try something different to fix the issue."  # noqa: E501
-    else:
-        issue_desc = f"{issue_config.issue_desc}.\n Output to git tree command {git_tree_response}"
+        composio_toolset.execute_action(
+            action=Action.SHELLTOOL_EXEC_COMMAND,
+            params={"cmd": f"cd {repo_path or '~/' + repo_name}"},
+        )
 
-    try:
-        graph.invoke(
-            {"messages": [HumanMessage(content=issue_desc)]},
-            {"recursion_limit": 50},
+        if previous_patch_str != "":
+            issue_desc = f"{issue_config.issue_desc}\n. I have already tried to solve this problem before, but failed for the following reason: \n {previous_patch_str}.\n The previous patches did not fix the issue. Now try again to fix the issue. {issue_config.issue_desc}. \n Output to git tree command {git_tree_response}. Pay attention to the reason why patch failed to solve the issue and try something different to fix the issue."  # noqa: E501
+        else:
+            issue_desc = f"{issue_config.issue_desc}.\n Output to git tree command {git_tree_response}"
+
+        messages = [HumanMessage(content=issue_desc)]
+        try:
+            # stream_mode="values" keeps the latest state, also when the run is cut short
+            for state in graph.stream(
+                {"messages": messages},
+                {"recursion_limit": 50, "callbacks": [spend] if spend is not None else []},
+                stream_mode="values",
+            ):
+                messages = state["messages"]
+        except GraphRecursionError as e:
+            print(f"GraphRecursionError: {e}")
+        except Exception as e:
+            print(f"Error in graph.invoke: {e}")
+
+        print(f"Prompt cache usage for {workspace_id}:\n{prompt_stats.report()}")
+        print(f"Analysis phases for {workspace_id}:\n{analysis_timer.report()}")
+        print(f"Tool schemas for {workspace_id}:\n{tool_stats.report(messages)}")
+        context_tokens = sum(count_tokens(str(message.content)) for message in messages)
+        print(
+            f"Run {workspace_id}: {len(messages)} messages, {context_tokens} context tokens, "
+            f"{output_store.report()}, process peak RSS {peak_rss_mb():.0f} MiB"
         )
-    except GraphRecursionError as e:
-        print(f"GraphRecursionError: {e}")
-    except Exception as e:
-        print(f"Error in graph.invoke: {e}")
 
-    patch = get_patch_from_response(
-        composio_toolset, issue_config.repo_name.split("/")[-1]
-    )
-    run_content = open(run_file, "r").read()
-    os.remove(run_file)
-    composio_toolset.execute_action(
-        action=Action.SHELLTOOL_EXEC_COMMAND,
-        params={"cmd": f"git reset --hard {issue_config.base_commit_id}"},
-    )
+        run_content = open(run_file, "r").read()
+        os.remove(run_file)
+        if worktrees is not None:
+            # Plain git on the host; no tool round-trips needed
+            patch = worktrees.diff(attempt)
+            worktrees.reset(attempt)
+            return patch, run_content
+
+        patch = get_patch_from_response(composio_toolset, repo_name, repo_path)
+        if local_clone is not None:
+            return patch, run_content
+        composio_toolset.execute_action(
+            action=Action.SHELLTOOL_EXEC_COMMAND,
+            params={"cmd": f"git reset --hard {issue_config.base_commit_id}"},
+        )
 
-    return patch, run_content
+        return patch, run_content
+    finally:
+        if worktree_workspace is not None:
+            # The directory is the worktree parent, which AttemptWorktrees removes
+            worktree_workspace.close(remove=False)
+        elif host_toolset is not None:
+            close_workspace(host_toolset)
+        elif local_clone is not None:
+            close_workspace(local_clone)
 
 
 if __name__ == "__main__":
@@ -382,6 +585,17 @@ if __name__ == "__main__":
         default=3,
         help="Number of instances",
     )
+    parser.add_argument(
+        "--logs-dir",
+        type=Path,
+        default=None,
+        help="Agent logs of the run (default: one directory per run id, kept across re-runs)",
+    )
+    parser.add_argument(
+        "--no-eval-cache",
+        action="store_true",
+        help="Evaluate every patch, even if the same patch was evaluated before",
+    )
     args = parser.parse_args()
 
     if args.test_instance_ids:
@@ -393,13 +607,38 @@ if __name__ == "__main__":
         test_instance_ids_list = []
         test_range = args.test_split
 
-    evaluate(
-        bench,
-        dataset_name=args.dataset,
-        dry_run=False,
-        test_range=test_range,
-        include_hints=False,
-        test_instance_ids=test_instance_ids_list,
-        run_id=args.run_id,
-        num_instances=args.num_instances,
+    # swekit's evaluate() without its scoring step, which re-runs the harness on every patch
+    logs_dir = args.logs_dir or CACHE_DIR / "runs" / args.run_id
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    manager = EvaluationManager(
+        EvaluationConfig(
+            dataset_name=args.dataset,
+            test_range=test_range,
+            dry_run=False,
+            include_hints=False,
+            logs_dir=logs_dir,
+            test_instance_ids=test_instance_ids_list,
+            num_instances=args.num_instances,
+        )
+    )
+    manager.run(bench)
+
+    # Instances of earlier runs with this logs dir are scored too, mostly from the cache;
+    # the newest log of an instance replaces the older ones
+    predictions = {}
+    for log in sorted(logs_dir.glob("agent_logs_*.json"), key=lambda path: path.stat().st_mtime):
+        for instance_id, actions in json.loads(log.read_text(encoding="utf-8")).items():
+            predictions[instance_id] = {
+                "instance_id": instance_id,
+                "model_patch": actions[0]["agent_output"],
+                "model_name_or_path": MODEL_NAME,
+            }
+    results = evaluate_predictions(
+        list(predictions.values()),
+        args.run_id,
+        args.dataset,
+        logs_dir,
+        cache=EvalCache(),
+        use_cache=not args.no_eval_cache,
     )
+    print(eval_summary(results))
@@ -0,0 +1,671 @@
+"""Persistent symbol index shared by CodeAnalyzer runs.
+
+The index is keyed by ``(repo, base_commit_id)`` and stored as one SQLite file
+per commit, so every workspace and retry round of a benchmark instance reads
+the same index instead of re-indexing ``/home/user/{repo_name}``.
+
+A new commit starts from the nearest commit of the same repo that is already
+indexed and re-parses only the python files ``git diff --name-only`` reports
+as changed. The least recently used indexes are evicted once the store grows
+past CODE_INDEX_CACHE_MB.
+"""
+
+import argparse
+import ast
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import typing as t
+import weakref
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+
+
+CACHE_DIR = Path(os.environ.get("SWE_AGENT_CACHE", "~/.cache/swe-agent")).expanduser()
+INDEX_CACHE_MB = float(os.environ.get("CODE_INDEX_CACHE_MB", "2048"))
+# Paths per git call, well below the argument length limit
+PATH_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    blob TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    class_name TEXT,
+    signature TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    docstring TEXT
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_class_name ON symbols (class_name);
+CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path);
+"""
+
+# Index path -> lock, only while the index is being built
+_build_locks: t.Dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+# Indexes with a live CodeIndex in this process, which eviction leaves alone
+_open_indexes: "weakref.WeakSet[CodeIndex]" = weakref.WeakSet()
+
+
+def _git(git_dir: Path, *args: str, **kwargs: t.Any) -> str:
+    return subprocess.run(
+        ["git", f"--git-dir={git_dir}", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        **kwargs,
+    ).stdout
+
+
+def repo_mirror(repo: str, commit: str, cache_dir: Path = CACHE_DIR) -> Path:
+    """Return a local bare mirror of `repo` that contains `commit`."""
+    git_dir = cache_dir / "mirrors" / f"{repo.replace('/', '__')}.git"
+    if not git_dir.exists():
+        git_dir.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            ["git", "clone", "--mirror", f"https://github.com/{repo}.git", str(git_dir)],
+            check=True,
+            capture_output=True,
+        )
+    try:
+        _git(git_dir, "cat-file", "-e", f"{commit}^{{commit}}")
+    except subprocess.CalledProcessError:
+        _git(git_dir, "fetch", "--quiet", "origin")
+    return git_dir
+
+
+def iter_git_sources(
+    git_dir: Path, commit: str, paths: t.Optional[t.Iterable[str]] = None
+) -> t.Iterator[t.Tuple[str, str, str]]:
+    """Yield `(path, blob_sha, source)` for python files at `commit`."""
+    entries = []
+    listing = _git(git_dir, "ls-tree", "-r", "-z", commit, *(["--", *paths] if paths else []))
+    for entry in listing.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        _, kind, sha = info.split()
+        if kind == "blob" and path.endswith(".py"):
+            entries.append((path, sha))
+    if not entries:
+        return
+
+    with subprocess.Popen(
+        ["git", f"--git-dir={git_dir}", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as proc:
+        assert proc.stdin is not None and proc.stdout is not None
+
+        def feed() -> None:
+            proc.stdin.write("".join(f"{sha}\n" for _, sha in entries).encode())  # type: ignore
+            proc.stdin.close()  # type: ignore
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        for path, sha in entries:
+            header = proc.stdout.readline().split()
+            size = int(header[2])
+            data = proc.stdout.read(size)
+            proc.stdout.read(1)
+            yield path, sha, data.decode("utf-8", errors="replace")
+        writer.join()
+
+
+def iter_dir_sources(root: Path) -> t.Iterator[t.Tuple[str, str, str]]:
+    """Yield `(path, mtime, source)` for python files under a plain directory."""
+    for file in sorted(root.rglob("*.py")):
+        if ".git" in file.parts:
+            continue
+        yield (
+            file.relative_to(root).as_posix(),
+            str(file.stat().st_mtime_ns),
+            file.read_text(encoding="utf-8", errors="replace"),
+        )
+
+
+def _signature(node: t.Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef]) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in [*node.bases, *node.keywords])
+        return f"class {node.name}({bases})" if bases else f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def parse_symbols(path: str, source: str) -> t.List[t.Tuple[t.Any, ...]]:
+    """Extract class, method and function rows from one python file."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    rows = []
+
+    def visit(body: t.List[ast.stmt], class_name: t.Optional[str]) -> None:
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if class_name else "function"
+            else:
+                continue
+            start = min([node.lineno, *(d.lineno for d in node.decorator_list)])
+            rows.append(
+                (
+                    path,
+                    kind,
+                    node.name,
+                    node.name if kind == "class" else class_name,
+                    _signature(node),
+                    start,
+                    node.end_lineno or node.lineno,
+                    ast.get_docstring(node),
+                )
+            )
+            if isinstance(node, ast.ClassDef):
+                visit(node.body, node.name)
+
+    visit(tree.body, None)
+    return rows
+
+
+class CodeIndex:
+    """Read-only view over one `(repo, commit)` symbol index."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        with _build_locks_guard:
+            _open_indexes.add(self)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _source_lines(self, path: str, start: int, end: int) -> str:
+        row = self.db.execute("SELECT source FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return ""
+        return "\n".join(row["source"].splitlines()[start - 1 : end])
+
+    def get_class_info(self, class_name: str) -> t.Dict[str, t.Any]:
+        """Classes named `class_name` with their method signatures."""
+        results = []
+        for cls in self.db.execute(
+            "SELECT * FROM symbols WHERE kind = 'class' AND name = ? ORDER BY path",
+            (class_name,),
+        ):
+            methods = self.db.execute(
+                "SELECT signature, start_line FROM symbols "
+                "WHERE kind = 'method' AND class_name = ? AND path = ? "
+                "AND start_line BETWEEN ? AND ? ORDER BY start_line",
+                (class_name, cls["path"], cls["start_line"], cls["end_line"]),
+            ).fetchall()
+            results.append(
+                {
+                    "file_path": cls["path"],
+                    "signature": cls["signature"],
+                    "start_line": cls["start_line"],
+                    "end_line": cls["end_line"],
+                    "docstring": cls["docstring"],
+                    "methods": [
+                        f"{m['start_line']}: {m['signature']}" for m in methods
+                    ],
+                }
+            )
+        return {"results": results}
+
+    def _find_methods(
+        self, method_name: str, class_name: t.Optional[str]
+    ) -> t.List[sqlite3.Row]:
+        if class_name:
+            return self.db.execute(
+                "SELECT * FROM symbols WHERE name = ? AND class_name = ? "
+                "AND kind = 'method' ORDER BY path, start_line",
+                (method_name, class_name),
+            ).fetchall()
+        return self.db.execute(
+            "SELECT * FROM symbols WHERE name = ? AND kind IN ('method', 'function') "
+            "ORDER BY path, start_line",
+            (method_name,),
+        ).fetchall()
+
+    def get_method_signature(
+        self, method_name: str, class_name: t.Optional[str] = None
+    ) -> t.Dict[str, t.Any]:
+        """Signatures of methods or functions named `method_name`."""
+        return {
+            "results": [
+                {
+                    "file_path": row["path"],
+                    "class_name": row["class_name"],
+                    "signature": row["signature"],
+                    "start_line": row["start_line"],
+                }
+                for row in self._find_methods(method_name, class_name)
+            ]
+        }
+
+    def get_method_body(
+        self, method_name: str, class_name: t.Optional[str] = None
+    ) -> t.Dict[str, t.Any]:
+        """Source of methods or functions named `method_name`."""
+        return {
+            "results": [
+                {
+                    "file_path": row["path"],
+                    "class_name": row["class_name"],
+                    "start_line": row["start_line"],
+                    "end_line": row["end_line"],
+                    "body": self._source_lines(
+                        row["path"], row["start_line"], row["end_line"]
+                    ),
+                }
+                for row in self._find_methods(method_name, class_name)
+            ]
+        }
+
+    def symbols_in_file(self, path: str) -> t.List[t.Dict[str, t.Any]]:
+        """File-to-symbol map entry for `path`."""
+        return [
+            dict(row)
+            for row in self.db.execute(
+                "SELECT kind, name, class_name, signature, start_line, end_line "
+                "FROM symbols WHERE path = ? ORDER BY start_line",
+                (path,),
+            )
+        ]
+
+
+def index_path(repo: str, commit: str, cache_dir: Path = CACHE_DIR) -> Path:
+    return cache_dir / "index" / repo.replace("/", "__") / f"{commit}.sqlite"
+
+
+def _insert_sources(conn: sqlite3.Connection, sources: t.Iterable[t.Tuple[str, str, str]]) -> int:
+    count = 0
+    for file_path, blob, source in sources:
+        conn.execute("INSERT INTO files VALUES (?, ?, ?)", (file_path, blob, source))
+        conn.executemany(
+            "INSERT INTO symbols (path, kind, name, class_name, signature, "
+            "start_line, end_line, docstring) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            parse_symbols(file_path, source),
+        )
+        count += 1
+    return count
+
+
+def write_index(
+    path: Path,
+    sources: t.Iterable[t.Tuple[str, str, str]],
+    meta: t.Dict[str, str],
+    base: t.Optional[Path] = None,
+    removed: t.Sequence[str] = (),
+) -> None:
+    """Write an index to `path` atomically, from scratch or as a copy of `base`.
+
+    With `base`, the files in `removed` and those in `sources` are dropped from
+    the copy before `sources` are parsed in.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        if base is not None:
+            shutil.copyfile(base, tmp)
+        conn = sqlite3.connect(tmp)
+        conn.executescript(SCHEMA)
+        with conn:
+            for i in range(0, len(removed), PATH_BATCH):
+                batch = list(removed[i : i + PATH_BATCH])
+                marks = ", ".join("?" * len(batch))
+                conn.execute(f"DELETE FROM files WHERE path IN ({marks})", batch)
+                conn.execute(f"DELETE FROM symbols WHERE path IN ({marks})", batch)
+            _insert_sources(conn, sources)
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        conn.close()
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _index_meta(path: Path) -> t.Dict[str, str]:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    finally:
+        conn.close()
+
+
+def nearest_index(
+    repo: str, commit: str, git_dir: Path, cache_dir: Path = CACHE_DIR
+) -> t.Optional[t.Tuple[str, Path]]:
+    """The indexed commit of `repo` with the fewest commits between it and `commit`."""
+    best: t.Optional[t.Tuple[int, str, Path]] = None
+    for path in index_path(repo, commit, cache_dir).parent.glob("*.sqlite"):
+        base = path.stem
+        if base == commit:
+            continue
+        try:
+            # Only indexes read from git have blob ids that match a diff
+            if _index_meta(path).get("source") != "git":
+                continue
+            distance = int(_git(git_dir, "rev-list", "--count", f"{base}...{commit}"))
+        except (sqlite3.Error, subprocess.CalledProcessError, ValueError):
+            continue
+        if best is None or distance < best[0]:
+            best = (distance, base, path)
+    return (best[1], best[2]) if best else None
+
+
+def changed_files(git_dir: Path, base: str, commit: str) -> t.List[str]:
+    """Python files added, changed or deleted between two commits."""
+    listing = _git(
+        git_dir, "diff", "--name-only", "--no-renames", "-z", base, commit, "--", "*.py"
+    )
+    return [path for path in listing.split("\0") if path]
+
+
+def _iter_changed_sources(
+    git_dir: Path, commit: str, paths: t.Sequence[str]
+) -> t.Iterator[t.Tuple[str, str, str]]:
+    for i in range(0, len(paths), PATH_BATCH):
+        yield from iter_git_sources(git_dir, commit, paths[i : i + PATH_BATCH])
+
+
+def evict_indexes(
+    cache_dir: Path = CACHE_DIR, max_mb: float = INDEX_CACHE_MB, keep: t.Optional[Path] = None
+) -> t.List[Path]:
+    """Delete the least recently used indexes until the store fits in `max_mb`.
+
+    Indexes that are being built or used by a live CodeIndex in this process are kept.
+    """
+    if max_mb <= 0:
+        return []
+    with _build_locks_guard:
+        in_use = set(_build_locks) | {str(index.path) for index in _open_indexes}
+    indexes = []
+    for path in (cache_dir / "index").glob("*/*.sqlite"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        indexes.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in indexes)
+    evicted = []
+    for _, size, path in sorted(indexes):
+        if total <= max_mb * 1e6:
+            break
+        if path == keep or str(path) in in_use:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted.append(path)
+    return evicted
+
+
+def get_code_index(
+    repo: str,
+    commit: str,
+    cache_dir: Path = CACHE_DIR,
+    repo_dir: t.Optional[Path] = None,
+    git_dir: t.Optional[Path] = None,
+    incremental: bool = True,
+) -> CodeIndex:
+    """Return the index for `(repo, commit)`, building it once if needed.
+
+    Sources are read straight from a shared bare mirror (or `git_dir`), or from
+    `repo_dir` when a local checkout of `commit` is already available. Indexes
+    read from git are updated from the nearest indexed commit when there is one.
+    """
+    path = index_path(repo, commit, cache_dir)
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(str(path), threading.Lock())
+    try:
+        with lock:
+            return _get_code_index(path, repo, commit, cache_dir, repo_dir, git_dir, incremental)
+    finally:
+        # Waiters hold their own reference; later callers find the index or start a new build
+        with _build_locks_guard:
+            if _build_locks.get(str(path)) is lock:
+                del _build_locks[str(path)]
+
+
+def _get_code_index(
+    path: Path,
+    repo: str,
+    commit: str,
+    cache_dir: Path,
+    repo_dir: t.Optional[Path],
+    git_dir: t.Optional[Path],
+    incremental: bool,
+) -> CodeIndex:
+    if path.exists():
+        # Mark as recently used for eviction
+        os.utime(path)
+        return CodeIndex(path)
+    meta = {"repo": repo, "commit": commit}
+    if repo_dir is not None:
+        write_index(path, iter_dir_sources(repo_dir), meta)
+    else:
+        git_dir = git_dir or repo_mirror(repo, commit, cache_dir)
+        meta["source"] = "git"
+        nearest = nearest_index(repo, commit, git_dir, cache_dir) if incremental else None
+        if nearest is None:
+            write_index(path, iter_git_sources(git_dir, commit), meta)
+        else:
+            base, base_path = nearest
+            changed = changed_files(git_dir, base, commit)
+            meta["base"] = base
+            try:
+                write_index(
+                    path,
+                    _iter_changed_sources(git_dir, commit, changed),
+                    meta,
+                    base=base_path,
+                    removed=changed,
+                )
+            except FileNotFoundError:
+                # The base was evicted in the meantime
+                del meta["base"]
+                write_index(path, iter_git_sources(git_dir, commit), meta)
+    evict_indexes(cache_dir, keep=path)
+    return CodeIndex(path)
+
+
+def get_code_index_tools(index: CodeIndex) -> t.List[StructuredTool]:
+    """Index-backed replacements for the CODE_ANALYSIS_TOOL actions."""
+
+    def get_class_info(class_name: str, thought: str = "") -> t.Dict[str, t.Any]:
+        return _response(index.get_class_info(class_name))
+
+    def get_method_body(
+        method_name: str, class_name: t.Optional[str] = None, thought: str = ""
+    ) -> t.Dict[str, t.Any]:
+        return _response(index.get_method_body(method_name, class_name))
+
+    def get_method_signature(
+        method_name: str, class_name: t.Optional[str] = None, thought: str = ""
+    ) -> t.Dict[str, t.Any]:
+        return _response(index.get_method_signature(method_name, class_name))
+
+    return [
+        StructuredTool.from_function(
+            get_class_info,
+            name="CODE_ANALYSIS_TOOL_GET_CLASS_INFO",
+            description="Get the file path, signature, docstring and method "
+            "signatures of every class with the given name.",
+        ),
+        StructuredTool.from_function(
+            get_method_body,
+            name="CODE_ANALYSIS_TOOL_GET_METHOD_BODY",
+            description="Get the source of a method. Pass `class_name` to "
+            "restrict the lookup to methods of that class.",
+        ),
+        StructuredTool.from_function(
+            get_method_signature,
+            name="CODE_ANALYSIS_TOOL_GET_METHOD_SIGNATURE",
+            description="Get the signature of a method. Pass `class_name` to "
+            "restrict the lookup to methods of that class.",
+        ),
+    ]
+
+
+def _response(data: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    if not data["results"]:
+        return {"successful": False, "data": data, "error": "No matching symbol found"}
+    return {"successful": True, "data": data, "error": None}
+
+
+def benchmark(
+    repo: str, commit: str, repo_dir: t.Optional[Path], lookups: int
+) -> None:
+    """Time a cold build, a warm open and symbol lookups."""
+    path = index_path(repo, commit)
+    if path.exists():
+        path.unlink()
+
+    start = time.perf_counter()
+    index = get_code_index(repo, commit, repo_dir=repo_dir)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = get_code_index(repo, commit, repo_dir=repo_dir)
+    warm = time.perf_counter() - start
+
+    names = [
+        row["name"]
+        for row in index.db.execute(
+            "SELECT name, kind FROM symbols ORDER BY random() LIMIT ?", (lookups,)
+        )
+    ]
+    timings: t.Dict[str, t.List[float]] = {"class": [], "signature": [], "body": []}
+    for name in names:
+        for key, lookup in (
+            ("class", index.get_class_info),
+            ("signature", index.get_method_signature),
+            ("body", index.get_method_body),
+        ):
+            start = time.perf_counter()
+            lookup(name)
+            timings[key].append((time.perf_counter() - start) * 1000)
+
+    files, symbols = index.db.execute(
+        "SELECT (SELECT count(*) FROM files), (SELECT count(*) FROM symbols)"
+    ).fetchone()
+    print(f"Index: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    print(f"Files: {files}, symbols: {symbols}")
+    print(f"Cold build: {cold:.2f}s, warm open: {warm * 1000:.2f}ms")
+    for key, values in timings.items():
+        if values:
+            print(
+                f"Lookup {key}: mean {statistics.mean(values):.3f}ms, "
+                f"max {max(values):.3f}ms over {len(values)} lookups"
+            )
+
+
+def _index_contents(index: CodeIndex) -> t.Tuple[int, int, int]:
+    files, symbols = index.db.execute(
+        "SELECT (SELECT count(*) FROM files), (SELECT count(*) FROM symbols)"
+    ).fetchone()
+    digest = hash(tuple(index.db.execute("SELECT path, blob FROM files ORDER BY path")))
+    return files, symbols, digest
+
+
+def batch_benchmark(repo: str, commits: t.Sequence[str], git_dir: t.Optional[Path]) -> None:
+    """Index a batch of commits in commit date order, from scratch and incrementally."""
+    if git_dir is None:
+        git_dir = repo_mirror(repo, commits[0])
+    elif (git_dir / ".git").exists():
+        git_dir = git_dir / ".git"
+    for commit in commits:
+        _git(git_dir, "cat-file", "-e", f"{commit}^{{commit}}")
+    dated = _git(git_dir, "log", "--no-walk=unsorted", "--format=%H %ct", *commits).split()
+    ordered = [sha for _, sha in sorted(zip(map(int, dated[1::2]), dated[::2]))]
+
+    totals = {"full": 0.0, "incremental": 0.0}
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'commit':<12} {'changed':>8} {'full':>8} {'incremental':>12}")
+        for commit in ordered:
+            seconds = {}
+            contents = {}
+            for mode in totals:
+                start = time.perf_counter()
+                index = get_code_index(
+                    repo,
+                    commit,
+                    cache_dir=Path(tmp) / mode,
+                    git_dir=git_dir,
+                    incremental=mode == "incremental",
+                )
+                seconds[mode] = time.perf_counter() - start
+                totals[mode] += seconds[mode]
+                contents[mode] = _index_contents(index)
+            assert contents["full"] == contents["incremental"], f"index mismatch at {commit}"
+            base = _index_meta(index.path).get("base")
+            changed = len(changed_files(git_dir, base, commit)) if base else "-"
+            print(
+                f"{commit[:12]:<12} {changed:>8} {seconds['full']:>7.2f}s "
+                f"{seconds['incremental']:>11.2f}s"
+            )
+    print(
+        f"{len(ordered)} commits: full {totals['full']:.2f}s, "
+        f"incremental {totals['incremental']:.2f}s "
+        f"({totals['incremental'] / totals['full']:.0%} of full)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and benchmark the code index.")
+    parser.add_argument("--repo", required=True, help="Repository (owner/name)")
+    parser.add_argument("--commit", default=None, help="Base commit id")
+    parser.add_argument(
+        "--commits",
+        nargs="+",
+        default=None,
+        help="Base commit ids of a batch of instances; times full and incremental indexing",
+    )
+    parser.add_argument(
+        "--repo-dir",
+        type=Path,
+        default=None,
+        help="Index a local checkout instead of the shared mirror",
+    )
+    parser.add_argument(
+        "--git-dir",
+        type=Path,
+        default=None,
+        help="Read --commits from this local git repo instead of the shared mirror",
+    )
+    parser.add_argument("--lookups", type=int, default=200, help="Random lookups")
+    args = parser.parse_args()
+    if args.commits:
+        batch_benchmark(args.repo, args.commits, args.git_dir)
+    elif args.commit:
+        benchmark(args.repo, args.commit, args.repo_dir, args.lookups)
+    else:
+        parser.error("--commit or --commits is required")
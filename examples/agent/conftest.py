@@ -0,0 +1,6 @@
+"""The modules here import each other by flat name, as when the scripts are run from this directory."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
@@ -0,0 +1,262 @@
+"""Cache of SWE-bench evaluation results by instance, patch and harness version.
+
+Results are stored as ``eval/{harness}/{instance_id}/{patch_hash}.json`` under
+the agent cache directory. The patch hash is taken over a normalised patch
+(line endings, ``index`` lines and hunk header context removed), so a patch
+that only differs in how git printed it is still a hit. The harness version
+is the installed swebench version unless EVAL_HARNESS_VERSION is set.
+``evaluate_predictions`` sends only the misses through the Docker harness.
+
+    python eval_cache.py list [--instance django__django-11099]
+    python eval_cache.py prune --older-than 30 --stale-harness [--dry-run]
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import re
+import tempfile
+import time
+import typing as t
+import uuid
+from importlib import metadata
+from pathlib import Path
+
+from code_index import CACHE_DIR
+
+
+MODEL_NAME = "composio"
+
+
+def _harness_version() -> str:
+    try:
+        return f"swebench-{metadata.version('swebench')}"
+    except metadata.PackageNotFoundError:
+        return "swebench-unknown"
+
+
+HARNESS_VERSION = os.environ.get("EVAL_HARNESS_VERSION") or _harness_version()
+
+
+def normalise_patch(patch: str) -> str:
+    """`patch` without the parts that change with git's settings but not the change itself."""
+    lines = []
+    for line in patch.replace("\r\n", "\n").split("\n"):
+        if line.startswith("index "):
+            continue
+        if line.startswith("@@"):
+            line = re.sub(r"^(@@ [^@]* @@).*$", r"\1", line)
+        lines.append(line)
+    return "\n".join(lines).strip("\n") + "\n"
+
+
+def patch_hash(patch: str) -> str:
+    return hashlib.sha256(normalise_patch(patch).encode("utf-8")).hexdigest()
+
+
+class EvalCache:
+    """Evaluation results keyed by (instance_id, normalised patch hash, harness version)."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, harness: str = HARNESS_VERSION) -> None:
+        self.root = cache_dir / "eval"
+        self.harness = harness
+
+    def path(self, instance_id: str, patch: str) -> Path:
+        return self.root / self.harness / instance_id / f"{patch_hash(patch)}.json"
+
+    def get(self, instance_id: str, patch: str) -> t.Optional[t.Dict[str, t.Any]]:
+        path = self.path(instance_id, patch)
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(
+        self, instance_id: str, patch: str, report: t.Dict[str, t.Any], **info: t.Any
+    ) -> Path:
+        """Store the harness report of `patch`; `info` (dataset, run id, ...) is kept with it."""
+        path = self.path(instance_id, patch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "instance_id": instance_id,
+            "patch_hash": path.stem,
+            "harness": self.harness,
+            "resolved": bool(report.get("resolved")),
+            "report": report,
+            "created": time.time(),
+            **info,
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle)
+        os.replace(tmp, path)
+        return path
+
+    def entries(self) -> t.Iterator[t.Tuple[Path, t.Dict[str, t.Any]]]:
+        for path in sorted(self.root.glob("*/*/*.json")):
+            try:
+                yield path, json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+
+    def prune(
+        self,
+        older_than_days: t.Optional[float] = None,
+        stale_harness: bool = False,
+        instance_id: t.Optional[str] = None,
+        dry_run: bool = False,
+    ) -> t.List[Path]:
+        """Delete entries matching every given condition; returns the deleted paths."""
+        cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        pruned = []
+        for path, entry in self.entries():
+            if cutoff is not None and entry.get("created", 0) >= cutoff:
+                continue
+            if stale_harness and entry.get("harness") == self.harness:
+                continue
+            if instance_id is not None and entry.get("instance_id") != instance_id:
+                continue
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            pruned.append(path)
+        return pruned
+
+
+def _harness_kwargs(run_evaluation: t.Callable[..., t.Any], **kwargs: t.Any) -> t.Dict[str, t.Any]:
+    """`kwargs` plus the defaults of other swebench versions, limited to what `run_evaluation` takes."""
+    defaults = {
+        # swebench 2.x
+        "force_rebuild": False,
+        "cache_level": "env",
+        "clean": False,
+        # swebench 3.x and later
+        "namespace": None,
+        "rewrite_reports": False,
+        "modal": False,
+        "instance_image_tag": "latest",
+    }
+    parameters = inspect.signature(run_evaluation).parameters
+    return {name: value for name, value in {**defaults, **kwargs}.items() if name in parameters}
+
+
+def evaluate_predictions(
+    predictions: t.Sequence[t.Dict[str, t.Any]],
+    run_id: str,
+    dataset_name: str,
+    logs_dir: Path,
+    cache: t.Optional[EvalCache] = None,
+    use_cache: bool = True,
+    max_workers: int = 4,
+) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """Resolve status per instance, running the SWE-bench harness only on uncached patches.
+
+    Empty patches are not evaluated and count as unresolved. Every harness
+    report is stored in the cache, also when `use_cache` is off. The harness
+    runs under a fresh run id per call: swebench skips instances that already
+    have a report for a run id, which would pair an old report with a new patch.
+    """
+    cache = cache or EvalCache()
+    results: t.Dict[str, t.Dict[str, t.Any]] = {}
+    pending = []
+    for prediction in predictions:
+        instance_id, patch = prediction["instance_id"], prediction["model_patch"] or ""
+        if not patch.strip():
+            results[instance_id] = {"resolved": False, "source": "empty"}
+            continue
+        cached = cache.get(instance_id, patch) if use_cache else None
+        if cached is not None:
+            results[instance_id] = {"resolved": cached["resolved"], "source": "cache"}
+        else:
+            pending.append(prediction)
+
+    if pending:
+        from swebench.harness.constants import RUN_EVALUATION_LOG_DIR
+        from swebench.harness.run_evaluation import main as run_evaluation
+
+        predictions_path = logs_dir / "predictions_uncached.json"
+        predictions_path.write_text(json.dumps(pending, indent=4), encoding="utf-8")
+        harness_run_id = f"{run_id}-{uuid.uuid4().hex[:8]}"
+        # Same settings as swekit's get_score
+        run_evaluation(
+            **_harness_kwargs(
+                run_evaluation,
+                dataset_name=dataset_name,
+                split="test",
+                instance_ids=[],
+                predictions_path=str(predictions_path),
+                max_workers=max_workers,
+                open_file_limit=4096,
+                timeout=1800,
+                run_id=harness_run_id,
+            )
+        )
+        for prediction in pending:
+            instance_id = prediction["instance_id"]
+            report_path = (
+                RUN_EVALUATION_LOG_DIR / harness_run_id / MODEL_NAME / instance_id / "report.json"
+            )
+            try:
+                report = json.loads(report_path.read_text(encoding="utf-8"))[instance_id]
+            except (OSError, ValueError, KeyError):
+                # Harness errors are not cached, so the next run tries again
+                results[instance_id] = {"resolved": False, "source": "error"}
+                continue
+            cache.put(
+                instance_id,
+                prediction["model_patch"],
+                report,
+                dataset=dataset_name,
+                run_id=harness_run_id,
+            )
+            results[instance_id] = {"resolved": bool(report.get("resolved")), "source": "harness"}
+
+    (logs_dir / "eval_results.json").write_text(json.dumps(results, indent=4), encoding="utf-8")
+    return results
+
+
+def summary(results: t.Dict[str, t.Dict[str, t.Any]]) -> str:
+    sources = [result["source"] for result in results.values()]
+    resolved = sum(1 for result in results.values() if result["resolved"])
+    return (
+        f"{len(results)} instances, {resolved} resolved; {sources.count('cache')} from the cache, "
+        f"{sources.count('harness')} evaluated, {sources.count('empty')} empty patches, "
+        f"{sources.count('error')} harness errors"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and prune the evaluation cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="List cached results")
+    list_parser.add_argument("--instance", default=None)
+    prune_parser = commands.add_parser("prune", help="Delete cached results")
+    prune_parser.add_argument("--older-than", type=float, default=None, help="Age in days")
+    prune_parser.add_argument(
+        "--stale-harness", action="store_true", help=f"Only entries not from {HARNESS_VERSION}"
+    )
+    prune_parser.add_argument("--instance", default=None)
+    prune_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    cache = EvalCache()
+    if args.command == "list":
+        count = resolved = 0
+        for path, entry in cache.entries():
+            if args.instance and entry.get("instance_id") != args.instance:
+                continue
+            count += 1
+            resolved += bool(entry.get("resolved"))
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("created", 0)))
+            print(
+                f"{entry['instance_id']:<40} {entry['patch_hash'][:12]} {entry['harness']:<20} "
+                f"{'resolved' if entry['resolved'] else 'unresolved':<10} "
+                f"{entry.get('run_id', '-'):<16} {created}"
+            )
+        print(f"{count} entries, {resolved} resolved, in {cache.root}")
+    elif args.older_than is None and not args.stale_harness and args.instance is None:
+        parser.error("prune needs --older-than, --stale-harness or --instance")
+    else:
+        pruned = cache.prune(args.older_than, args.stale_harness, args.instance, args.dry_run)
+        print(f"{'Would delete' if args.dry_run else 'Deleted'} {len(pruned)} entries")
@@ -0,0 +1,96 @@
+"""Local stand-in for the GitHub issues API, for offline batch runs.
+
+    python fake_github_server.py --port 8900 --issues issues.json --latency 0.1
+    GITHUB_API_URL=http://127.0.0.1:8900 python main.py --manifest issues.jsonl
+
+`issues.json` maps "owner/repo#number" to {"title", "body", "updated_at"};
+other issues are generated. Responses carry an ETag and conditional requests
+get 304 Not Modified, like the real API.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ISSUE_PATH = re.compile(r"^/repos/([^/]+)/([^/]+)/issues/(\d+)$")
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    server: "FakeGitHubServer"
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        match = ISSUE_PATH.match(self.path.split("?", 1)[0])
+        if match is None:
+            self.send_error(404)
+            return
+        time.sleep(self.server.latency)
+        owner, repo, number = match.group(1), match.group(2), int(match.group(3))
+        key = f"{owner}/{repo}#{number}"
+        issue = self.server.issues.get(key) or {
+            "title": f"Issue {number} of {owner}/{repo}",
+            "body": f"Generated description of issue {number}.",
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+        payload = {
+            "number": number,
+            "state": "open",
+            "html_url": f"https://github.com/{owner}/{repo}/issues/{number}",
+            **issue,
+        }
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self.server.lock:
+            self.server.requests += 1
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    def __init__(
+        self,
+        address: t.Tuple[str, int],
+        issues: t.Dict[str, t.Dict[str, t.Any]],
+        latency: float = 0.0,
+    ) -> None:
+        super().__init__(address, FakeGitHubHandler)
+        self.issues = issues
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake GitHub issues API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--issues", default=None, help="JSON file of issues by owner/repo#number")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    args = parser.parse_args()
+    issues = {}
+    if args.issues:
+        with open(args.issues, encoding="utf-8") as handle:
+            issues = json.load(handle)
+    server = FakeGitHubServer((args.host, args.port), issues, args.latency)
+    print(f"Fake GitHub API on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,102 @@
+"""Local OpenAI-compatible fake model server for exercising the model router.
+
+    python fake_model_server.py --port 8800 --latency ibm/granite-3-2-8b-instruct=0.2
+    MODEL_ROUTER_BASE_URL=http://127.0.0.1:8800/v1 python model_router.py show
+
+Replies echo the model id and report token usage, and each model can be given
+an artificial latency so routing decisions show up in the per-route stats.
+"""
+
+import argparse
+import json
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import count_tokens
+
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    server: "FakeModelServer"
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        model = request.get("model", "unknown")
+        time.sleep(self.server.latency.get(model, self.server.default_latency))
+
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        content = f"[{model}] {self.server.reply}"
+        with self.server.lock:
+            self.server.requests[model] = self.server.requests.get(model, 0) + 1
+        body = json.dumps(
+            {
+                "id": f"chatcmpl-{time.time_ns()}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": count_tokens(prompt),
+                    "completion_tokens": count_tokens(content),
+                    "total_tokens": count_tokens(prompt) + count_tokens(content),
+                },
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeModelServer(ThreadingHTTPServer):
+    def __init__(
+        self,
+        address: t.Tuple[str, int],
+        latency: t.Dict[str, float],
+        default_latency: float = 0.0,
+        reply: str = "OK",
+    ) -> None:
+        super().__init__(address, FakeModelHandler)
+        self.latency = latency
+        self.default_latency = default_latency
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.requests: t.Dict[str, int] = {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        help="Per-model latency as MODEL=SECONDS (repeatable)",
+    )
+    parser.add_argument("--default-latency", type=float, default=0.0)
+    parser.add_argument("--reply", default="OK", help="Reply text")
+    args = parser.parse_args()
+    latency = {
+        model: float(seconds)
+        for model, seconds in (item.rsplit("=", 1) for item in args.latency)
+    }
+    server = FakeModelServer(
+        (args.host, args.port), latency, args.default_latency, args.reply
+    )
+    print(f"Fake model server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
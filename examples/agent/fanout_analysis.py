@@ -0,0 +1,272 @@
+"""Map-reduce code analysis for the CodeAnalyzer.
+
+Instead of investigating one thing per turn, the CodeAnalyzer can answer with
+"PARALLEL QUESTIONS" and a JSON list of independent questions. Each question is
+sent (LangGraph ``Send``) to its own ``answer_question`` task, which runs a short
+tool loop with the analysis tools; at most ``max_parallel`` run at a time.
+``merge_findings`` joins the answers into one report for the SoftwareEngineer.
+
+    python fanout_analysis.py --questions 4 --llm-latency 1.0 --tool-latency 0.2
+
+compares the wall-clock time of the serial loop and the fan-out with a scripted
+model, so only the graph shape is measured.
+"""
+
+import argparse
+import json
+import operator
+import re
+import statistics
+import threading
+import time
+import traceback
+import typing as t
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.tools import StructuredTool
+from langgraph.graph import END, START, StateGraph
+from langgraph.prebuilt import ToolNode
+from langgraph.types import Send
+
+
+QUESTIONS_MARKER = "PARALLEL QUESTIONS"
+MAX_QUESTIONS = 6
+MAX_PARALLEL = 4
+MAX_WORKER_TURNS = 6
+MAX_ANSWER_CHARS = 1500
+
+
+def content_text(content: t.Any) -> str:
+    """Text of a message content, which is a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+    )
+
+
+def parse_questions(text: str, limit: int = MAX_QUESTIONS) -> t.List[str]:
+    """Questions listed after QUESTIONS_MARKER, as a JSON list or as bullet lines."""
+    if QUESTIONS_MARKER not in text:
+        return []
+    rest = text.split(QUESTIONS_MARKER, 1)[1]
+    questions: t.List[str] = []
+    match = re.search(r"\[.*\]", rest, re.DOTALL)
+    if match:
+        try:
+            questions = [str(q) for q in json.loads(match.group(0)) if str(q).strip()]
+        except ValueError:
+            pass
+    if not questions:
+        questions = [
+            re.sub(r"^\s*(?:[-*]|\d+[.)])\s*", "", line)
+            for line in rest.splitlines()
+            if re.match(r"^\s*(?:[-*]|\d+[.)])\s+\S", line)
+        ]
+    unique = list(dict.fromkeys(q.strip() for q in questions))
+    return unique[:limit]
+
+
+def add_findings(
+    current: t.Optional[t.List[t.Dict[str, t.Any]]],
+    update: t.Optional[t.List[t.Dict[str, t.Any]]],
+) -> t.List[t.Dict[str, t.Any]]:
+    """State reducer for findings: parallel tasks append, ``None`` clears."""
+    if update is None:
+        return []
+    return (current or []) + update
+
+
+class AnalysisTimer:
+    """Wall-clock time of each analysis phase, from "ANALYZE CODE" to the hand-back."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.started: t.Optional[float] = None
+        self.phases: t.List[t.Tuple[str, float, int]] = []
+
+    def start(self) -> None:
+        with self.lock:
+            self.started = time.perf_counter()
+
+    def finish(self, mode: str, questions: int = 0) -> None:
+        with self.lock:
+            if self.started is None:
+                return
+            self.phases.append((mode, time.perf_counter() - self.started, questions))
+            self.started = None
+
+    def report(self) -> str:
+        with self.lock:
+            phases = list(self.phases)
+        if not phases:
+            return "no analysis phases"
+        lines = []
+        for mode in sorted({phase[0] for phase in phases}):
+            seconds = [phase[1] for phase in phases if phase[0] == mode]
+            questions = sum(phase[2] for phase in phases if phase[0] == mode)
+            line = (
+                f"{mode}: {len(seconds)} phases, mean {statistics.mean(seconds):.1f}s, "
+                f"total {sum(seconds):.1f}s"
+            )
+            if questions:
+                line += f", {questions} questions"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def compact_report(findings: t.Sequence[t.Dict[str, t.Any]]) -> str:
+    """One message with the answer to every question, each cut to MAX_ANSWER_CHARS."""
+    parts = [f"Findings for {len(findings)} questions analysed in parallel:"]
+    for number, finding in enumerate(findings, 1):
+        answer = finding["answer"].strip()
+        if len(answer) > MAX_ANSWER_CHARS:
+            answer = answer[:MAX_ANSWER_CHARS] + " ..."
+        parts.append(f"{number}. {finding['question']}\n{answer}")
+    parts.append("ANALYSIS COMPLETE")
+    return "\n\n".join(parts)
+
+
+def fan_out(questions: t.Sequence[str]) -> t.List[Send]:
+    return [Send("answer_question", {"question": question}) for question in questions]
+
+
+def add_fanout_analysis(
+    workflow: StateGraph,
+    analyzer_name: str,
+    return_to: str,
+    worker_agent: Runnable,
+    tool_node: Runnable,
+    timer: AnalysisTimer,
+    max_parallel: int = MAX_PARALLEL,
+    max_turns: int = MAX_WORKER_TURNS,
+) -> None:
+    """Add the ``answer_question`` and ``merge_findings`` nodes to `workflow`.
+
+    The graph state needs a ``findings`` key reduced with `add_findings`; route
+    to the questions with ``fan_out(parse_questions(...))``.
+    """
+    slots = threading.BoundedSemaphore(max_parallel)
+
+    def answer_question(task: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        question = task["question"]
+        with slots:
+            start = time.perf_counter()
+            messages: t.List[t.Any] = [HumanMessage(content=question)]
+            tool_calls = 0
+            answer = f"No answer within {max_turns} turns."
+            try:
+                for _ in range(max_turns):
+                    response = worker_agent.invoke({"messages": messages})
+                    messages.append(response)
+                    if not response.tool_calls:
+                        answer = content_text(response.content)
+                        break
+                    tool_calls += len(response.tool_calls)
+                    messages.extend(tool_node.invoke({"messages": messages})["messages"])
+            except Exception:
+                answer = f"Analysis failed: {traceback.format_exc(limit=1)}"
+            seconds = time.perf_counter() - start
+        finding = {"question": question, "answer": answer, "tool_calls": tool_calls, "seconds": seconds}
+        return {"findings": [finding]}
+
+    def merge_findings(state: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        findings = state.get("findings") or []
+        timer.finish("parallel", questions=len(findings))
+        return {
+            "messages": [AIMessage(content=compact_report(findings), name=analyzer_name)],
+            "sender": analyzer_name,
+            "findings": None,
+        }
+
+    workflow.add_node("answer_question", answer_question)
+    workflow.add_node("merge_findings", merge_findings)
+    workflow.add_edge("answer_question", "merge_findings")
+    workflow.add_edge("merge_findings", return_to)
+
+
+def benchmark(questions: int, llm_latency: float, tool_latency: float, max_parallel: int) -> None:
+    """Time one analysis phase answered serially and with the fan-out."""
+    names = [f"Class{i}" for i in range(questions)]
+
+    def get_class_info(class_name: str) -> t.Dict[str, t.Any]:
+        time.sleep(tool_latency)
+        return {"successful": True, "data": {"class": class_name, "path": "module.py"}, "error": None}
+
+    tool_node = ToolNode([StructuredTool.from_function(
+        get_class_info, name="GET_CLASS_INFO", description="Look up a class."
+    )])
+
+    class State(t.TypedDict):
+        messages: t.Annotated[list, operator.add]
+        sender: str
+        findings: t.Annotated[list, add_findings]
+
+    # Serial: the analyzer looks up one class per turn until it has seen them all
+    def serial_turn(state: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        time.sleep(llm_latency)
+        seen = sum(isinstance(m, ToolMessage) for m in state["messages"])
+        if seen < len(names):
+            call = {"name": "GET_CLASS_INFO", "args": {"class_name": names[seen]}, "id": f"call_{seen}"}
+            return {"messages": [AIMessage(content="", tool_calls=[call])]}
+        return {"messages": [AIMessage(content="ANALYSIS COMPLETE")]}
+
+    serial = StateGraph(State)
+    serial.add_node("analyzer", serial_turn)
+    serial.add_node("tools", tool_node)
+    serial.add_edge(START, "analyzer")
+    serial.add_conditional_edges(
+        "analyzer", lambda s: "tools" if s["messages"][-1].tool_calls else END
+    )
+    serial.add_edge("tools", "analyzer")
+
+    # Fan-out: one turn to list the questions, then a short loop per question
+    def fanout_turn(state: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        time.sleep(llm_latency)
+        return {"messages": [AIMessage(content=f"{QUESTIONS_MARKER}\n{json.dumps(names)}")]}
+
+    def worker_turn(prompt: t.Dict[str, t.Any]) -> AIMessage:
+        time.sleep(llm_latency)
+        messages = prompt["messages"]
+        if isinstance(messages[-1], ToolMessage):
+            return AIMessage(content="Defined in module.py.")
+        call = {"name": "GET_CLASS_INFO", "args": {"class_name": messages[0].content}, "id": "call_0"}
+        return AIMessage(content="", tool_calls=[call])
+
+    timer = AnalysisTimer()
+    fanout = StateGraph(State)
+    fanout.add_node("analyzer", fanout_turn)
+    fanout.add_node("done", lambda state: {})
+    fanout.add_edge(START, "analyzer")
+    fanout.add_conditional_edges(
+        "analyzer", lambda s: fan_out(parse_questions(s["messages"][-1].content, len(names)))
+    )
+    add_fanout_analysis(
+        fanout, "analyzer", "done", RunnableLambda(worker_turn), tool_node, timer, max_parallel
+    )
+    fanout.add_edge("done", END)
+
+    start = time.perf_counter()
+    serial.compile().invoke({"messages": [HumanMessage(content="Analyse the classes")]})
+    serial_seconds = time.perf_counter() - start
+    timer.start()
+    fanout.compile().invoke({"messages": [HumanMessage(content="Analyse the classes")]})
+    fanout_seconds = timer.phases[-1][1]
+
+    print(
+        f"{questions} questions, {llm_latency}s per model turn, {tool_latency}s per tool call, "
+        f"{max_parallel} in parallel"
+    )
+    print(f"Serial loop: {serial_seconds:.2f}s ({questions + 1} model turns in sequence)")
+    print(f"Fan-out:     {fanout_seconds:.2f}s ({fanout_seconds / serial_seconds:.0%} of serial)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare serial and fan-out code analysis.")
+    parser.add_argument("--questions", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Seconds per model turn")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="Seconds per tool call")
+    parser.add_argument("--max-parallel", type=int, default=MAX_PARALLEL)
+    args = parser.parse_args()
+    benchmark(args.questions, args.llm_latency, args.tool_latency, args.max_parallel)
@@ -0,0 +1,301 @@
+"""Windowed file views for the Editor.
+
+Files are memory-mapped once and indexed by line offset, so jumping to a line
+or a symbol slices the mapping directly instead of re-reading and scrolling
+through the file. Each view remembers what the agent last saw, which lets a
+re-read return only the regions that changed since then.
+"""
+
+import argparse
+import bisect
+import difflib
+import mmap
+import os
+import random
+import re
+import typing as t
+from array import array
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+
+from metrics import count_tokens
+
+
+DEFAULT_WINDOW = int(os.environ.get("FILE_VIEW_WINDOW", "60"))
+
+# Window size of FILETOOL_OPEN_FILE / FILETOOL_SCROLL, used for the comparison.
+SCROLL_WINDOW = 100
+
+
+class MappedFile:
+    """A memory-mapped file with a line-offset index."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._stat: t.Optional[t.Tuple[int, int]] = None
+        self._mm: t.Optional[mmap.mmap] = None
+        self.offsets = array("Q")
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Remap the file if it changed on disk, return whether it did."""
+        stat = self.path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return False
+        if self._mm is not None:
+            self._mm.close()
+        self._stat = key
+        self.offsets = array("Q", [0])
+        if stat.st_size == 0:
+            self._mm = None
+            return True
+        with self.path.open("rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        find = self._mm.find
+        pos = find(b"\n")
+        while pos != -1:
+            self.offsets.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+        if self.offsets[-1] == stat.st_size:
+            self.offsets.pop()
+        return True
+
+    @property
+    def line_count(self) -> int:
+        return 0 if self._mm is None else len(self.offsets)
+
+    def _span(self, start: int, end: int) -> t.Tuple[int, int]:
+        lo = self.offsets[start - 1]
+        hi = self.offsets[end] if end < len(self.offsets) else len(self._mm)  # type: ignore
+        return lo, hi
+
+    def lines(self, start: int, end: int) -> t.List[str]:
+        """Lines `start..end` (1-based, inclusive)."""
+        start, end = max(1, start), min(self.line_count, end)
+        if self._mm is None or start > end:
+            return []
+        lo, hi = self._span(start, end)
+        with memoryview(self._mm)[lo:hi] as view:
+            return bytes(view).decode("utf-8", errors="replace").splitlines()
+
+    def line_hashes(self) -> t.List[int]:
+        if self._mm is None:
+            return []
+        with memoryview(self._mm) as view:
+            return [
+                hash(view[lo:hi].tobytes())
+                for lo, hi in zip(
+                    self.offsets, [*self.offsets[1:], len(self._mm)]
+                )
+            ]
+
+    def line_of(self, offset: int) -> int:
+        return bisect.bisect_right(self.offsets, offset)
+
+    def find_symbol(self, symbol: str) -> t.Optional[int]:
+        """Line of the `def`/`class` for `symbol`, which may be `Class.method`."""
+        if self._mm is None:
+            return None
+        start = 0
+        for part in symbol.split("."):
+            pattern = re.compile(
+                rb"^[ \t]*(?:async[ \t]+)?(?:def|class)[ \t]+"
+                + re.escape(part.encode())
+                + rb"\b",
+                re.MULTILINE,
+            )
+            match = pattern.search(self._mm, start)  # type: ignore[call-overload]
+            if match is None:
+                return None
+            start = match.start()
+        return self.line_of(start)
+
+
+class FileViewer:
+    """Per-run file views rooted at a local repository directory."""
+
+    def __init__(self, root: t.Union[str, Path], window: int = DEFAULT_WINDOW) -> None:
+        self.root = Path(root).resolve()
+        self.window = window
+        self._files: t.Dict[Path, MappedFile] = {}
+        self._seen: t.Dict[Path, t.List[int]] = {}
+
+    def _open(self, file_path: str) -> MappedFile:
+        path = (self.root / file_path).resolve()
+        if self.root not in path.parents and path != self.root:
+            raise ValueError(f"{file_path} is outside of {self.root}")
+        mapped = self._files.get(path)
+        if mapped is None:
+            mapped = self._files[path] = MappedFile(path)
+        else:
+            mapped.refresh()
+        return mapped
+
+    @staticmethod
+    def _numbered(mapped: MappedFile, start: int, end: int) -> str:
+        width = len(str(end))
+        return "\n".join(
+            f"{number:>{width}}: {line}"
+            for number, line in enumerate(mapped.lines(start, end), start)
+        )
+
+    def _render(
+        self, file_path: str, mapped: MappedFile, start: int, end: int
+    ) -> str:
+        start, end = max(1, start), min(mapped.line_count, end)
+        body = self._numbered(mapped, start, end)
+        header = f"[File: {file_path} ({mapped.line_count} lines total)]"
+        above = f"({start - 1} more lines above)\n" if start > 1 else ""
+        below = (
+            f"\n({mapped.line_count - end} more lines below)"
+            if end < mapped.line_count
+            else ""
+        )
+        return f"{header}\n{above}{body}{below}"
+
+    def view(
+        self, file_path: str, line: int = 1, window: t.Optional[int] = None
+    ) -> str:
+        """Window of `window` lines around `line`."""
+        mapped = self._open(file_path)
+        size = window or self.window
+        start = max(1, line - size // 4)
+        self._seen[mapped.path] = mapped.line_hashes()
+        return self._render(file_path, mapped, start, start + size - 1)
+
+    def goto_symbol(
+        self, file_path: str, symbol: str, window: t.Optional[int] = None
+    ) -> str:
+        """Window starting at the definition of `symbol`."""
+        line = self._open(file_path).find_symbol(symbol)
+        if line is None:
+            raise ValueError(f"Symbol {symbol} not found in {file_path}")
+        return self.view(file_path, line, window)
+
+    def changes(self, file_path: str, context: int = 3) -> str:
+        """Regions changed since the last view of `file_path`."""
+        mapped = self._open(file_path)
+        current = mapped.line_hashes()
+        previous = self._seen.get(mapped.path)
+        self._seen[mapped.path] = current
+        if previous is None:
+            return self.view(file_path)
+
+        hunks = []
+        matcher = difflib.SequenceMatcher(a=previous, b=current, autojunk=False)
+        for group in matcher.get_grouped_opcodes(context):
+            start, end = group[0][3] + 1, group[-1][4]
+            removed = sum(i2 - i1 for tag, i1, i2, _, _ in group if tag != "equal")
+            if end < start:
+                hunks.append(f"@@ {removed} line(s) removed before line {start} @@")
+                continue
+            hunks.append(
+                f"@@ lines {start}-{end}, {removed} line(s) replaced @@\n"
+                + self._numbered(mapped, start, end)
+            )
+        if not hunks:
+            return f"[File: {file_path}] No changes since the last view."
+        return f"[File: {file_path} ({mapped.line_count} lines total)]\n" + "\n".join(
+            hunks
+        )
+
+
+def get_file_view_tools(viewer: FileViewer) -> t.List[StructuredTool]:
+    """File view tools used alongside the FILETOOL actions."""
+
+    def _call(func: t.Callable[..., str], *args: t.Any) -> t.Dict[str, t.Any]:
+        try:
+            return {"successful": True, "data": {"view": func(*args)}, "error": None}
+        except (OSError, ValueError) as e:
+            return {"successful": False, "data": {}, "error": str(e)}
+
+    def view_file(
+        file_path: str, line: int = 1, window: t.Optional[int] = None, thought: str = ""
+    ) -> t.Dict[str, t.Any]:
+        return _call(viewer.view, file_path, line, window)
+
+    def goto_symbol(
+        file_path: str, symbol: str, window: t.Optional[int] = None, thought: str = ""
+    ) -> t.Dict[str, t.Any]:
+        return _call(viewer.goto_symbol, file_path, symbol, window)
+
+    def view_changes(file_path: str, thought: str = "") -> t.Dict[str, t.Any]:
+        return _call(viewer.changes, file_path)
+
+    return [
+        StructuredTool.from_function(
+            view_file,
+            name="FILEVIEW_GOTO_LINE",
+            description="Show a window of the file (path relative to the repo "
+            "root) around `line`. `window` sets the number of lines shown.",
+        ),
+        StructuredTool.from_function(
+            goto_symbol,
+            name="FILEVIEW_GOTO_SYMBOL",
+            description="Show the file starting at the definition of a class, "
+            "function or method. Use `Class.method` for methods.",
+        ),
+        StructuredTool.from_function(
+            view_changes,
+            name="FILEVIEW_CHANGES",
+            description="Show only the regions of the file that changed since "
+            "you last viewed it, e.g. to check an edit.",
+        ),
+    ]
+
+
+def compare_with_scroll(root: Path, samples: int, window: int) -> None:
+    """Round-trips and tokens to reach random symbols: scroll flow vs views."""
+    viewer = FileViewer(root, window=window)
+    files = [p for p in root.rglob("*.py") if ".git" not in p.parts]
+    random.seed(0)
+    random.shuffle(files)
+    totals = {"scroll": [0, 0], "view": [0, 0]}
+    measured = 0
+    for file in files:
+        if measured >= samples:
+            break
+        rel = file.relative_to(root).as_posix()
+        mapped = MappedFile(file)
+        names = re.findall(
+            rb"^[ \t]*(?:def|class)[ \t]+(\w+)", file.read_bytes(), re.MULTILINE
+        )
+        if not names:
+            continue
+        symbol = random.choice(names).decode()
+        target = mapped.find_symbol(symbol) or 1
+
+        # open_file shows the first window, every scroll the next one
+        calls = 1 + max(0, (target - 1) // SCROLL_WINDOW)
+        tokens = 0
+        for call in range(calls):
+            start = call * SCROLL_WINDOW + 1
+            tokens += count_tokens(
+                viewer._render(rel, mapped, start, start + SCROLL_WINDOW - 1)
+            )
+        totals["scroll"][0] += calls
+        totals["scroll"][1] += tokens
+
+        totals["view"][0] += 1
+        totals["view"][1] += count_tokens(viewer.goto_symbol(rel, symbol))
+        measured += 1
+
+    print(f"Files sampled: {measured}, view window: {window} lines")
+    for flow, (calls, tokens) in totals.items():
+        print(
+            f"{flow:>6}: {calls} round-trips ({calls / max(measured, 1):.2f}/lookup), "
+            f"{tokens} tokens ({tokens / max(measured, 1):.0f}/lookup)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare file views with the open/scroll flow."
+    )
+    parser.add_argument("--root", type=Path, required=True, help="Repository root")
+    parser.add_argument("--samples", type=int, default=100, help="Symbols to reach")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Lines")
+    args = parser.parse_args()
+    compare_with_scroll(args.root.resolve(), args.samples, args.window)
@@ -1,10 +1,6 @@
-import re
 import typing as t
-from pathlib import Path
 
-from composio import Action
-
-from agent import composio_toolset
+from issue_cache import IssueCache
 
 
 InputType = t.TypeVar("InputType")
@@ -32,26 +28,15 @@ def _github_repository_name_validator(name: str) -> t.Tuple[str, str]:
     return owner, name
 
 
-def _create_github_issue_validator(owner: str, name: str) -> t.Callable[[str], str]:
+def _create_github_issue_validator(
+    owner: str, name: str, cache: t.Optional[IssueCache] = None
+) -> t.Callable[[str], str]:
     """Create a github issue validator."""
+    cache = cache or IssueCache()
 
     def _github_issue_validator(value: str) -> str:
-        """Validate github issue."""
-        if Path(value).resolve().exists():
-            return Path(value).read_text(encoding="utf-8")
-
-        if re.match(r"^\d+$", value):
-            response_data = composio_toolset.execute_action(
-                action=Action.GITHUB_ISSUES_GET,
-                params={
-                    "owner": owner,
-                    "repo": name,
-                    "issue_number": int(value),
-                },
-            ).get("response_data")
-            return response_data["body"]
-
-        return value
+        """Validate github issue: a file path, an issue number or a description."""
+        return cache.resolve(f"{owner}/{name}", value)
 
     return _github_issue_validator
 
@@ -0,0 +1,147 @@
+"""On-disk cache of GitHub issues for interactive and batch runs.
+
+Issues are stored as ``issues/{owner}__{repo}/{number}/{updated_at}.json``
+under the agent cache directory, so an edited issue gets a new entry while
+older runs stay reproducible. Lookups are conditional requests (ETag), which
+GitHub answers with 304 Not Modified and does not count against the rate
+limit. With ``offline=True`` only the cache is used.
+
+The API base URL comes from GITHUB_API_URL, e.g. a local stand-in such as
+fake_github_server.py, and GITHUB_TOKEN is sent when set.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from code_index import CACHE_DIR
+
+
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+
+
+class IssueNotCached(LookupError):
+    """Raised in offline mode when an issue is not in the cache."""
+
+
+def parse_issue_ref(value: t.Union[str, int]) -> t.Tuple[str, t.Union[int, str]]:
+    """Classify an issue input as ("number", n), ("file", path) or ("text", description)."""
+    if isinstance(value, int) or re.match(r"^\d+$", str(value).strip()):
+        return "number", int(value)
+    if len(str(value)) < 4096 and Path(str(value)).expanduser().is_file():
+        return "file", str(Path(str(value)).expanduser())
+    return "text", str(value)
+
+
+class IssueCache:
+    """GitHub issues cached by (owner, repo, number, updated_at)."""
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        api_url: str = GITHUB_API_URL,
+        offline: bool = False,
+        token: t.Optional[str] = None,
+    ) -> None:
+        self.root = cache_dir / "issues"
+        self.api_url = api_url.rstrip("/")
+        self.offline = offline
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        token = token or os.environ.get("GITHUB_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.stats = {"cached": 0, "not_modified": 0, "fetched": 0, "stale": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _dir(self, owner: str, repo: str, number: int) -> Path:
+        return self.root / f"{owner}__{repo}" / str(number)
+
+    def latest(self, owner: str, repo: str, number: int) -> t.Optional[t.Dict[str, t.Any]]:
+        """Most recently updated cached version of the issue, if any."""
+        entries = sorted(self._dir(owner, repo, number).glob("*.json"))
+        if not entries:
+            return None
+        return json.loads(entries[-1].read_text(encoding="utf-8"))
+
+    def store(self, owner: str, repo: str, number: int, issue: t.Dict[str, t.Any]) -> Path:
+        directory = self._dir(owner, repo, number)
+        directory.mkdir(parents=True, exist_ok=True)
+        # ISO timestamps sort chronologically; ':' is not allowed in file names everywhere
+        path = directory / f"{issue['updated_at'].replace(':', '-')}.json"
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(issue, handle)
+        os.replace(tmp, path)
+        return path
+
+    def get(self, owner: str, repo: str, number: int) -> t.Dict[str, t.Any]:
+        """The issue as returned by the GitHub API, plus the ETag it was served with."""
+        cached = self.latest(owner, repo, number)
+        if self.offline:
+            if cached is None:
+                raise IssueNotCached(f"{owner}/{repo}#{number} is not in {self.root}")
+            self._count("cached")
+            return cached
+
+        headers = {}
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        try:
+            response = self.session.get(
+                f"{self.api_url}/repos/{owner}/{repo}/issues/{number}",
+                headers=headers,
+                timeout=30,
+            )
+            if response.status_code == 304 and cached is not None:
+                self._count("not_modified")
+                return cached
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if cached is None:
+                raise
+            print(f"Using cached {owner}/{repo}#{number}, GitHub lookup failed: {e}")
+            self._count("stale")
+            return cached
+
+        issue = response.json()
+        issue["etag"] = response.headers.get("ETag")
+        self.store(owner, repo, number, issue)
+        self._count("fetched")
+        return issue
+
+    def resolve(self, repo: str, value: t.Union[str, int]) -> str:
+        """Issue description for an issue number, a description file or a description."""
+        kind, ref = parse_issue_ref(value)
+        if kind == "file":
+            return Path(str(ref)).read_text(encoding="utf-8")
+        if kind == "text":
+            return str(ref)
+        owner, name = repo.split("/")
+        issue = self.get(owner, name, int(ref))
+        return f"{issue['title']}\n\n{issue.get('body') or ''}"
+
+    def resolve_many(
+        self, entries: t.Sequence[t.Tuple[str, t.Union[str, int]]], workers: int = 8
+    ) -> t.List[t.Union[str, Exception]]:
+        """Resolve `(repo, issue)` pairs concurrently; failures are returned, not raised."""
+
+        def resolve(entry: t.Tuple[str, t.Union[str, int]]) -> t.Union[str, Exception]:
+            try:
+                return self.resolve(*entry)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(resolve, entries))
@@ -0,0 +1,480 @@
+"""Local process-based workspace with the toolset interface of ComposioToolSet.
+
+``LocalToolSet`` serves the FILETOOL and SHELLTOOL actions the agents use
+from a plain directory on this machine: no container start, no image pull
+and no exec round-trip per action. File actions are confined to the
+workspace directory and shell commands run in it with a timeout and optional
+CPU, memory and file size limits. This keeps runaway commands in check but is
+not a security boundary; use the Docker workspace for untrusted code.
+
+Select it with WORKSPACE_BACKEND=local.
+
+    python local_workspace.py --repo /path/to/local/repo [--docker]
+
+runs the same action sequence on a local workspace (and a Docker workspace
+with --docker) and compares startup time and per-action latency.
+"""
+
+import argparse
+import fnmatch
+import os
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import typing as t
+import uuid
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+
+from code_index import CACHE_DIR
+
+
+WORKSPACE_BACKEND = os.environ.get("WORKSPACE_BACKEND", "docker")
+WINDOW = 100
+MAX_SEARCH_FILES = 50
+MAX_OUTPUT_CHARS = 50_000
+_CWD_MARKER = "__LOCAL_WORKSPACE_CWD__"
+
+_workspaces: t.Dict[str, "LocalWorkspace"] = {}
+_workspaces_lock = threading.Lock()
+
+
+def local_repo(repo: str) -> t.Optional[Path]:
+    """The absolute local path `repo` names, if it is written as one (`/`, `./`, `../` or `~`); else None.
+
+    An ``owner/name`` slug is never read from disk, even when such a relative path exists.
+    """
+    if repo.startswith(("/", "./", "../", "~")):
+        return Path(repo).expanduser().resolve()
+    return None
+
+
+def action_name(action: t.Any) -> str:
+    """Name of a Composio Action or App member, or of a plain string."""
+    for attribute in ("slug", "name"):
+        value = getattr(action, attribute, None)
+        if isinstance(value, str):
+            return value.upper()
+    return str(action).split(".")[-1].upper()
+
+
+class LocalWorkspace:
+    """A directory that stands in for the /home/user of a container workspace."""
+
+    def __init__(
+        self,
+        home: t.Optional[Path] = None,
+        id: t.Optional[str] = None,
+        timeout: float = 300,
+        cpu_seconds: t.Optional[int] = None,
+        memory_mb: t.Optional[int] = None,
+        file_size_mb: t.Optional[int] = None,
+    ) -> None:
+        self.id = id or uuid.uuid4().hex
+        if home is None:
+            (CACHE_DIR / "workspaces").mkdir(parents=True, exist_ok=True)
+            home = Path(tempfile.mkdtemp(prefix="ws-", dir=CACHE_DIR / "workspaces"))
+        self.home = Path(home).resolve()
+        self.cwd = self.home
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.file_size_mb = file_size_mb
+        self.open_file: t.Optional[Path] = None
+        self.window_start = 1
+        with _workspaces_lock:
+            _workspaces[self.id] = self
+
+    def path(self, value: str) -> Path:
+        """`value` resolved against the current directory; it must stay in the workspace."""
+        path = (self.cwd / Path(value).expanduser()).resolve()
+        if path != self.home and self.home not in path.parents:
+            raise ValueError(f"{value} is outside of the workspace {self.home}")
+        return path
+
+    def _ulimits(self) -> str:
+        """bash `ulimit` commands for the configured limits.
+
+        Set by the shell rather than with `preexec_fn`, which is not safe when
+        attempts run commands from several threads.
+        """
+        limits = []
+        if self.cpu_seconds:
+            limits.append(f"ulimit -t {self.cpu_seconds}")
+        if self.memory_mb:
+            limits.append(f"ulimit -v {self.memory_mb * 1024}")
+        if self.file_size_mb:
+            # bash counts file sizes in 1024-byte blocks
+            limits.append(f"ulimit -f {self.file_size_mb * 1024}")
+        return "".join(f"{limit} || exit 1\n" for limit in limits)
+
+    def run(self, cmd: str) -> t.Dict[str, t.Any]:
+        """Run `cmd` with bash in the current directory; `cd` carries over to the next call."""
+        script = f'{self._ulimits()}{cmd}\n__rc=$?\nprintf "\\n{_CWD_MARKER}%s\\n" "$PWD"\nexit $__rc\n'
+        env = {**os.environ, "HOME": str(self.home), "PWD": str(self.cwd)}
+        proc = subprocess.Popen(
+            ["bash", "-c", script],
+            cwd=self.cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            start_new_session=True,
+        )
+        try:
+            stdout, stderr = proc.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            stdout, stderr = proc.communicate()
+            stderr += f"\nCommand timed out after {self.timeout}s"
+        marker = stdout.rfind(f"\n{_CWD_MARKER}")
+        if marker != -1:
+            new_cwd = stdout[marker + len(_CWD_MARKER) + 1 :].strip()
+            stdout = stdout[:marker]
+            try:
+                self.cwd = self.path(new_cwd)
+            except ValueError:
+                stderr += f"\nStaying in {self.cwd}: {new_cwd} is outside of the workspace"
+        return {
+            "stdout": stdout[-MAX_OUTPUT_CHARS:],
+            "stderr": stderr[-MAX_OUTPUT_CHARS:],
+            "exit_code": proc.returncode,
+            "current_working_directory": str(self.cwd),
+        }
+
+    def git(self, *args: str, cwd: t.Optional[Path] = None) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=cwd or self.cwd, check=True, capture_output=True, text=True
+        ).stdout
+
+    def close(self, remove: bool = True) -> None:
+        """Forget the workspace and, unless `remove` is off, delete its directory."""
+        with _workspaces_lock:
+            _workspaces.pop(self.id, None)
+        if remove:
+            shutil.rmtree(self.home, ignore_errors=True)
+
+
+def get_workspace(workspace_id: str) -> LocalWorkspace:
+    """A workspace created earlier in this process, by id."""
+    with _workspaces_lock:
+        workspace = _workspaces.get(workspace_id)
+    if workspace is None:
+        raise ValueError(f"No local workspace with id {workspace_id}")
+    return workspace
+
+
+def _numbered(lines: t.Sequence[str], start: int) -> str:
+    return "\n".join(f"{number}: {line}" for number, line in enumerate(lines, start))
+
+
+class _FileActions:
+    """FILETOOL and SHELLTOOL actions, with Composio's parameter names."""
+
+    def __init__(self, workspace: LocalWorkspace) -> None:
+        self.ws = workspace
+
+    def _window(self) -> t.Dict[str, t.Any]:
+        path = self.ws.open_file
+        assert path is not None
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        start = max(1, min(self.ws.window_start, max(1, len(lines) - WINDOW + 1)))
+        self.ws.window_start = start
+        return {
+            "message": f"File {path.relative_to(self.ws.home)} opened, {len(lines)} lines total",
+            "lines": _numbered(lines[start - 1 : start - 1 + WINDOW], start),
+            "total_lines": len(lines),
+        }
+
+    def FILETOOL_OPEN_FILE(self, file_path: str, line_number: int = 0) -> t.Dict[str, t.Any]:
+        """Open a file and show 100 lines starting near `line_number`."""
+        path = self.ws.path(file_path)
+        if not path.is_file():
+            raise ValueError(f"File not found: {file_path}")
+        self.ws.open_file = path
+        self.ws.window_start = max(1, line_number - 10) if line_number else 1
+        return self._window()
+
+    def FILETOOL_SCROLL(self, direction: str = "down", lines: int = WINDOW) -> t.Dict[str, t.Any]:
+        """Scroll the open file up or down by `lines` lines."""
+        if self.ws.open_file is None:
+            raise ValueError("No file is open; use FILETOOL_OPEN_FILE first")
+        step = lines if direction == "down" else -lines
+        self.ws.window_start = max(1, self.ws.window_start + step)
+        return self._window()
+
+    def FILETOOL_EDIT_FILE(
+        self, file_path: str, text: str, start_line: int, end_line: int
+    ) -> t.Dict[str, t.Any]:
+        """Replace lines `start_line..end_line` (1-based, inclusive) of a file with `text`."""
+        path = self.ws.path(file_path)
+        original = path.read_text(encoding="utf-8")
+        lines = original.splitlines(keepends=True)
+        if not 1 <= start_line <= end_line + 1 or start_line > len(lines) + 1:
+            raise ValueError(f"Invalid line range {start_line}-{end_line} for {len(lines)} lines")
+        new_lines = [line + "\n" for line in text.splitlines()]
+        updated = "".join(lines[: start_line - 1] + new_lines + lines[end_line:])
+        if path.suffix == ".py":
+            try:
+                compile(updated, str(path), "exec")
+            except SyntaxError as e:
+                raise ValueError(f"Edit not applied, it causes a syntax error: {e}") from e
+        path.write_text(updated, encoding="utf-8")
+        context = updated.splitlines()[max(0, start_line - 4) : start_line - 1 + len(new_lines) + 3]
+        return {"updated_text": _numbered(context, max(1, start_line - 3))}
+
+    def FILETOOL_CREATE_FILE(self, path: str, is_directory: bool = False) -> t.Dict[str, t.Any]:
+        """Create an empty file or a directory."""
+        target = self.ws.path(path)
+        if is_directory:
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.touch()
+        return {"path": str(target)}
+
+    def FILETOOL_WRITE(self, file_path: str, text: str) -> t.Dict[str, t.Any]:
+        """Overwrite a file with `text`."""
+        path = self.ws.path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        return {"message": f"Wrote {len(text)} characters to {file_path}"}
+
+    def _files(self, root: Path) -> t.Iterator[Path]:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d != ".git")
+            for name in sorted(filenames):
+                yield Path(dirpath) / name
+
+    def FILETOOL_FIND_FILE(self, pattern: str, depth: t.Optional[int] = None) -> t.Dict[str, t.Any]:
+        """Find files whose name or relative path matches a glob pattern."""
+        found = []
+        for path in self._files(self.ws.cwd):
+            relative = path.relative_to(self.ws.cwd)
+            if depth is not None and len(relative.parts) > depth:
+                continue
+            if fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(relative.as_posix(), pattern):
+                found.append(relative.as_posix())
+                if len(found) >= 200:
+                    break
+        return {"results": found}
+
+    def FILETOOL_SEARCH_WORD(
+        self, word: str, pattern: t.Optional[str] = None, case_insensitive: bool = False
+    ) -> t.Dict[str, t.Any]:
+        """Search files (optionally matching a glob pattern) for a word."""
+        regex = re.compile(re.escape(word), re.IGNORECASE if case_insensitive else 0)
+        results: t.Dict[str, t.List[t.Tuple[int, str]]] = {}
+        for path in self._files(self.ws.cwd):
+            relative = path.relative_to(self.ws.cwd).as_posix()
+            if pattern and not (fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(relative, pattern)):
+                continue
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (UnicodeDecodeError, OSError):
+                continue
+            if word not in text and not case_insensitive:
+                continue
+            matches = [(n, line.strip()) for n, line in enumerate(text.splitlines(), 1) if regex.search(line)]
+            if matches:
+                results[relative] = matches[:20]
+                if len(results) >= MAX_SEARCH_FILES:
+                    break
+        return {"results": results, "message": f"{word} found in {len(results)} files"}
+
+    def FILETOOL_LIST_FILES(self) -> t.Dict[str, t.Any]:
+        """List the files and directories of the current directory."""
+        entries = sorted(self.ws.cwd.iterdir())
+        return {
+            "current_working_directory": str(self.ws.cwd),
+            "files": [e.name for e in entries if e.is_file()],
+            "directories": [e.name for e in entries if e.is_dir()],
+        }
+
+    def FILETOOL_CHANGE_WORKING_DIRECTORY(self, path: str) -> t.Dict[str, t.Any]:
+        """Change the current directory."""
+        target = self.ws.path(path)
+        if not target.is_dir():
+            raise ValueError(f"Not a directory: {path}")
+        self.ws.cwd = target
+        return {"current_working_directory": str(target)}
+
+    def FILETOOL_GIT_REPO_TREE(self) -> t.Dict[str, t.Any]:
+        """List the files tracked in the git repository of the current directory."""
+        return {"tree": self.ws.git("ls-files")}
+
+    def FILETOOL_GIT_PATCH(self) -> t.Dict[str, t.Any]:
+        """Patch of all changes in the git repository of the current directory, new files included."""
+        self.ws.git("add", "-A")
+        patch = self.ws.git("diff", "--cached")
+        self.ws.git("reset", "--quiet")
+        return {"patch": patch}
+
+    def FILETOOL_GIT_CLONE(
+        self, repo_name: str, destination: t.Optional[str] = None, commit_id: str = ""
+    ) -> t.Dict[str, t.Any]:
+        """Clone owner/name from GitHub, or a local repository path, into the workspace."""
+        local = local_repo(repo_name)
+        source = str(local) if local is not None else f"https://github.com/{repo_name}.git"
+        target = self.ws.path(destination or (local.name if local is not None else repo_name.split("/")[-1]))
+        command = ["clone", "--quiet"]
+        mirror = CACHE_DIR / "mirrors" / f"{repo_name.replace('/', '__')}.git"
+        if mirror.exists():
+            # Borrow objects from the code index mirror instead of downloading them again
+            command += ["--reference-if-able", str(mirror)]
+        self.ws.git(*command, source, str(target), cwd=self.ws.home)
+        if commit_id:
+            self.ws.git("checkout", "--quiet", commit_id, cwd=target)
+        self.ws.cwd = target
+        return {"path": str(target)}
+
+    def SHELLTOOL_EXEC_COMMAND(self, cmd: str) -> t.Dict[str, t.Any]:
+        """Run a shell command in the workspace; the working directory carries over."""
+        return self.ws.run(cmd)
+
+
+APPS = {
+    "FILETOOL": [name for name in dir(_FileActions) if name.startswith("FILETOOL_")],
+    "SHELLTOOL": ["SHELLTOOL_EXEC_COMMAND"],
+}
+
+
+class LocalToolSet:
+    """Drop-in for ComposioToolSet's workspace actions on a LocalWorkspace."""
+
+    def __init__(self, workspace: t.Optional[LocalWorkspace] = None, **kwargs: t.Any) -> None:
+        # Composio-only options (metadata, processors, ...) have no local meaning
+        self.workspace = workspace or LocalWorkspace()
+        self._actions = _FileActions(self.workspace)
+
+    def set_workspace_id(self, workspace_id: str) -> None:
+        """Attach to a workspace created earlier in this process."""
+        self.workspace = get_workspace(workspace_id)
+        self._actions = _FileActions(self.workspace)
+
+    def execute_action(self, action: t.Any, params: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        name = action_name(action)
+        method = getattr(self._actions, name, None)
+        if method is None or not name.startswith(("FILETOOL_", "SHELLTOOL_")):
+            return {"successful": False, "data": {}, "error": f"{name} is not available locally"}
+        params = {k: v for k, v in params.items() if k != "thought"}
+        try:
+            return {"successful": True, "data": method(**params), "error": None}
+        except (OSError, ValueError, TypeError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, "stderr", None) or str(e)
+            return {"successful": False, "data": {}, "error": str(detail).strip()}
+
+    def _tool(self, name: str) -> StructuredTool:
+        # The schema comes from the action's signature; calls go through execute_action
+        # so the tool follows the toolset to another workspace
+        method = getattr(self._actions, name)
+        tool = StructuredTool.from_function(method, name=name, description=method.__doc__)
+        tool.func = lambda **params: self.execute_action(name, params)
+        return tool
+
+    def get_actions(self, actions: t.Sequence[t.Any]) -> t.List[StructuredTool]:
+        tools = []
+        for action in actions:
+            name = action_name(action)
+            if not hasattr(_FileActions, name):
+                raise ValueError(f"{name} is not available in a local workspace")
+            tools.append(self._tool(name))
+        return tools
+
+    def get_tools(self, apps: t.Sequence[t.Any]) -> t.List[StructuredTool]:
+        """Tools of the local apps; other apps are skipped with a warning."""
+        tools = []
+        for app in apps:
+            names = APPS.get(action_name(app))
+            if names is None:
+                print(f"{action_name(app)} is not available in a local workspace, skipping it")
+                continue
+            tools.extend(self._tool(name) for name in names)
+        return tools
+
+
+def close_workspace(toolset: t.Any) -> None:
+    """Shut down the workspace of a LocalToolSet or a ComposioToolSet."""
+    if isinstance(toolset, LocalToolSet):
+        toolset.workspace.close()
+        return
+    from composio import WorkspaceFactory
+
+    WorkspaceFactory.close(id=toolset.workspace.id)
+
+
+def _time_actions(
+    toolset: t.Any, actions: t.Sequence[t.Tuple[t.Any, t.Dict[str, t.Any]]]
+) -> t.List[t.Tuple[str, float, bool]]:
+    timings = []
+    for name, params in actions:
+        start = time.perf_counter()
+        result = toolset.execute_action(action=name, params=params)
+        timings.append((action_name(name), time.perf_counter() - start, bool(result.get("successful"))))
+    return timings
+
+
+def benchmark(repo: str, docker: bool) -> None:
+    """Startup and per-action latency of the same action sequence per backend."""
+    local = local_repo(repo)
+    name = local.name if local is not None else repo.split("/")[-1]
+    sequence = [
+        ("FILETOOL_GIT_REPO_TREE", {}),
+        ("FILETOOL_LIST_FILES", {}),
+        ("FILETOOL_FIND_FILE", {"pattern": "*.py"}),
+        ("FILETOOL_SEARCH_WORD", {"word": "def "}),
+        ("SHELLTOOL_EXEC_COMMAND", {"cmd": "git log --oneline -1"}),
+        ("FILETOOL_CREATE_FILE", {"path": "bench_note.txt"}),
+        ("FILETOOL_WRITE", {"file_path": "bench_note.txt", "text": "one\ntwo\n"}),
+        ("FILETOOL_OPEN_FILE", {"file_path": "bench_note.txt"}),
+        ("FILETOOL_EDIT_FILE", {"file_path": "bench_note.txt", "text": "TWO", "start_line": 2, "end_line": 2}),
+        ("FILETOOL_GIT_PATCH", {}),
+    ]
+    results = {}
+
+    start = time.perf_counter()
+    local = LocalToolSet()
+    clone = local.execute_action("FILETOOL_GIT_CLONE", {"repo_name": repo})
+    if not clone["successful"]:
+        raise SystemExit(f"Clone failed: {clone['error']}")
+    results["local"] = (time.perf_counter() - start, _time_actions(local, sequence))
+    local.workspace.close()
+
+    if docker:
+        from composio_langgraph import Action, ComposioToolSet, WorkspaceType
+
+        start = time.perf_counter()
+        toolset = ComposioToolSet(workspace_config=WorkspaceType.Docker())
+        toolset.execute_action(action=Action.FILETOOL_GIT_CLONE, params={"repo_name": repo})
+        toolset.execute_action(
+            action=Action.FILETOOL_CHANGE_WORKING_DIRECTORY, params={"path": f"/home/user/{name}"}
+        )
+        startup = time.perf_counter() - start
+        results["docker"] = (
+            startup,
+            _time_actions(toolset, [(getattr(Action, n), p) for n, p in sequence]),
+        )
+
+    for backend, (startup, timings) in results.items():
+        total = sum(seconds for _, seconds, _ in timings)
+        failed = [n for n, _, ok in timings if not ok]
+        print(f"{backend}: startup incl. clone {startup:.2f}s, {len(timings)} actions in {total * 1000:.0f}ms")
+        for action, seconds, ok in timings:
+            print(f"  {action:<34} {seconds * 1000:8.1f}ms{'' if ok else '  (failed)'}")
+        if failed:
+            print(f"  failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare local and Docker workspace latency.")
+    parser.add_argument("--repo", required=True, help="owner/name on GitHub, or a local git repo path starting with /, ./, ../ or ~")
+    parser.add_argument("--docker", action="store_true", help="Also time a Docker workspace")
+    args = parser.parse_args()
+    benchmark(args.repo, args.docker)
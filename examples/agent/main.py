@@ -1,35 +1,173 @@
-from inputs import from_github
+"""Run the SWE agent on one issue interactively, or on a manifest of issues.
+
+    python main.py
+    python main.py --manifest issues.jsonl --workers 4 --out patches
+
+Each manifest line is {"repo": "owner/name", "issue": ...}, where the issue is
+an issue number, a description, or a path to a file with the description.
+All issues are resolved up front, concurrently, through the on-disk issue
+cache; --offline uses only the cache, and --github-api-url points lookups at
+another server such as fake_github_server.py.
+"""
+
+import argparse
+import json
+import os
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from langchain_core.messages import HumanMessage
+from langgraph.errors import GraphRecursionError
 
-from composio_langgraph import Action
+from composio_langgraph import Action, ComposioToolSet, WorkspaceType
 
-from agent import composio_toolset, graph
+from agent import get_agent_graph
+from inputs import from_github
+from issue_cache import GITHUB_API_URL, IssueCache
+from local_workspace import WORKSPACE_BACKEND, LocalToolSet, close_workspace
 
 
-def main() -> None:
-    """Run the agent."""
-    repo, issue = from_github()
+def run_agent(repo: str, issue: str) -> str:
+    """Clone `repo` into a new workspace, run the agent on `issue` and return the patch."""
+    if WORKSPACE_BACKEND == "local":
+        workspace_toolset = LocalToolSet()
+    else:
+        workspace_toolset = ComposioToolSet(workspace_config=WorkspaceType.Docker())
     try:
-        final_state = graph.invoke(
-            {"messages": [HumanMessage(content=f"{issue} in the repo: {repo}")]},
-            {"recursion_limit": 50},
+        response = workspace_toolset.execute_action(
+            action=Action.FILETOOL_GIT_CLONE,
+            params={"repo_name": repo},
         )
+        if not response.get("successful", False):
+            raise RuntimeError(f"Cloning {repo} failed: {response.get('error') or 'unknown error'}")
+        graph, composio_toolset, run_file = get_agent_graph(
+            repo_name=repo.split("/")[-1],
+            workspace_id=workspace_toolset.workspace.id,
+        )
+        try:
+            final_state = graph.invoke(
+                {"messages": [HumanMessage(content=f"{issue} in the repo: {repo}")]},
+                {"recursion_limit": 50},
+            )
+            print(final_state["messages"][-1].content)
+        except GraphRecursionError as e:
+            print(f"GraphRecursionError: {e}")
+        finally:
+            if os.path.exists(run_file):
+                os.remove(run_file)
 
-        print(final_state["messages"][-1].content)
-        return final_state["messages"][-1].content
-    except Exception as e:
-        print(e)
-    response = composio_toolset.execute_action(
-        action=Action.FILETOOL_GIT_PATCH,
-        params={},
-    )
-    if response.get("error") and len(response["error"]) > 0:
-        print("Error:", response["error"])
-    elif response.get("patch"):
-        print("=== Generated Patch ===\n" + response["patch"])
+        response = composio_toolset.execute_action(
+            action=Action.FILETOOL_GIT_PATCH,
+            params={},
+        )
+        if not response.get("successful", False):
+            raise RuntimeError(response.get("error") or "Unknown error in get_patch")
+        return (response.get("data") or {}).get("patch") or ""
+    finally:
+        # One workspace per issue; with --workers they would pile up otherwise
+        close_workspace(workspace_toolset)
+
+
+def main() -> None:
+    """Run the agent."""
+    repo, issue = from_github()
+    patch = run_agent(repo, issue)
+    if patch:
+        print("=== Generated Patch ===\n" + patch)
     else:
         print("No output available")
 
 
+def read_manifest(path: Path) -> t.List[t.Dict[str, t.Any]]:
+    """Manifest entries from a JSON list or a JSONL file."""
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for entry in entries:
+        if "/" not in entry.get("repo", "") or "issue" not in entry:
+            raise ValueError(f"Manifest entries need repo (owner/name) and issue: {entry}")
+    return entries
+
+
+def batch(
+    manifest: Path,
+    out_dir: Path,
+    workers: int,
+    cache: IssueCache,
+    resolve_only: bool = False,
+) -> None:
+    """Resolve all issues of `manifest`, then run the agent on them with `workers` threads."""
+    entries = read_manifest(manifest)
+    start = time.perf_counter()
+    resolved = cache.resolve_many(
+        [(entry["repo"], entry["issue"]) for entry in entries], workers=8
+    )
+    print(
+        f"Resolved {len(entries)} issues in {time.perf_counter() - start:.2f}s "
+        f"({', '.join(f'{k} {v}' for k, v in cache.stats.items())})"
+    )
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results: t.List[t.Dict[str, t.Any]] = []
+    runnable = []
+    for entry, issue in zip(entries, resolved):
+        name = f"{entry['repo'].replace('/', '__')}-{entry.get('id', entry['issue'])}"
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)[:100]
+        if isinstance(issue, Exception):
+            results.append({"name": name, "repo": entry["repo"], "status": "unresolved", "error": str(issue)})
+        else:
+            runnable.append((name, entry["repo"], issue))
+    if resolve_only:
+        for name, repo, _ in runnable:
+            results.append({"name": name, "repo": repo, "status": "resolved"})
+        runnable = []
+
+    def run(item: t.Tuple[str, str, str]) -> t.Dict[str, t.Any]:
+        name, repo, issue = item
+        started = time.perf_counter()
+        try:
+            patch = run_agent(repo, issue)
+            status, error = ("patched" if patch else "no_patch"), None
+        except Exception as e:
+            patch, status, error = "", "error", str(e)
+        (out_dir / f"{name}.patch").write_text(patch, encoding="utf-8")
+        seconds = round(time.perf_counter() - started, 1)
+        print(f"{name}: {status} in {seconds}s")
+        return {"name": name, "repo": repo, "status": status, "error": error, "seconds": seconds}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results.extend(executor.map(run, runnable))
+
+    summary = {"manifest": str(manifest), "seconds": round(time.perf_counter() - start, 1), "results": results}
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    counts: t.Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print(f"Done in {summary['seconds']}s: {counts}")
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the SWE agent.")
+    parser.add_argument("--manifest", type=Path, default=None, help="JSON/JSONL list of issues")
+    parser.add_argument("--out", type=Path, default=Path("patches"), help="Patch directory")
+    parser.add_argument("--workers", type=int, default=2, help="Agent runs in parallel")
+    parser.add_argument("--offline", action="store_true", help="Only use cached issues")
+    parser.add_argument("--github-api-url", default=GITHUB_API_URL)
+    parser.add_argument(
+        "--resolve-only", action="store_true", help="Fill the issue cache without running the agent"
+    )
+    args = parser.parse_args()
+    if args.manifest is None:
+        main()
+    else:
+        batch(
+            args.manifest,
+            args.out,
+            args.workers,
+            IssueCache(api_url=args.github_api_url, offline=args.offline),
+            args.resolve_only,
+        )
@@ -0,0 +1,275 @@
+"""Route agent steps to small or large models from the watsonx catalog.
+
+Cheap steps (summaries, routing decisions, short tool-argument generation) go
+to a small, fast model and only planning and patch writing use a large one.
+Routes are read from model_routes.json, which is generated from models.json:
+
+    python model_router.py generate --models ../../models.json
+
+Every call is recorded per route, so latency and token usage can be compared.
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from metrics import count_tokens, percentile
+
+
+ROUTES_FILE = Path(__file__).with_name("model_routes.json")
+
+DEFAULT_SMALL = "ibm/granite-3-2-8b-instruct"
+DEFAULT_LARGE = "meta-llama/llama-3-3-70b-instruct"
+
+# Models in the catalog that are not general chat/instruct models
+EXCLUDED = re.compile(r"guard|vision|flan-")
+
+DEFAULT_ROUTES = {
+    "summary": {"tiers": ["small", "large"], "escalate_above_tokens": 6000},
+    "routing": {"tiers": ["small"]},
+    "tool_args": {"tiers": ["small", "large"], "escalate_above_tokens": 6000},
+    "planning": {"tiers": ["large"]},
+    "patch": {"tiers": ["large"]},
+}
+
+
+def model_size(model_id: str) -> t.Optional[float]:
+    """Parameter count in billions parsed from a model id, e.g. 8x7b -> 56."""
+    name = model_id.split("/")[-1]
+    match = re.search(r"(\d+)x(\d+)b", name)
+    if match:
+        return float(int(match.group(1)) * int(match.group(2)))
+    sizes = re.findall(r"(?:^|-)(\d+(?:\.\d+)?)b(?:-|$)", name)
+    return float(sizes[-1]) if sizes else None
+
+
+def generate_config(
+    models_file: Path, small: str = DEFAULT_SMALL, large: str = DEFAULT_LARGE
+) -> t.Dict[str, t.Any]:
+    """Build the routing config from the model catalog in models.json."""
+    # models.json is a python-style list literal rather than strict JSON
+    catalog = ast.literal_eval(models_file.read_text(encoding="utf-8"))
+    models = {}
+    for model_id in catalog:
+        if EXCLUDED.search(model_id):
+            continue
+        size = model_size(model_id)
+        models[model_id] = {
+            "size_b": size,
+            "tier": "small" if size is not None and size <= 8 else "large",
+        }
+    for tier, model_id in (("small", small), ("large", large)):
+        if model_id not in models:
+            raise ValueError(f"{model_id} is not a chat model in {models_file}")
+        if models[model_id]["tier"] != tier:
+            raise ValueError(f"{model_id} is not a {tier} model")
+    return {
+        "provider": {
+            "type": "watsonx",
+            "url": "https://us-south.ml.cloud.ibm.com",
+        },
+        "tiers": {
+            "small": {"model_id": small, "max_tokens": 1024},
+            "large": {"model_id": large, "max_tokens": 4096},
+        },
+        "routes": DEFAULT_ROUTES,
+        "models": models,
+    }
+
+
+class RouteStats(BaseCallbackHandler):
+    """Records latency and token usage of every call made through a route."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: t.Dict[str, t.List[t.Tuple[str, float, int, int]]] = {}
+        self._started: t.Dict[t.Any, t.Tuple[str, str, float]] = {}
+
+    def on_chat_model_start(
+        self, serialized: t.Dict[str, t.Any], messages: t.Any, *, run_id: t.Any, **kwargs: t.Any
+    ) -> None:
+        metadata = kwargs.get("metadata") or {}
+        self._started[run_id] = (
+            metadata.get("route", "unknown"),
+            metadata.get("route_model", "unknown"),
+            time.perf_counter(),
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        route, model_id, start = started
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        with self.lock:
+            self.calls.setdefault(route, []).append(
+                (model_id, time.perf_counter() - start, input_tokens, output_tokens)
+            )
+
+    def on_llm_error(self, error: BaseException, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        self._started.pop(run_id, None)
+
+    def report(self) -> str:
+        lines = []
+        with self.lock:
+            for route, calls in sorted(self.calls.items()):
+                latencies = [call[1] for call in calls]
+                models = sorted({call[0] for call in calls})
+                lines.append(
+                    f"{route}: {len(calls)} calls via {', '.join(models)}; "
+                    f"latency mean {sum(latencies) / len(latencies):.2f}s "
+                    f"p95 {percentile(latencies, 95):.2f}s; "
+                    f"tokens in {sum(c[2] for c in calls)} out {sum(c[3] for c in calls)}"
+                )
+        return "\n".join(lines)
+
+
+class ModelRouter:
+    """Picks a model per route and prompt size and keeps one client per model."""
+
+    def __init__(self, config: t.Dict[str, t.Any]) -> None:
+        self.config = config
+        self.stats = RouteStats()
+        self._clients: t.Dict[str, BaseChatModel] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path = ROUTES_FILE) -> "ModelRouter":
+        config = json.loads(path.read_text(encoding="utf-8"))
+        # Point every route at another OpenAI-compatible server, e.g. a local fake
+        base_url = os.environ.get("MODEL_ROUTER_BASE_URL")
+        if base_url:
+            config["provider"] = {"type": "openai", "base_url": base_url}
+        return cls(config)
+
+    def tier_for(self, route: str, prompt_tokens: int = 0) -> str:
+        spec = self.config["routes"][route]
+        tiers = spec["tiers"]
+        threshold = spec.get("escalate_above_tokens")
+        if threshold is not None and prompt_tokens > threshold and len(tiers) > 1:
+            return tiers[1]
+        return tiers[0]
+
+    def _client(self, tier: str) -> BaseChatModel:
+        spec = self.config["tiers"][tier]
+        model_id = spec["model_id"]
+        with self._lock:
+            client = self._clients.get(model_id)
+            if client is None:
+                client = self._clients[model_id] = self._create_client(
+                    model_id, spec.get("max_tokens", 1024)
+                )
+        return client
+
+    def _create_client(self, model_id: str, max_tokens: int) -> BaseChatModel:
+        provider = self.config["provider"]
+        if provider["type"] == "openai":
+            from langchain_openai import ChatOpenAI
+
+            return ChatOpenAI(
+                model=model_id,
+                base_url=provider["base_url"],
+                api_key=os.environ.get("OPENAI_API_KEY", "not-needed"),
+                temperature=0,
+                max_completion_tokens=max_tokens,
+            )
+
+        from langchain_ibm import ChatWatsonx
+
+        return ChatWatsonx(
+            model_id=model_id,
+            url=provider["url"],
+            project_id=os.environ["WATSONX_PROJECT_ID"],
+            apikey=os.environ["WATSONX_APIKEY"],
+            params={"max_tokens": max_tokens, "temperature": 0},
+        )
+
+    def runnable(
+        self, route: str, tools: t.Optional[t.Sequence[t.Any]] = None
+    ) -> Runnable:
+        """Runnable that picks the model for `route` on every call by prompt size."""
+
+        def call(prompt: t.Any, config: RunnableConfig) -> t.Any:
+            text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+            tier = self.tier_for(route, count_tokens(text))
+            model = self._client(tier)
+            llm = model.bind_tools(tools) if tools else model
+            # Keep the caller's handlers, e.g. prompt cache stats, next to the route stats
+            callbacks = config.get("callbacks")
+            if isinstance(callbacks, BaseCallbackManager):
+                callbacks = callbacks.copy()
+                callbacks.add_handler(self.stats)
+            else:
+                callbacks = [*(callbacks or []), self.stats]
+            return llm.invoke(
+                prompt,
+                {
+                    **config,
+                    "callbacks": callbacks,
+                    "metadata": {
+                        **config.get("metadata", {}),
+                        "route": route,
+                        "route_model": self.config["tiers"][tier]["model_id"],
+                    },
+                },
+            )
+
+        return RunnableLambda(call, name=f"route:{route}")
+
+    def invoke(self, route: str, messages: t.Any, config: t.Optional[RunnableConfig] = None) -> t.Any:
+        return self.runnable(route).invoke(messages, config)
+
+
+_router: t.Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Process-wide router, so stats cover every graph and judge call."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter.from_file()
+        return _router
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model routing configuration.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate = subparsers.add_parser("generate", help="Write model_routes.json")
+    generate.add_argument("--models", type=Path, default=Path("../../models.json"))
+    generate.add_argument("--small", default=DEFAULT_SMALL)
+    generate.add_argument("--large", default=DEFAULT_LARGE)
+    generate.add_argument("--out", type=Path, default=ROUTES_FILE)
+    show = subparsers.add_parser("show", help="Print the route table")
+    show.add_argument("--config", type=Path, default=ROUTES_FILE)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        config = generate_config(args.models, args.small, args.large)
+        args.out.write_text(json.dumps(config, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.out} with {len(config['models'])} models")
+    else:
+        router = ModelRouter.from_file(args.config)
+        for route, spec in router.config["routes"].items():
+            models = [router.config["tiers"][tier]["model_id"] for tier in spec["tiers"]]
+            threshold = spec.get("escalate_above_tokens")
+            escalation = f" (escalates above {threshold} tokens)" if threshold else ""
+            print(f"{route}: {' -> '.join(models)}{escalation}")
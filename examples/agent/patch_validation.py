@@ -0,0 +1,262 @@
+"""Check candidate patches against the repo's own tests before judging them.
+
+One test set is selected at ``base_commit_id`` from the files touched by any
+of the candidates, so every patch is measured by the same tests. Each patch
+is then applied to a fresh worktree of ``base_commit_id`` taken from a local
+git repository (the shared code index mirror or any checkout), and pytest
+runs on all patches in parallel processes with a timeout per patch. Nothing
+is fetched, so this works offline once the mirror or checkout exists.
+
+    python patch_validation.py --repo-dir ~/src/django --commit abc123 p1.diff p2.diff
+
+Tests run with VALIDATION_PYTHON (default: this interpreter), which needs the
+repository's dependencies installed. Runs that fail to collect or import, and
+repositories that do not run their tests with pytest (django's runtests.py),
+are "unknown" rather than failed.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from worktrees import add_worktree, remove_worktree
+
+
+VALIDATION_PYTHON = os.environ.get("VALIDATION_PYTHON", sys.executable)
+TEST_TIMEOUT = 300
+MAX_TEST_FILES = 20
+
+# Statuses of a validation; only "passed" counts as a pass
+PASSED = "passed"
+FAILED = "failed"
+APPLY_FAILED = "apply_failed"
+TIMEOUT = "timeout"
+NO_TESTS = "no_tests"
+# The tests could not run here, e.g. missing dependencies; says nothing about the patch
+UNKNOWN = "unknown"
+
+# Test runners other than pytest, relative to the repo root
+CUSTOM_RUNNERS = ("tests/runtests.py",)
+_COLLECTION_ERRORS = re.compile(
+    r"(?:errors? during collection|ERROR collecting|ImportError|ModuleNotFoundError)"
+)
+
+
+def touched_files(patch: str) -> t.List[str]:
+    """Paths changed by a unified diff, in the new tree."""
+    paths = []
+    for match in re.finditer(r"^diff --git a/(\S+) b/(\S+)$", patch, re.MULTILINE):
+        paths.append(match.group(2))
+    return list(dict.fromkeys(paths))
+
+
+def is_test_file(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py") or "/tests/" in f"/{path}"
+    )
+
+
+def module_name(path: str) -> str:
+    """Dotted module name of a source file, without a leading src/ or lib/ directory."""
+    parts = path[: -len(".py")].split("/")
+    if parts[0] in ("src", "lib") and len(parts) > 1:
+        parts = parts[1:]
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def select_tests(root: Path, changed: t.Sequence[str], limit: int = MAX_TEST_FILES) -> t.List[str]:
+    """Test files changed by the patch, named after a changed module, or importing one."""
+    selected = [path for path in changed if is_test_file(path) and (root / path).exists()]
+    modules = [module_name(path) for path in changed if path.endswith(".py") and not is_test_file(path)]
+    if not modules:
+        return selected[:limit]
+
+    stems = {module.rsplit(".", 1)[-1] for module in modules}
+    patterns = []
+    for module in modules:
+        package, _, name = module.rpartition(".")
+        patterns.append(rf"^\s*(?:from\s+{re.escape(module)}\s+import|import\s+{re.escape(module)}\b)")
+        if package:
+            patterns.append(rf"^\s*from\s+{re.escape(package)}\s+import\s+[^\n]*\b{re.escape(name)}\b")
+    imports = re.compile("|".join(patterns), re.MULTILINE)
+
+    by_name, by_import = [], []
+    for file in sorted(root.rglob("*.py")):
+        path = file.relative_to(root).as_posix()
+        if ".git" in file.parts or not is_test_file(path) or path in selected:
+            continue
+        stem = file.stem[len("test_"):] if file.stem.startswith("test_") else file.stem
+        if stem.removesuffix("_test") in stems:
+            by_name.append(path)
+        elif imports.search(file.read_text(encoding="utf-8", errors="replace")):
+            by_import.append(path)
+    return (selected + by_name + by_import)[:limit]
+
+
+def _git(repo: Path, *args: str, **kwargs: t.Any) -> subprocess.CompletedProcess:
+    return subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True, **kwargs)
+
+
+def _run_tests(root: Path, tests: t.Sequence[str], timeout: float) -> t.Tuple[str, str]:
+    """Run pytest on `tests` in `root`; the whole process group is killed on timeout."""
+    env = {**os.environ, "PYTHONPATH": str(root), "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.Popen(
+        [VALIDATION_PYTHON, "-m", "pytest", "-q", "-x", "-p", "no:cacheprovider", *tests],
+        cwd=root,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        output, _ = proc.communicate()
+        return TIMEOUT, output
+    if proc.returncode == 0:
+        return PASSED, output
+    if proc.returncode == 5:
+        return NO_TESTS, output
+    # 2: interrupted, usually by collection errors; 3: internal error; 4: usage error
+    if proc.returncode in (2, 3, 4) or _COLLECTION_ERRORS.search(output):
+        return UNKNOWN, output
+    return FAILED, output
+
+
+def validate_patch(
+    repo: Path,
+    commit: str,
+    patch: str,
+    timeout: float = TEST_TIMEOUT,
+    tests: t.Optional[t.Sequence[str]] = None,
+) -> t.Dict[str, t.Any]:
+    """Apply `patch` to a worktree of `commit` in the local repo `repo` and run `tests`.
+
+    Without `tests`, the tests related to the patch's own files are selected.
+    """
+    start = time.perf_counter()
+    changed = touched_files(patch)
+    result: t.Dict[str, t.Any] = {"files": changed, "tests": [], "status": APPLY_FAILED, "output": ""}
+    workdir = Path(tempfile.mkdtemp(prefix="validate-"))
+    worktree = workdir / "repo"
+    try:
+        try:
+            add_worktree(repo, worktree, commit)
+        except subprocess.CalledProcessError as e:
+            result.update(status="error", output=e.stderr)
+            return result
+        patch_file = workdir / "candidate.diff"
+        patch_file.write_text(patch if patch.endswith("\n") else patch + "\n", encoding="utf-8")
+        applied = _git(worktree, "apply", "--whitespace=nowarn", str(patch_file))
+        if applied.returncode != 0:
+            result["output"] = applied.stderr
+            return result
+        if any((worktree / runner).exists() for runner in CUSTOM_RUNNERS):
+            result.update(status=UNKNOWN, output="The repository does not run its tests with pytest")
+            return result
+        result["tests"] = list(tests) if tests is not None else select_tests(worktree, changed)
+        if not result["tests"]:
+            result["status"] = NO_TESTS
+            return result
+        result["status"], output = _run_tests(worktree, result["tests"], timeout)
+        result["output"] = output[-4000:]
+        return result
+    finally:
+        remove_worktree(repo, worktree)
+        shutil.rmtree(workdir, ignore_errors=True)
+        result["seconds"] = round(time.perf_counter() - start, 2)
+
+
+def validate_patches(
+    repo: Path,
+    commit: str,
+    patches: t.Sequence[str],
+    timeout: float = TEST_TIMEOUT,
+    workers: int = 3,
+) -> t.List[t.Dict[str, t.Any]]:
+    """Validate all `patches` concurrently with the same tests, one pytest process per patch."""
+    tests = shared_tests(repo, commit, patches)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(
+            executor.map(lambda patch: validate_patch(repo, commit, patch, timeout, tests), patches)
+        )
+
+
+def shared_tests(repo: Path, commit: str, patches: t.Sequence[str]) -> t.List[str]:
+    """Tests at `commit` related to the files touched by any of `patches`.
+
+    Test files that only exist in one candidate's tree are left out, since the
+    other candidates cannot run them.
+    """
+    changed = list(dict.fromkeys(path for patch in patches for path in touched_files(patch)))
+    workdir = Path(tempfile.mkdtemp(prefix="select-"))
+    worktree = workdir / "repo"
+    try:
+        add_worktree(repo, worktree, commit)
+        return select_tests(worktree, changed)
+    except subprocess.CalledProcessError:
+        return []
+    finally:
+        remove_worktree(repo, worktree)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def comparable(validations: t.Sequence[t.Dict[str, t.Any]]) -> bool:
+    """True when every patch ran the same non-empty tests to a pass or a failure."""
+    if not validations or not validations[0]["tests"]:
+        return False
+    return all(
+        v["tests"] == validations[0]["tests"] and v["status"] in (PASSED, FAILED)
+        for v in validations
+    )
+
+
+def summary(validations: t.Sequence[t.Dict[str, t.Any]]) -> str:
+    """One line per patch, for logs and the judging prompt."""
+    lines = []
+    for number, validation in enumerate(validations, 1):
+        tests = ", ".join(validation["tests"]) or "none"
+        lines.append(
+            f"Patch {number}: {validation['status']} in {validation.get('seconds', 0)}s "
+            f"(files: {', '.join(validation['files']) or 'none'}; tests: {tests})"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the related tests of candidate patches.")
+    parser.add_argument("patches", type=Path, nargs="+", help="Unified diff files")
+    parser.add_argument("--repo-dir", type=Path, required=True, help="Local git repo or mirror")
+    parser.add_argument("--commit", required=True, help="Base commit id")
+    parser.add_argument("--timeout", type=float, default=TEST_TIMEOUT, help="Seconds per patch")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print the pytest output")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = validate_patches(
+        args.repo_dir,
+        args.commit,
+        [path.read_text(encoding="utf-8") for path in args.patches],
+        args.timeout,
+        args.workers,
+    )
+    print(summary(results))
+    if args.verbose:
+        for path, result in zip(args.patches, results):
+            print(f"\n=== {path} ===\n{result['output']}")
+    print(f"Validated {len(results)} patches in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,91 @@
+"""Cacheable prompt prefixes for the agents and cache hit reporting.
+
+Every agent turn resends the same system prompt and tool schemas, followed by
+the growing conversation. The system prompt is passed as a fixed message (not
+a template) and tools are bound in a fixed order, so the prefix is identical
+on every turn:
+
+- Anthropic models on Bedrock get explicit cache points on the system prompt,
+  which also covers the tool schemas sent before it, and on the latest
+  message, so the conversation so far is read from the cache on the next turn.
+- OpenAI caches prefixes of 1024 tokens or more automatically; it only needs
+  the prefix to be stable.
+- watsonx has no prompt caching, its calls are reported as uncached.
+"""
+
+import threading
+import typing as t
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import SystemMessage
+from langchain_core.outputs import LLMResult
+
+
+CACHE_POINT = {"type": "ephemeral"}
+
+# MODEL in agent.py -> provider with prompt caching, if any
+PROVIDERS = {"claude": "anthropic", "gpt-4o": "openai"}
+
+
+def system_message(text: str, provider: t.Optional[str]) -> SystemMessage:
+    """The system prompt as a fixed message, with a cache point for Anthropic."""
+    if provider == "anthropic":
+        return SystemMessage(
+            content=[{"type": "text", "text": text, "cache_control": CACHE_POINT}]
+        )
+    return SystemMessage(content=text)
+
+
+def cache_kwargs(provider: t.Optional[str]) -> t.Dict[str, t.Any]:
+    """Call kwargs that also cache the conversation up to the latest message."""
+    if provider == "anthropic":
+        return {"cache_control": CACHE_POINT}
+    return {}
+
+
+class PromptCacheStats(BaseCallbackHandler):
+    """Counts cached and uncached input tokens of one run, per agent."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # agent -> [calls, input tokens, cache reads, cache writes]
+        self.usage: t.Dict[str, t.List[int]] = {}
+        self._agents: t.Dict[t.Any, str] = {}
+
+    def on_chat_model_start(
+        self, serialized: t.Dict[str, t.Any], messages: t.Any, *, run_id: t.Any, **kwargs: t.Any
+    ) -> None:
+        self._agents[run_id] = (kwargs.get("metadata") or {}).get("agent", "unknown")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        agent = self._agents.pop(run_id, "unknown")
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                details = usage.get("input_token_details") or {}
+                with self.lock:
+                    totals = self.usage.setdefault(agent, [0, 0, 0, 0])
+                    totals[0] += 1
+                    totals[1] += usage.get("input_tokens", 0)
+                    totals[2] += details.get("cache_read", 0) or 0
+                    totals[3] += details.get("cache_creation", 0) or 0
+
+    def on_llm_error(self, error: BaseException, *, run_id: t.Any, **kwargs: t.Any) -> None:
+        self._agents.pop(run_id, None)
+
+    def report(self) -> str:
+        lines = []
+        with self.lock:
+            rows = sorted(self.usage.items())
+            rows.append(("total", [sum(row[1][i] for row in rows) for i in range(4)]))
+        for agent, (calls, input_tokens, cache_read, cache_creation) in rows:
+            uncached = input_tokens - cache_read - cache_creation
+            share = cache_read / input_tokens * 100 if input_tokens else 0.0
+            lines.append(
+                f"{agent}: {calls} calls, {input_tokens} input tokens, "
+                f"{cache_read} cached ({share:.0f}%), {cache_creation} written to cache, "
+                f"{uncached} uncached"
+            )
+        return "\n".join(lines)
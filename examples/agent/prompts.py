@@ -118,3 +118,48 @@ Your role is crucial in implementing the solutions devised by the Software Engin
 Once you have completed the editing, you have to respond with "EDITING COMPLETED".
 NOTE: YOU DON'T NEED TO CREATE TESTCASES FOR THE EDITS YOU MAKE. YOU JUST NEED TO MODIFY THE SOURCE CODE.
 """
+
+FILE_VIEW_PROMPT = """
+You also have FILEVIEW actions that are cheaper than OPEN_FILE and SCROLL:
+   - FILEVIEW_GOTO_LINE: Show a window of a file around a line, instead of scrolling to it.
+   - FILEVIEW_GOTO_SYMBOL: Show a file at the definition of a class, function or `Class.method`.
+   - FILEVIEW_CHANGES: After an edit, show only the regions that changed since you last viewed the file.
+Prefer these actions to navigate large files.
+"""
+
+BATCH_EDIT_PROMPT = """
+When a fix touches several locations, use FILETOOL_BATCH_EDIT to apply all of them in one call:
+   - Give every edit with "file_path", "text" and either "start_line"/"end_line" or a unique "anchor" snippet.
+   - Line numbers refer to the files as they are before the batch, so do not adjust them for earlier edits.
+   - If any edit is invalid nothing is written; fix the reported edit and resend the whole batch.
+"""
+
+EDITOR_PHASE_PROMPT = """
+You start with the read-only file tools. Once you know exactly which lines to change, call
+FILETOOL_START_EDITING; EDIT_FILE, CREATE_FILE, WRITE and the other editing tools are available from
+your next turn until you respond with "EDITING COMPLETED".
+"""
+
+TOOL_OUTPUT_PROMPT = """
+Large tool outputs are shortened to their first lines and stored under a handle:
+   - The shortened output ends with a note giving the handle and the total number of lines.
+   - Use TOOL_OUTPUT_READ with the handle, "start_line" and "end_line" to read the part you need.
+   - Do not repeat the original tool call to see more of its output.
+"""
+
+PARALLEL_ANALYSIS_PROMPT = """
+When you need to investigate several independent things (different classes, methods or files),
+you can have them analysed in parallel instead of one per turn:
+   - Respond with "PARALLEL QUESTIONS" followed by a JSON list of at most 6 self-contained questions, e.g.
+     PARALLEL QUESTIONS
+     ["What does QuerySet.filter do with negated Q objects?", "Which callers of Field.clean pass a model instance?"]
+   - Do not call any tool in the same message.
+   - Every question is answered by a separate analyzer with the same tools, and the combined
+     findings are handed to the Software Engineer as your analysis.
+"""
+
+QUESTION_ANALYZER_PROMPT = """
+You are a code analyzer answering one question about the codebase for the Software Engineer.
+Use the CODE_ANALYSIS_TOOL actions to find the answer, then reply with the answer only:
+at most 10 lines, naming the files, classes and methods involved. Do not suggest edits.
+"""
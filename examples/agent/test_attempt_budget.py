@@ -0,0 +1,64 @@
+import json
+import uuid
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from attempt_budget import DEFAULT_PRICE, AttemptBudget, SpendTracker, price_for, report
+
+
+def _call(tracker, model, input_tokens, output_tokens, cache_read=0):
+    run_id = uuid.uuid4()
+    tracker.on_chat_model_start({}, [], run_id=run_id, invocation_params={"model": model})
+    message = AIMessage(
+        "",
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cache_read},
+        },
+    )
+    tracker.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+
+def test_price_for():
+    assert price_for("gpt-4o-mini-2024") == (0.15, 0.6)
+    assert price_for("gpt-4o") == (2.5, 10.0)
+    assert price_for("something-else") == DEFAULT_PRICE
+
+
+def test_spend_tracker_counts_tokens_and_cache_reads():
+    tracker = SpendTracker()
+    _call(tracker, "claude-3-5-sonnet", 1_000_000, 0, cache_read=1_000_000)
+    _call(tracker, "gpt-4o", 0, 1_000_000)
+    assert tracker.calls == 2
+    assert tracker.tokens == 2_000_000
+    assert round(tracker.cost, 6) == 0.3 + 10.0
+
+
+def test_rounds_grow_until_the_limits():
+    budget = AttemptBudget(max_tokens=0, max_seconds=0, max_cost=0, max_attempts=2, max_rounds=3)
+    assert [budget.next_round() for _ in range(4)] == [1, 2, 2, 0]
+    assert budget.rounds == [1, 2, 2]
+
+
+def test_no_round_when_the_next_would_exceed_the_budget():
+    budget = AttemptBudget(max_tokens=1000, max_seconds=0, max_cost=0)
+    assert budget.next_round() == 1
+    _call(budget.spend, "granite", 300, 100)
+    # 400 tokens for one attempt, so two more would end at 1200
+    assert budget.next_round() == 0
+
+
+def test_record_and_report(tmp_path):
+    budget = AttemptBudget(max_tokens=0, max_seconds=0, max_cost=0)
+    budget.next_round()
+    _call(budget.spend, "gpt-4o", 1000, 100)
+    log = tmp_path / "spend.jsonl"
+    entry = budget.record("repo__1", patched=True, path=log)
+    assert json.loads(log.read_text()) == entry
+    assert entry["attempts"] == 1 and entry["input_tokens"] == 1000
+    text = report([entry, {**entry, "instance_id": "repo__2", "patched": False}], resolved={"repo__1"})
+    assert text.splitlines()[0].startswith("2 instances, 2 attempts, 2200 tokens")
+    assert text.splitlines()[2].startswith("resolved: 1")
@@ -0,0 +1,60 @@
+import pytest
+
+from batch_edit import BatchEditError, EditOperation, apply_edits, plan_edits
+
+
+def test_plan_edits_uses_original_line_numbers(tmp_path):
+    (tmp_path / "a.py").write_text("one\ntwo\nthree\nfour\n")
+    edits = [
+        EditOperation(file_path="a.py", start_line=1, end_line=1, text="ONE\nONE AND A HALF"),
+        EditOperation(file_path="a.py", start_line=3, end_line=3, text="THREE"),
+        EditOperation(file_path="a.py", anchor="four", text="FOUR"),
+    ]
+    (old, new), = plan_edits(tmp_path.resolve(), edits).values()
+    assert old == "one\ntwo\nthree\nfour\n"
+    assert new == "ONE\nONE AND A HALF\ntwo\nTHREE\nFOUR\n"
+
+
+@pytest.mark.parametrize(
+    "edit, message",
+    [
+        (EditOperation(file_path="a.py", anchor="x", text=""), "found 2 times"),
+        (EditOperation(file_path="a.py", start_line=3, end_line=9, text=""), "out of range"),
+        (EditOperation(file_path="a.py", text=""), "either an anchor"),
+        (EditOperation(file_path="missing.py", anchor="x", text=""), "does not exist"),
+        (EditOperation(file_path="../a.py", anchor="x", text=""), "outside of the repository"),
+    ],
+)
+def test_invalid_edits(tmp_path, edit, message):
+    (tmp_path / "a.py").write_text("x\nx\n")
+    with pytest.raises(BatchEditError, match=message):
+        plan_edits(tmp_path.resolve(), [edit])
+
+
+def test_overlapping_edits_write_nothing(tmp_path):
+    (tmp_path / "a.py").write_text("one\ntwo\n")
+    (tmp_path / "b.py").write_text("b\n")
+    edits = [
+        EditOperation(file_path="b.py", anchor="b", text="B"),
+        EditOperation(file_path="a.py", start_line=1, end_line=2, text="x"),
+        EditOperation(file_path="a.py", anchor="two", text="y"),
+    ]
+    with pytest.raises(BatchEditError, match="overlap"):
+        apply_edits(tmp_path, edits)
+    assert (tmp_path / "b.py").read_text() == "b\n"
+
+
+def test_line_endings_are_kept(tmp_path):
+    (tmp_path / "crlf.py").write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    (tmp_path / "lf.py").write_bytes(b"one\ntwo\n")
+    diff = apply_edits(
+        tmp_path,
+        [
+            EditOperation(file_path="crlf.py", start_line=2, end_line=2, text="TWO\nTWO AGAIN"),
+            EditOperation(file_path="crlf.py", anchor="three\n", text="THREE\n"),
+            EditOperation(file_path="lf.py", anchor="one", text="ONE"),
+        ],
+    )
+    assert (tmp_path / "crlf.py").read_bytes() == b"one\r\nTWO\r\nTWO AGAIN\r\nTHREE\r\n"
+    assert (tmp_path / "lf.py").read_bytes() == b"ONE\ntwo\n"
+    assert "-one\r\n" not in diff
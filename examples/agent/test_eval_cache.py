@@ -0,0 +1,93 @@
+import json
+import sys
+import types
+
+from eval_cache import MODEL_NAME, EvalCache, evaluate_predictions, normalise_patch, patch_hash
+
+PATCH = """diff --git a/calc.py b/calc.py
+index 1111111..2222222 100644
+--- a/calc.py
++++ b/calc.py
+@@ -1,2 +1,2 @@ def add(a, b):
+-    return a - b
++    return a + b
+"""
+
+
+def test_normalise_patch_ignores_git_formatting():
+    reformatted = PATCH.replace("index 1111111..2222222", "index abcdef0..1234567").replace(
+        " def add(a, b):", ""
+    )
+    assert normalise_patch(PATCH) == normalise_patch(reformatted.replace("\n", "\r\n"))
+    assert patch_hash(PATCH) == patch_hash(reformatted)
+
+
+def test_patch_hash_changes_with_the_change():
+    assert patch_hash(PATCH) != patch_hash(PATCH.replace("a + b", "b + a"))
+
+
+def test_put_get_and_prune(tmp_path):
+    cache = EvalCache(tmp_path, harness="swebench-test")
+    assert cache.get("repo__1", PATCH) is None
+    cache.put("repo__1", PATCH, {"resolved": True}, run_id="r1")
+    assert cache.get("repo__1", PATCH)["resolved"] is True
+
+    other = EvalCache(tmp_path, harness="swebench-new")
+    assert other.get("repo__1", PATCH) is None
+    assert len(other.prune(stale_harness=True, dry_run=True)) == 1
+    assert len(other.prune(stale_harness=True)) == 1
+    assert cache.get("repo__1", PATCH) is None
+
+
+def _fake_harness(monkeypatch, log_dir, resolved_patch):
+    """swebench stand-in that, like the real one, skips instances already reported for a run id."""
+    calls = []
+
+    def main(dataset_name, split, instance_ids, predictions_path, max_workers, open_file_limit,
+             run_id, timeout, rewrite_reports, modal, report_dir="."):
+        calls.append(run_id)
+        for prediction in json.loads(open(predictions_path).read()):
+            report = log_dir / run_id / MODEL_NAME / prediction["instance_id"] / "report.json"
+            if report.exists():
+                continue
+            report.parent.mkdir(parents=True)
+            resolved = prediction["model_patch"] == resolved_patch
+            report.write_text(json.dumps({prediction["instance_id"]: {"resolved": resolved}}))
+
+    constants = types.ModuleType("swebench.harness.constants")
+    constants.RUN_EVALUATION_LOG_DIR = log_dir
+    run_evaluation = types.ModuleType("swebench.harness.run_evaluation")
+    run_evaluation.main = main
+    for name, module in {
+        "swebench": types.ModuleType("swebench"),
+        "swebench.harness": types.ModuleType("swebench.harness"),
+        "swebench.harness.constants": constants,
+        "swebench.harness.run_evaluation": run_evaluation,
+    }.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    return calls
+
+
+def test_evaluate_predictions_uses_the_cache_and_a_fresh_run_id(tmp_path, monkeypatch):
+    calls = _fake_harness(monkeypatch, tmp_path / "harness", resolved_patch=PATCH)
+    cache = EvalCache(tmp_path / "cache", harness="swebench-test")
+    bad = PATCH.replace("a + b", "a * b")
+
+    def evaluate(patch):
+        prediction = {"instance_id": "repo__1", "model_patch": patch, "model_name_or_path": MODEL_NAME}
+        return evaluate_predictions([prediction], "run", "dataset", tmp_path, cache=cache)["repo__1"]
+
+    assert evaluate(bad) == {"resolved": False, "source": "harness"}
+    # Same run id, new patch: must not be scored from the first call's report
+    assert evaluate(PATCH) == {"resolved": True, "source": "harness"}
+    assert evaluate(PATCH) == {"resolved": True, "source": "cache"}
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert cache.get("repo__1", bad)["resolved"] is False
+
+
+def test_empty_patches_are_not_evaluated(tmp_path):
+    result = evaluate_predictions(
+        [{"instance_id": "repo__1", "model_patch": "", "model_name_or_path": MODEL_NAME}],
+        "run", "dataset", tmp_path, cache=EvalCache(tmp_path, harness="swebench-test"),
+    )
+    assert result == {"repo__1": {"resolved": False, "source": "empty"}}
@@ -0,0 +1,71 @@
+from patch_validation import (
+    FAILED,
+    PASSED,
+    UNKNOWN,
+    comparable,
+    is_test_file,
+    module_name,
+    select_tests,
+    touched_files,
+)
+
+PATCH = """diff --git a/src/pkg/calc.py b/src/pkg/calc.py
+--- a/src/pkg/calc.py
++++ b/src/pkg/calc.py
+@@ -1 +1 @@
+-x = 1
++x = 2
+diff --git a/tests/test_new.py b/tests/test_new.py
+new file mode 100644
+--- /dev/null
++++ b/tests/test_new.py
+@@ -0,0 +1 @@
++def test_x(): pass
+diff --git a/src/pkg/calc.py b/src/pkg/calc.py
+"""
+
+
+def test_touched_files_in_order_without_duplicates():
+    assert touched_files(PATCH) == ["src/pkg/calc.py", "tests/test_new.py"]
+    assert touched_files("") == []
+
+
+def test_is_test_file_and_module_name():
+    assert is_test_file("tests/helpers.py")
+    assert is_test_file("pkg/calc_test.py")
+    assert not is_test_file("pkg/calc.py")
+    assert module_name("src/pkg/calc.py") == "pkg.calc"
+    assert module_name("pkg/__init__.py") == "pkg"
+
+
+def _write(root, path, text=""):
+    file = root / path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(text)
+
+
+def test_select_tests_by_change_name_and_import(tmp_path):
+    _write(tmp_path, "pkg/calc.py")
+    _write(tmp_path, "tests/test_changed.py")
+    _write(tmp_path, "tests/test_calc.py")
+    _write(tmp_path, "tests/test_uses.py", "from pkg import calc\n")
+    _write(tmp_path, "tests/test_imports.py", "import pkg.calc\n")
+    _write(tmp_path, "tests/test_other.py", "import os\n")
+
+    selected = select_tests(tmp_path, ["tests/test_changed.py", "pkg/calc.py", "tests/test_gone.py"])
+    assert selected == [
+        "tests/test_changed.py",
+        "tests/test_calc.py",
+        "tests/test_imports.py",
+        "tests/test_uses.py",
+    ]
+    assert select_tests(tmp_path, ["pkg/calc.py"], limit=1) == ["tests/test_calc.py"]
+
+
+def test_comparable_needs_the_same_non_empty_tests_and_a_verdict():
+    ran = {"tests": ["tests/test_calc.py"], "status": PASSED}
+    assert comparable([ran, {**ran, "status": FAILED}])
+    assert not comparable([])
+    assert not comparable([{**ran, "tests": []}, {**ran, "tests": []}])
+    assert not comparable([ran, {**ran, "tests": ["tests/test_other.py"]}])
+    assert not comparable([ran, {**ran, "status": UNKNOWN}])
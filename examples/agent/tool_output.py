@@ -0,0 +1,173 @@
+"""Spill oversized tool outputs to disk and let the agent page through them.
+
+Repo trees, search results, opened files and shell output can be tens of
+kilobytes. Instead of keeping all of it in ``AgentState.messages`` and
+resending it on every later turn, outputs above a threshold are written to a
+content-addressed blob store and the ToolMessage keeps a short preview and a
+handle. TOOL_OUTPUT_READ returns any line range of a stored output.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import typing as t
+from pathlib import Path
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from code_index import CACHE_DIR
+
+
+SPILL_THRESHOLD = int(os.environ.get("TOOL_OUTPUT_SPILL_CHARS", "8000"))
+PREVIEW_LINES = 40
+PAGE_LINES = 200
+
+
+def _lines(content: str) -> t.List[str]:
+    """Tool output as lines; JSON results are flattened so multi-line values page well."""
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        return content.splitlines()
+    if not isinstance(parsed, (dict, list)):
+        return content.splitlines()
+
+    lines: t.List[str] = []
+
+    def walk(value: t.Any, path: str) -> None:
+        if isinstance(value, dict) and value:
+            for key, item in value.items():
+                walk(item, f"{path}.{key}" if path else str(key))
+        elif isinstance(value, list) and value and not all(
+            isinstance(item, (str, int, float)) and "\n" not in str(item) for item in value
+        ):
+            for index, item in enumerate(value):
+                walk(item, f"{path}[{index}]")
+        elif isinstance(value, str) and "\n" in value:
+            lines.append(f"{path}:")
+            lines.extend(value.splitlines())
+        else:
+            lines.append(f"{path}: {json.dumps(value)}")
+
+    walk(parsed, "")
+    return lines
+
+
+class ToolOutputStore:
+    """Content-addressed store of tool outputs that were too large for a message."""
+
+    def __init__(
+        self,
+        root: Path = CACHE_DIR / "tool_outputs",
+        threshold: int = SPILL_THRESHOLD,
+        preview_lines: int = PREVIEW_LINES,
+    ) -> None:
+        self.root = root
+        self.threshold = threshold
+        self.preview_lines = preview_lines
+        self.lock = threading.Lock()
+        self.spilled = 0
+        self.chars_kept_out = 0
+
+    def _path(self, handle: str) -> Path:
+        return self.root / handle[:2] / f"{handle}.txt"
+
+    def put(self, lines: t.Sequence[str]) -> str:
+        text = "\n".join(lines)
+        handle = hashlib.sha256(text.encode()).hexdigest()[:16]
+        path = self._path(handle)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle_file:
+                handle_file.write(text)
+            os.replace(tmp, path)
+        return handle
+
+    def read(self, handle: str, start_line: int = 1, end_line: t.Optional[int] = None) -> t.Tuple[t.List[str], int]:
+        """Lines `start_line..end_line` (1-based, inclusive) and the total line count."""
+        if not handle.isalnum():
+            raise ValueError(f"Invalid handle {handle}")
+        path = self._path(handle)
+        if not path.exists():
+            raise ValueError(f"No stored output with handle {handle}")
+        lines = path.read_text(encoding="utf-8").splitlines()
+        end_line = min(len(lines), end_line or start_line + PAGE_LINES - 1)
+        return lines[max(0, start_line - 1) : end_line], len(lines)
+
+    def spill(self, content: str, tool_name: str) -> str:
+        """`content` itself if it is small, otherwise a preview with a handle."""
+        if self.threshold <= 0 or len(content) <= self.threshold:
+            return content
+        lines = _lines(content)
+        handle = self.put(lines)
+        preview = []
+        size = 0
+        for line in lines[: self.preview_lines]:
+            line = line if len(line) <= 300 else line[:300] + " ..."
+            size += len(line)
+            if size > self.threshold // 2:
+                break
+            preview.append(line)
+        with self.lock:
+            self.spilled += 1
+            self.chars_kept_out += len(content)
+        return (
+            "\n".join(preview)
+            + f"\n[Output of {tool_name} shortened: {len(lines)} lines, {len(content)} "
+            f"characters. The first {len(preview)} lines are shown above. The full output "
+            f"is stored as handle {handle}; call TOOL_OUTPUT_READ with this handle and a "
+            "line range to read more.]"
+        )
+
+    def compact(self, output: t.Any) -> t.Any:
+        """Replace oversized ToolMessage contents in a ToolNode result."""
+        messages = output.get("messages", []) if isinstance(output, dict) else output
+        for message in messages:
+            if isinstance(message, ToolMessage) and isinstance(message.content, str):
+                message.content = self.spill(message.content, message.name or "tool")
+        return output
+
+    def wrap(self, tool_node: Runnable) -> Runnable:
+        """A ToolNode whose oversized outputs are spilled to the store."""
+        return tool_node | RunnableLambda(self.compact, name="spill_tool_output")
+
+    def report(self) -> str:
+        with self.lock:
+            return (
+                f"{self.spilled} tool outputs spilled to disk, "
+                f"{self.chars_kept_out} characters kept out of the messages"
+            )
+
+
+def get_tool_output_read_tool(store: ToolOutputStore) -> StructuredTool:
+    """TOOL_OUTPUT_READ, the paging tool for spilled outputs."""
+
+    def read_output(
+        handle: str, start_line: int = 1, end_line: t.Optional[int] = None, thought: str = ""
+    ) -> t.Dict[str, t.Any]:
+        try:
+            lines, total = store.read(handle, start_line, end_line)
+        except (OSError, ValueError) as e:
+            return {"successful": False, "data": {}, "error": str(e)}
+        last = start_line + len(lines) - 1
+        return {
+            "successful": True,
+            "data": {
+                "lines": "\n".join(f"{n}: {line}" for n, line in enumerate(lines, start_line)),
+                "range": f"{start_line}-{last} of {total}",
+            },
+            "error": None,
+        }
+
+    return StructuredTool.from_function(
+        read_output,
+        name="TOOL_OUTPUT_READ",
+        description="Read lines of a tool output that was shortened and stored "
+        f"under a handle. Returns at most {PAGE_LINES} lines per call unless "
+        "end_line is given.",
+    )
@@ -0,0 +1,164 @@
+"""Smaller tool schemas per model call: phase-scoped Editor tools and the thought field.
+
+With EDITOR_TOOLS=phased the Editor is bound to its read-only tools until it
+calls FILETOOL_START_EDITING; from then on, until it hands back to the
+SoftwareEngineer, it gets the full set. TOOL_THOUGHT sets the ``thought``
+argument of every tool: ``required`` (a short paragraph per call), ``optional``
+(one sentence, may be left out) or ``off`` (no such argument).
+
+``ToolSchemaStats`` counts the schema tokens bound to every call against all
+of the agent's tools with a required thought, and the thought tokens the
+agents wrote, so runs in different modes can be compared.
+"""
+
+import json
+import threading
+import typing as t
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, Field, create_model
+
+from metrics import count_tokens
+
+
+START_EDITING = "FILETOOL_START_EDITING"
+WRITE_TOOLS = {
+    "FILETOOL_EDIT_FILE",
+    "FILETOOL_CREATE_FILE",
+    "FILETOOL_WRITE",
+    "FILETOOL_BATCH_EDIT",
+}
+READ_PHASE = "read"
+EDIT_PHASE = "edit"
+
+THOUGHT_DESCRIPTIONS = {
+    "required": "Provide the thought of the agent in a small paragraph in concise way. This is a required field.",
+    "optional": "Optional: one short sentence on why you call this tool.",
+}
+# The sentence of the agent prompts that asks for a thought with every tool call
+THOUGHT_INSTRUCTION = (
+    "Provide a short and concise thought regarding the next steps whenever you call a tool, "
+    "based on the \noutput of the tool.\n"
+)
+
+
+def with_thought(tool: BaseTool, mode: str) -> BaseTool:
+    """A copy of `tool` whose ``thought`` argument follows `mode`."""
+    schema = tool.args_schema
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return tool
+    fields: t.Dict[str, t.Any] = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name != "thought"
+    }
+    if mode == "required":
+        fields["thought"] = (str, Field(..., description=THOUGHT_DESCRIPTIONS[mode]))
+    elif mode == "optional":
+        fields["thought"] = (str, Field("", description=THOUGHT_DESCRIPTIONS[mode]))
+    return tool.model_copy(update={"args_schema": create_model(schema.__name__, **fields)})
+
+
+def thought_prompt(prompt: str, mode: str) -> str:
+    """`prompt` with its thought instruction adjusted to `mode`."""
+    if mode == "off":
+        return prompt.replace(THOUGHT_INSTRUCTION, "")
+    if mode == "optional":
+        return prompt.replace(
+            THOUGHT_INSTRUCTION, "You may add a one-sentence thought when you call a tool.\n"
+        )
+    return prompt
+
+
+def schema_tokens(tools: t.Sequence[BaseTool]) -> int:
+    """Tokens of the tool definitions as sent to the model."""
+    return sum(count_tokens(json.dumps(convert_to_openai_tool(tool))) for tool in tools)
+
+
+def get_start_editing_tool() -> StructuredTool:
+    """FILETOOL_START_EDITING, which unlocks the Editor's write tools."""
+
+    def start_editing(thought: str = "") -> t.Dict[str, t.Any]:
+        return {
+            "successful": True,
+            "data": {"message": "Editing tools are available from your next turn."},
+            "error": None,
+        }
+
+    return StructuredTool.from_function(
+        start_editing,
+        name=START_EDITING,
+        description="Call this once you know exactly which lines to change. "
+        "Until then only the read-only file tools are available.",
+    )
+
+
+def read_only(tools: t.Sequence[BaseTool]) -> t.List[BaseTool]:
+    return [tool for tool in tools if tool.name not in WRITE_TOOLS]
+
+
+def editor_phase(messages: t.Sequence[t.Any], editor_name: str) -> str:
+    """EDIT_PHASE once the Editor called START_EDITING in its current turn of work."""
+    for message in reversed(messages):
+        if not isinstance(message, AIMessage):
+            continue
+        if message.name != editor_name:
+            # Handed over by another agent: a new turn of work starts read-only
+            return READ_PHASE
+        if any(call["name"] == START_EDITING for call in message.tool_calls):
+            return EDIT_PHASE
+    return READ_PHASE
+
+
+class ToolSchemaStats:
+    """Tool schema tokens per model call, against binding every tool with a required thought."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # agent -> [calls, bound schema tokens, baseline schema tokens]
+        self.calls: t.Dict[str, t.List[int]] = {}
+        self._tokens: t.Dict[t.Tuple[int, ...], int] = {}
+
+    def _cached_tokens(self, tools: t.Sequence[BaseTool]) -> int:
+        key = tuple(id(tool) for tool in tools)
+        if key not in self._tokens:
+            self._tokens[key] = schema_tokens(tools)
+        return self._tokens[key]
+
+    def counter(
+        self, agent: str, tools: t.Sequence[BaseTool], all_tools: t.Sequence[BaseTool]
+    ) -> RunnableLambda:
+        """A pass-through step that counts one call of `agent` bound to `tools`."""
+        baseline = [with_thought(tool, "required") for tool in all_tools]
+
+        def count(state: t.Any) -> t.Any:
+            with self.lock:
+                bound = self._cached_tokens(tools)
+                full = self._cached_tokens(baseline)
+                totals = self.calls.setdefault(agent, [0, 0, 0])
+                totals[0] += 1
+                totals[1] += bound
+                totals[2] += full
+            return state
+
+        return RunnableLambda(count)
+
+    def report(self, messages: t.Sequence[t.Any] = ()) -> str:
+        lines = []
+        with self.lock:
+            rows = sorted(self.calls.items())
+        for agent, (calls, bound, full) in rows:
+            lines.append(
+                f"{agent}: {calls} calls, {bound} tool schema tokens bound, "
+                f"{full - bound} saved ({(full - bound) / full * 100 if full else 0:.0f}%)"
+            )
+        tool_calls = [call for m in messages if isinstance(m, AIMessage) for call in m.tool_calls]
+        thoughts = sum(count_tokens(str(call["args"].get("thought") or "")) for call in tool_calls)
+        lines.append(
+            f"{len(tool_calls)} tool calls, {thoughts} thought tokens written "
+            f"({thoughts / len(tool_calls) if tool_calls else 0:.1f} per call)"
+        )
+        return "\n".join(lines)
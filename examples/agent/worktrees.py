@@ -0,0 +1,211 @@
+"""One git worktree per benchmark attempt, all sharing the code index mirror.
+
+A worktree only checks out files; objects stay in the shared bare mirror, so
+creating an attempt's repo costs no clone and little disk. Patches and resets
+are plain local git calls instead of workspace tool round-trips.
+
+    python worktrees.py --repo django/django --commit <base_commit_id> --attempts 3
+    python worktrees.py --repo-dir ~/src/project --commit HEAD --attempts 3
+
+times worktree creation, diff, reset and removal against a full clone per
+attempt, and with --workspace-id also the tool-based patch and reset path.
+"""
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from code_index import CACHE_DIR, repo_mirror
+
+
+_locks: t.Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _repo_lock(git_dir: Path) -> threading.Lock:
+    # git serialises worktree bookkeeping with a lock file and fails instead of waiting
+    with _locks_guard:
+        return _locks.setdefault(str(git_dir.resolve()), threading.Lock())
+
+
+def add_worktree(git_dir: Path, path: Path, commit: str) -> Path:
+    """Check out `commit` of the repo `git_dir` into a new detached worktree at `path`."""
+    with _repo_lock(git_dir):
+        _git(git_dir, "worktree", "add", "--detach", "--quiet", str(path), commit)
+    return path
+
+
+def remove_worktree(git_dir: Path, path: Path) -> None:
+    with _repo_lock(git_dir):
+        subprocess.run(
+            ["git", "-C", str(git_dir), "worktree", "remove", "--force", str(path)],
+            capture_output=True,
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        subprocess.run(["git", "-C", str(git_dir), "worktree", "prune"], capture_output=True)
+
+
+def worktree_diff(path: Path, commit: str) -> str:
+    """All changes of the worktree against `commit`, new files included."""
+    _git(path, "add", "-A")
+    return _git(path, "diff", "--cached", commit)
+
+
+def reset_worktree(path: Path, commit: str) -> None:
+    """Discard every change, tracked or not, and go back to `commit`."""
+    _git(path, "reset", "--hard", "--quiet", commit)
+    _git(path, "clean", "-fdq")
+
+
+class AttemptWorktrees:
+    """Worktrees of `(repo, commit)` for the attempts of one benchmark instance."""
+
+    def __init__(
+        self,
+        repo: str,
+        commit: str,
+        git_dir: t.Optional[Path] = None,
+        root: Path = CACHE_DIR / "worktrees",
+    ) -> None:
+        self.commit = commit
+        self.git_dir = git_dir or repo_mirror(repo, commit)
+        self.root = root / repo.replace("/", "__")
+        self.paths: t.Dict[str, Path] = {}
+
+    def get(self, attempt: str) -> Path:
+        """The worktree of `attempt`, created on first use and reset otherwise."""
+        path = self.paths.get(attempt)
+        if path is not None:
+            reset_worktree(path, self.commit)
+            return path
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = Path(tempfile.mkdtemp(prefix=f"{attempt}-", dir=self.root)) / "repo"
+        self.paths[attempt] = add_worktree(self.git_dir, path, self.commit)
+        return path
+
+    def diff(self, attempt: str) -> str:
+        return worktree_diff(self.paths[attempt], self.commit)
+
+    def reset(self, attempt: str) -> None:
+        reset_worktree(self.paths[attempt], self.commit)
+
+    def close(self) -> None:
+        for path in self.paths.values():
+            remove_worktree(self.git_dir, path)
+            shutil.rmtree(path.parent, ignore_errors=True)
+        self.paths.clear()
+
+
+def _disk_usage(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file() and not f.is_symlink())
+
+
+def _touch_first_file(path: Path) -> None:
+    source = next(p for p in sorted(path.rglob("*.py")) if ".git" not in p.parts)
+    with source.open("a", encoding="utf-8") as handle:
+        handle.write("\n# attempt edit\n")
+    (path / "new_file.txt").write_text("new\n", encoding="utf-8")
+
+
+def benchmark(
+    repo: str,
+    commit: str,
+    attempts: int,
+    git_dir: t.Optional[Path],
+    workspace_id: t.Optional[str],
+) -> None:
+    """Time per-attempt clones against worktrees of the shared repo."""
+    git_dir = git_dir or repo_mirror(repo, commit)
+    commit = _git(git_dir, "rev-parse", f"{commit}^{{commit}}").strip()
+    scratch = Path(tempfile.mkdtemp(prefix="worktree-bench-"))
+    try:
+        start = time.perf_counter()
+        clone_bytes = 0
+        for i in range(attempts):
+            dest = scratch / f"clone-{i}"
+            subprocess.run(
+                ["git", "clone", "--quiet", "--no-local", "--no-checkout", str(git_dir), str(dest)],
+                check=True,
+            )
+            _git(dest, "checkout", "--quiet", commit)
+            clone_bytes += _disk_usage(dest)
+        clone_seconds = time.perf_counter() - start
+
+        pool = AttemptWorktrees(repo, commit, git_dir=git_dir, root=scratch / "worktrees")
+        start = time.perf_counter()
+        for i in range(attempts):
+            pool.get(f"attempt{i}")
+        create_seconds = time.perf_counter() - start
+        worktree_bytes = sum(
+            _disk_usage(path) for path in pool.paths.values()
+        )
+
+        diff_times, reset_times = [], []
+        for attempt, path in pool.paths.items():
+            _touch_first_file(path)
+            start = time.perf_counter()
+            patch = pool.diff(attempt)
+            diff_times.append(time.perf_counter() - start)
+            assert "new_file.txt" in patch
+            start = time.perf_counter()
+            pool.reset(attempt)
+            reset_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pool.close()
+        remove_seconds = time.perf_counter() - start
+
+        print(f"{attempts} attempts of {repo or git_dir} at {commit[:12]}")
+        print(f"Full clones:  {clone_seconds:.2f}s, {clone_bytes / 1e6:.1f} MB")
+        print(f"Worktrees:    {create_seconds:.2f}s, {worktree_bytes / 1e6:.1f} MB (objects shared)")
+        print(
+            f"Local diff:   mean {sum(diff_times) / len(diff_times) * 1000:.1f}ms, "
+            f"reset: mean {sum(reset_times) / len(reset_times) * 1000:.1f}ms, "
+            f"removing all: {remove_seconds * 1000:.0f}ms"
+        )
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if workspace_id:
+        from composio_langgraph import Action, ComposioToolSet
+
+        toolset = ComposioToolSet()
+        toolset.set_workspace_id(workspace_id)
+        name = repo.split("/")[-1]
+        start = time.perf_counter()
+        toolset.execute_action(
+            action=Action.FILETOOL_CHANGE_WORKING_DIRECTORY,
+            params={"path": f"/home/user/{name}"},
+        )
+        toolset.execute_action(action=Action.FILETOOL_GIT_PATCH, params={})
+        patch_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        toolset.execute_action(
+            action=Action.SHELLTOOL_EXEC_COMMAND,
+            params={"cmd": f"git reset --hard {commit}"},
+        )
+        reset_seconds = time.perf_counter() - start
+        print(f"Workspace tools: patch {patch_seconds * 1000:.0f}ms, reset {reset_seconds * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark worktree-based attempt isolation.")
+    parser.add_argument("--repo", default="", help="Repository (owner/name), uses the shared mirror")
+    parser.add_argument("--repo-dir", type=Path, default=None, help="Use a local git repo instead")
+    parser.add_argument("--commit", required=True, help="Base commit id")
+    parser.add_argument("--attempts", type=int, default=3)
+    parser.add_argument("--workspace-id", default=None, help="Also time the workspace tool path")
+    args = parser.parse_args()
+    if not args.repo and args.repo_dir is None:
+        parser.error("--repo or --repo-dir is required")
+    benchmark(args.repo, args.commit, args.attempts, args.repo_dir, args.workspace_id)
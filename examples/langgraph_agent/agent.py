@@ -2,6 +2,8 @@
 
 import operator
 import os
+import sys
+from pathlib import Path
 from typing import Annotated, Literal, Sequence, TypedDict
 
 import dotenv
@@ -12,6 +14,11 @@ from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode
 from prompts import frontend_engineer_prompt, pm_prompt
 
+# The local workspace backend is shared with the SWE agent in examples/agent; appended,
+# so this directory's own modules (agent, prompts, ...) still come first
+sys.path.append(str(Path(__file__).resolve().parent.parent / "agent"))
+from local_workspace import WORKSPACE_BACKEND, LocalToolSet  # noqa: E402
+
 from composio_langgraph import Action, App, ComposioToolSet, WorkspaceType
 
 
@@ -23,11 +30,15 @@ openai_client = ChatOpenAI(
     api_key=os.environ["OPENAI_API_KEY"],  # type: ignore
     model="gpt-4-turbo",
 )
-composio_toolset = ComposioToolSet(
-    workspace_config=WorkspaceType.Docker(
-        image="composio/composio:latest", persistent=True
+if WORKSPACE_BACKEND == "local":
+    # File and shell actions in a local directory; browser and image tools are skipped
+    composio_toolset = LocalToolSet()
+else:
+    composio_toolset = ComposioToolSet(
+        workspace_config=WorkspaceType.Docker(
+            image="composio/composio:latest", persistent=True
+        )
     )
-)
 
 # Get required tools
 coder_tools = [
@@ -96,7 +107,8 @@ def create_agent(system_prompt, tools):
         ]
     )
     llm = ChatOpenAI(temperature=0, streaming=True, model="gpt-4-1106-preview")
-    return prompt | llm.bind_tools(tools)
+    # The PM has no tools in a local workspace
+    return prompt | (llm.bind_tools(tools) if tools else llm)
 
 
 coding_agent = create_agent(frontend_engineer_prompt, coder_tools)
@@ -0,0 +1,69 @@
+"""Build time of the Composio Local Git and File Tools node, with and without the toolset cache.
+
+    COMPOSIO_API_KEY=... python scripts/bench_composio_tools.py --runs 10 --concurrency 4
+
+Compares building the toolset and fetching the schemas on every flow build, as
+the node used to, with the process-level cache: cold (first build after
+Langflow starts), warm (cached) and cold with several flow runs building at
+once, which share one build. Needs composio and a Composio API key, and runs
+in the Langflow environment, as it loads custom_components/composio_local_tool.py.
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "composio_local_tool.py"
+ACTIONS = ["FILETOOL_GIT_CLONE", "FILETOOL_GIT_REPO_TREE", "FILETOOL_LIST_FILES", "FILETOOL_EDIT_FILE"]
+
+
+def _load_component() -> t.Any:
+    spec = importlib.util.spec_from_file_location("composio_local_tool", COMPONENT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+def benchmark(api_key: str, runs: int, concurrency: int, ttl: int) -> None:
+    component = _load_component()
+    timings: t.Dict[str, t.List[float]] = {"uncached": [], "cached cold": [], "cached warm": [], "concurrent cold": []}
+    for _ in range(runs):
+        start = time.perf_counter()
+        component.ComposioToolSet(api_key=api_key).get_tools(actions=ACTIONS)
+        timings["uncached"].append(time.perf_counter() - start)
+
+        component._CACHE.entries.clear()
+        for mode in ("cached cold", "cached warm"):
+            start = time.perf_counter()
+            component._cached_tools(api_key, ACTIONS, ttl)
+            timings[mode].append(time.perf_counter() - start)
+
+        # Flow runs that start together wait for one build instead of each making their own
+        component._CACHE.entries.clear()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            hits = list(executor.map(lambda _: component._cached_tools(api_key, ACTIONS, ttl)[1], range(concurrency)))
+        timings["concurrent cold"].append(time.perf_counter() - start)
+        if hits.count(False) != 1:
+            raise RuntimeError(f"{hits.count(False)} builds for {concurrency} concurrent flow runs")
+
+    print(f"{runs} runs, {len(ACTIONS)} actions, {concurrency} concurrent builds")
+    for mode, samples in timings.items():
+        print(f"{mode:>16}: {min(samples) * 1000:.1f}ms best, {sum(samples) / len(samples) * 1000:.1f}ms mean")
+    print(f"build locks left: {len(component._CACHE.build_locks)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Composio toolset cache.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ttl", type=int, default=900)
+    args = parser.parse_args()
+    api_key = os.environ.get("COMPOSIO_API_KEY")
+    if not api_key:
+        parser.error("set COMPOSIO_API_KEY")
+    benchmark(api_key, args.runs, args.concurrency, args.ttl)
@@ -0,0 +1,88 @@
+"""Flow start latency for fetching several Vault secrets, against the local stub.
+
+    python scripts/bench_vault_prefetch.py --paths 4 --latency 0.05 --runs 10
+
+Compares one VaultSecretRetriever node per secret as it used to work (new
+client, AppRole login and read each, one node after another) with bulk mode,
+cold (first flow run in the process) and warm (secrets cached). Run it in the
+Langflow environment, as it loads custom_components/vault_component.py.
+"""
+
+import argparse
+import importlib.util
+import time
+import typing as t
+from pathlib import Path
+
+import hvac
+
+from vault_stub import VaultState, serve
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "vault_component.py"
+ROLE_ID, SECRET_ID = "bench-role", "bench-secret"
+NAMES = ["composio", "openai", "watsonx", "github", "tfe", "slack", "jira", "pagerduty"]
+
+
+def _load_component() -> t.Any:
+    spec = importlib.util.spec_from_file_location("vault_component", COMPONENT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+def per_node(url: str, paths: t.List[str]) -> None:
+    for path in paths:
+        client = hvac.Client(url=url)
+        client.auth.approle.login(role_id=ROLE_ID, secret_id=SECRET_ID)
+        client.secrets.kv.v2.read_secret_version(
+            path=path.split("/data/", 1)[1], mount_point="secret", raise_on_deleted_version=True
+        )
+
+
+def benchmark(port: int, count: int, latency: float, runs: int, workers: int) -> None:
+    vault = _load_component()
+    state = VaultState(ROLE_ID, SECRET_ID, token_ttl=3600, latency=latency)
+    paths = []
+    for name in NAMES[:count]:
+        state.put("secret", name, {"api_key": f"{name}-key"})
+        paths.append(f"secret/data/{name}")
+    server = serve("127.0.0.1", port, state)
+    url = f"http://127.0.0.1:{port}"
+
+    timings: t.Dict[str, t.List[float]] = {"per node": [], "bulk cold": [], "bulk warm": []}
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            per_node(url, paths)
+            timings["per node"].append(time.perf_counter() - start)
+
+            # A fresh session stands for the first flow run after Langflow starts
+            vault._SESSIONS.sessions.clear()
+            session = vault.get_session(url, ROLE_ID, SECRET_ID)
+            start = time.perf_counter()
+            vault.fetch_secrets(session, paths, workers=workers)
+            timings["bulk cold"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            vault.fetch_secrets(session, paths, workers=workers)
+            timings["bulk warm"].append(time.perf_counter() - start)
+    finally:
+        vault._SESSIONS.sessions.clear()
+        server.shutdown()
+
+    print(f"{count} secrets, {latency * 1000:.0f}ms per Vault request, {runs} runs")
+    for mode, samples in timings.items():
+        print(f"{mode:>10}: flow start {sum(samples) / len(samples) * 1000:.1f}ms mean, {max(samples) * 1000:.1f}ms max")
+    with state.lock:
+        print(f"Vault requests: {dict(state.counts)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk Vault secret prefetch.")
+    parser.add_argument("--port", type=int, default=8299)
+    parser.add_argument("--paths", type=int, default=4, help=f"Secrets per flow, at most {len(NAMES)}")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per Vault request")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    benchmark(args.port, min(args.paths, len(NAMES)), args.latency, args.runs, args.workers)
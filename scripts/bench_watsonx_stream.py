@@ -0,0 +1,123 @@
+"""Time-to-first-token and turn latency of ChatWatsonx against the local stub.
+
+    python scripts/bench_watsonx_stream.py --turns 20 --first-token-latency 0.3
+
+Starts scripts/watsonx_stub.py in-process and points an APIClient at it, then
+compares a plain streamed answer with a tool-calling turn: a native tool call
+streamed back, the tool result sent, and the final answer streamed.
+"""
+
+import argparse
+import math
+import time
+import typing as t
+
+import httpx
+from ibm_watsonx_ai import APIClient, Credentials
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langchain_ibm import ChatWatsonx
+
+from watsonx_stub import serve
+
+ENDPOINT = "https://us-south.ml.cloud.ibm.com"
+PROJECT_ID = "stub-project"
+
+
+class LocalTransport(httpx.HTTPTransport):
+    """Sends every request to the stub, whatever host the SDK targets."""
+
+    def __init__(self, port: int) -> None:
+        super().__init__()
+        self.port = port
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        return super().handle_request(request)
+
+
+@tool
+def lookup_module(name: str) -> str:
+    """Look up a Terraform module in the registry."""
+    return f"{name}: latest version 1.2.0"
+
+
+def _stream(model: t.Any, messages: t.List[t.Any]) -> t.Tuple[float, t.Any]:
+    """Stream a reply and return the time to the first chunk with the message."""
+    start = time.perf_counter()
+    first = None
+    message = None
+    for chunk in model.stream(messages):
+        if first is None and (chunk.content or chunk.tool_call_chunks):
+            first = time.perf_counter() - start
+        message = chunk if message is None else message + chunk
+    return first or 0.0, message
+
+
+def _p95(values: t.List[float]) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def benchmark(port: int, turns: int, model_id: str) -> None:
+    client = APIClient(
+        Credentials(url=ENDPOINT, token="stub-token"),
+        httpx_client=httpx.Client(transport=LocalTransport(port)),
+    )
+    client.set.default_project(PROJECT_ID)
+    model = ChatWatsonx(
+        model_id=model_id,
+        watsonx_client=client,
+        project_id=PROJECT_ID,
+        url=ENDPOINT,
+        streaming=True,
+    )
+    with_tools = model.bind_tools([lookup_module])
+    question = [HumanMessage("Which version of the vpc module should I use?")]
+
+    results: t.Dict[str, t.List[t.Tuple[float, float, int]]] = {"without tools": [], "with tools": []}
+    for _ in range(turns):
+        start = time.perf_counter()
+        first, _ = _stream(model, question)
+        results["without tools"].append((first, time.perf_counter() - start, 1))
+
+        start = time.perf_counter()
+        first, call = _stream(with_tools, question)
+        messages = question + [call]
+        for tool_call in call.tool_calls:
+            messages.append(ToolMessage(lookup_module.invoke(tool_call["args"]), tool_call_id=tool_call["id"]))
+        _, answer = _stream(with_tools, messages)
+        if not call.tool_calls or not answer.content:
+            raise RuntimeError("the stub did not return a tool call followed by an answer")
+        results["with tools"].append((first, time.perf_counter() - start, 2))
+
+    print(f"{turns} turns against the stub with {model_id}")
+    for mode, samples in results.items():
+        ttft = [sample[0] * 1000 for sample in samples]
+        total = [sample[1] * 1000 for sample in samples]
+        print(
+            f"{mode:>13}: {samples[0][2]} request(s)/turn, "
+            f"first token mean {sum(ttft) / len(ttft):.1f}ms p95 {_p95(ttft):.1f}ms, "
+            f"turn mean {sum(total) / len(total):.1f}ms p95 {_p95(total):.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark watsonx streaming and tool calls.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--model-id", default="ibm/granite-3-2-8b-instruct")
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    server = serve(
+        "127.0.0.1",
+        args.port,
+        3600,
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+    )
+    try:
+        benchmark(args.port, args.turns, args.model_id)
+    finally:
+        server.shutdown()
@@ -0,0 +1,263 @@
+"""Compile cache for the Langflow flow JSON files in this repository.
+
+The flow files embed the full source of every component. Loading a flow
+normally means parsing the whole JSON document and compiling every node's
+code again. This cache keeps, per flow file hash, the resolved topology
+(nodes, edges, build order) with each node's field values, and, per node
+code hash, the compiled code object. A warm load reads both and only
+executes code that has not been executed in this process yet.
+
+The cache serves scripts that read flows outside Langflow: the headless
+runner takes the node types from it. Langflow's own loader
+(``aload_flow_from_json``) does not use it and still parses the flow and
+runs every node's code on each build, so the reported times are those of
+the cache alone, not of a Langflow flow start:
+
+    python scripts/flow_cache.py workflow.json "Simple Agent.json"
+    python scripts/flow_cache.py workflow.json --exec   # also build the classes
+
+--exec needs the Langflow environment, as component code imports langflow.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("FLOW_CACHE_DIR", "~/.cache/langflow-flows")).expanduser()
+
+# Code objects are only valid for the interpreter that marshalled them
+CODE_TAG = sys.implementation.cache_tag
+
+# Component classes already executed in this process, by code hash
+_classes: t.Dict[str, type] = {}
+_classes_lock = threading.Lock()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()[:24]
+
+
+def component_class_name(code: str) -> str:
+    """Name of the component class, the last top-level class with a base class."""
+    names = [
+        node.name
+        for node in ast.parse(code).body
+        if isinstance(node, ast.ClassDef) and node.bases
+    ]
+    if not names:
+        raise ValueError("no component class found in node code")
+    return names[-1]
+
+
+def build_order(nodes: t.Sequence[str], edges: t.Sequence[t.Dict[str, str]]) -> t.List[str]:
+    """Topological order of `nodes`; raises on unknown endpoints or cycles."""
+    known = set(nodes)
+    incoming = {node: 0 for node in nodes}
+    targets: t.Dict[str, t.List[str]] = {node: [] for node in nodes}
+    for edge in edges:
+        for end in ("source", "target"):
+            if edge[end] not in known:
+                raise ValueError(f"edge {edge['source']} -> {edge['target']} references unknown node {edge[end]}")
+        targets[edge["source"]].append(edge["target"])
+        incoming[edge["target"]] += 1
+    ready = [node for node in nodes if incoming[node] == 0]
+    order = []
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for target in targets[node]:
+            incoming[target] -= 1
+            if incoming[target] == 0:
+                ready.append(target)
+    if len(order) != len(nodes):
+        raise ValueError("flow graph has a cycle")
+    return order
+
+
+def resolve_flow(flow: t.Dict[str, t.Any]) -> t.Tuple[t.Dict[str, t.Any], t.Dict[str, str]]:
+    """Topology and node field values of a parsed flow, plus the code of each node by hash."""
+    graph = flow.get("data", flow)
+    nodes = []
+    sources: t.Dict[str, str] = {}
+    for node in graph["nodes"]:
+        data = node["data"]
+        template = data["node"].get("template", {})
+        code = template.get("code", {}).get("value", "")
+        digest = code_hash(code) if code else None
+        if digest is not None:
+            sources[digest] = code
+        nodes.append(
+            {
+                "id": node["id"],
+                "type": data.get("type"),
+                "display_name": data["node"].get("display_name"),
+                "code_hash": digest,
+                "class_name": component_class_name(code) if code else None,
+                "params": {
+                    name: field.get("value")
+                    for name, field in template.items()
+                    if isinstance(field, dict) and name != "code" and "value" in field
+                },
+                "outputs": [output["name"] for output in data["node"].get("outputs", [])],
+            }
+        )
+    edges = [
+        {
+            "source": edge["source"],
+            "target": edge["target"],
+            "output": edge["data"]["sourceHandle"].get("name"),
+            "field": edge["data"]["targetHandle"].get("fieldName"),
+        }
+        for edge in graph["edges"]
+    ]
+    topology = {
+        "name": flow.get("name"),
+        "nodes": nodes,
+        "edges": edges,
+        "order": build_order([node["id"] for node in nodes], edges),
+    }
+    return topology, sources
+
+
+class FlowCache:
+    """On-disk cache of resolved flows and compiled component code."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+
+    def _flow_path(self, digest: str) -> Path:
+        return self.cache_dir / "flows" / f"{digest}.json"
+
+    def _code_path(self, digest: str) -> Path:
+        return self.cache_dir / "code" / f"{digest}.{CODE_TAG}.marshal"
+
+    def load(self, path: Path) -> t.Tuple[t.Dict[str, t.Any], bool]:
+        """Resolved topology of the flow at `path` and whether it came from the cache."""
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()[:24]
+        cached = self._flow_path(digest)
+        if cached.exists():
+            topology = json.loads(cached.read_bytes())
+            # Code of another interpreter, or pruned: resolve again to compile it
+            if all(
+                self._code_path(node["code_hash"]).exists()
+                for node in topology["nodes"]
+                if node["code_hash"] is not None
+            ):
+                return topology, True
+
+        topology, sources = resolve_flow(json.loads(raw))
+        for code_digest, code in sources.items():
+            if not self._code_path(code_digest).exists():
+                compiled = compile(code, f"<component {code_digest}>", "exec")
+                _write_atomic(self._code_path(code_digest), marshal.dumps(compiled))
+        _write_atomic(cached, json.dumps(topology).encode())
+        return topology, False
+
+    def code(self, digest: str) -> t.Any:
+        return marshal.loads(self._code_path(digest).read_bytes())
+
+    def component_class(self, node: t.Dict[str, t.Any]) -> type:
+        """Execute a node's cached code once per process and return its component class."""
+        digest = node["code_hash"]
+        with _classes_lock:
+            cls = _classes.get(digest)
+        if cls is not None:
+            return cls
+        namespace: t.Dict[str, t.Any] = {"__name__": f"flow_component_{digest}"}
+        exec(self.code(digest), namespace)
+        cls = namespace[node["class_name"]]
+        with _classes_lock:
+            return _classes.setdefault(digest, cls)
+
+    def component_classes(self, topology: t.Dict[str, t.Any]) -> t.Dict[str, type]:
+        return {
+            node["id"]: self.component_class(node)
+            for node in topology["nodes"]
+            if node["code_hash"] is not None
+        }
+
+
+def uncached_load(path: Path, execute: bool) -> None:
+    """What a load costs without the cache: parse, resolve, compile and execute everything."""
+    topology, sources = resolve_flow(json.loads(path.read_bytes()))
+    for node in topology["nodes"]:
+        if node["code_hash"] is None:
+            continue
+        compiled = compile(sources[node["code_hash"]], "<component>", "exec")
+        if execute:
+            exec(compiled, {"__name__": "flow_component"})
+
+
+def report(paths: t.Sequence[Path], cache_dir: Path, execute: bool, runs: int) -> None:
+    # A fresh subdirectory, so an existing cache at `cache_dir` is never deleted
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    bench_dir = Path(tempfile.mkdtemp(prefix="bench-", dir=cache_dir))
+    try:
+        _report(paths, bench_dir, execute, runs)
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+
+def _report(paths: t.Sequence[Path], cache_dir: Path, execute: bool, runs: int) -> None:
+    for path in paths:
+        timings: t.Dict[str, t.List[float]] = {"uncached": [], "cold": [], "warm": [], "hot": []}
+        for _ in range(runs):
+            start = time.perf_counter()
+            uncached_load(path, execute)
+            timings["uncached"].append(time.perf_counter() - start)
+
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            _classes.clear()
+            cache = FlowCache(cache_dir)
+            for mode in ("cold", "warm", "hot"):
+                if mode == "warm":
+                    # A new process: the disk cache is there, nothing is executed yet
+                    _classes.clear()
+                start = time.perf_counter()
+                topology, _ = cache.load(path)
+                if execute:
+                    cache.component_classes(topology)
+                timings[mode].append(time.perf_counter() - start)
+
+        print(
+            f"{path.name}: {path.stat().st_size / 1024:.0f} KB, "
+            f"{len(topology['nodes'])} nodes, {len(topology['edges'])} edges, "
+            f"{len({n['code_hash'] for n in topology['nodes'] if n['code_hash']})} distinct components"
+        )
+        print(f"  build order: {' -> '.join(topology['order'])}")
+        for mode, samples in timings.items():
+            print(f"  {mode:>8}: {min(samples) * 1000:.2f}ms best, {sum(samples) / len(samples) * 1000:.2f}ms mean")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flow compile cache load times.")
+    parser.add_argument("flows", nargs="+", type=Path, help="Flow JSON files")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="Benchmark in a new subdirectory of it; defaults to a temporary directory")
+    parser.add_argument("--exec", action="store_true", help="Also execute component code (needs langflow)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        report(args.flows, args.cache_dir or Path(tmp) / "cache", args.exec, args.runs)
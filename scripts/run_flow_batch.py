@@ -0,0 +1,205 @@
+"""Run the Terraform module flow in workflow.json headless, for many modules at once.
+
+    python scripts/run_flow_batch.py --modules modules.jsonl --workers 4 --out runs/
+
+`modules.jsonl` has one module per line, e.g.
+
+    {"provider": "aws", "name": "s3-bucket", "description": "Secure S3 bucket"}
+
+Each module's prompt is promptTemplate.txt, the module specification, followed
+by inputPrompt.txt with {provider}, {name}, {repoName}, {description} and
+{visibility} filled in. The static specification comes first so every run
+shares the same prompt prefix, which Ollama can reuse from its cache. The
+flow's Ollama nodes are pointed at --ollama-url and --model. Every run writes
+its final answer and per-node build times to its own directory under --out,
+and summary.json lists all runs.
+
+Needs the Langflow environment; COMPOSIO_API_KEY is passed to the Composio nodes.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import re
+import time
+import traceback
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from flow_cache import FlowCache
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def render_prompt(instructions: str, specification: str, module: t.Dict[str, str]) -> str:
+    """Fill the known placeholders of the prompt files, leave any others as they are."""
+    values = {
+        "visibility": "private",
+        "description": f"Terraform module for {module['provider']} {module['name']}",
+        **module,
+    }
+    values.setdefault("repoName", f"terraform-{module['provider']}-{module['name']}")
+    text = re.sub(
+        r"\{(\w+)\}",
+        lambda match: str(values.get(match.group(1), match.group(0))),
+        instructions,
+    )
+    # Static text first, so the prompt prefix is the same for every module
+    return f"{specification}\n\n{text}" if specification else text
+
+
+def flow_tweaks(topology: t.Dict[str, t.Any], ollama_url: str, model: str) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """Per-node overrides: local Ollama, the Composio key, and no message storage."""
+    tweaks: t.Dict[str, t.Dict[str, t.Any]] = {}
+    for node in topology["nodes"]:
+        if node["type"] == "OllamaModel":
+            tweaks[node["id"]] = {"base_url": ollama_url, "model_name": model}
+        elif node["type"] == "ComposioAPI" and os.environ.get("COMPOSIO_API_KEY"):
+            tweaks[node["id"]] = {"api_key": os.environ["COMPOSIO_API_KEY"]}
+        elif node["type"] in ("ChatInput", "ChatOutput"):
+            # Headless runs have no Langflow database to store messages in
+            tweaks[node["id"]] = {"should_store_message": False}
+    return tweaks
+
+
+def check_ollama(url: str, model: str) -> None:
+    response = requests.get(f"{url.rstrip('/')}/api/tags", timeout=10)
+    response.raise_for_status()
+    models = {entry["name"] for entry in response.json().get("models", [])}
+    if model not in models and f"{model}:latest" not in models:
+        raise SystemExit(f"Model {model} is not pulled in Ollama at {url}; run `ollama pull {model}`")
+
+
+async def run_flow(
+    payload: t.Dict[str, t.Any], tweaks: t.Dict[str, t.Dict[str, t.Any]], prompt: str
+) -> t.Tuple[str, t.List[t.Dict[str, t.Any]]]:
+    """Build the flow vertex by vertex, return the chat output and per-node timings."""
+    from langflow.graph.graph.base import Finish
+    from langflow.load import aload_flow_from_json
+
+    graph = await aload_flow_from_json(payload, tweaks=tweaks, disable_logs=True)
+    timings = []
+    outputs = []
+    start = time.perf_counter()
+    async for result in graph.async_start(inputs=[{"input_value": prompt}]):
+        if isinstance(result, Finish):
+            break
+        now = time.perf_counter()
+        vertex = result.vertex
+        timings.append({"node": vertex.id, "type": vertex.base_name, "seconds": round(now - start, 3)})
+        start = now
+        if vertex.base_name == "ChatOutput":
+            message = next(iter(vertex.results.values()), None)
+            outputs.append(getattr(message, "text", None) or str(message))
+    return (outputs[-1] if outputs else ""), timings
+
+
+def run_module(
+    index: int,
+    module: t.Dict[str, str],
+    payload: t.Dict[str, t.Any],
+    tweaks: t.Dict[str, t.Dict[str, t.Any]],
+    prompt: str,
+    out_dir: Path,
+) -> t.Dict[str, t.Any]:
+    repo = f"terraform-{module['provider']}-{module['name']}"
+    run_dir = out_dir / f"{index:03d}-{repo}"
+    run_dir.mkdir(parents=True, exist_ok=True)
+    (run_dir / "prompt.md").write_text(prompt, encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        # Each worker thread gets its own event loop and its own copy of the flow
+        output, timings = asyncio.run(run_flow(copy.deepcopy(payload), tweaks, prompt))
+        error = None
+    except Exception:
+        output, timings, error = "", [], traceback.format_exc()
+    elapsed = time.perf_counter() - start
+
+    (run_dir / "output.md").write_text(output, encoding="utf-8")
+    (run_dir / "timings.json").write_text(json.dumps(timings, indent=2) + "\n", encoding="utf-8")
+    if error:
+        (run_dir / "error.txt").write_text(error, encoding="utf-8")
+    status = "error" if error else "ok"
+    print(f"[{index:03d}] {repo}: {status} in {elapsed:.1f}s")
+    return {"index": index, "repo": repo, "status": status, "seconds": round(elapsed, 3), "dir": run_dir.name}
+
+
+def main(args: argparse.Namespace) -> None:
+    modules = [
+        json.loads(line)
+        for line in args.modules.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    instructions = args.input_prompt.read_text(encoding="utf-8")
+    specification = args.prompt_template.read_text(encoding="utf-8") if args.prompt_template else ""
+    if not args.skip_ollama_check:
+        check_ollama(args.ollama_url, args.model)
+
+    # The topology for the tweaks comes from the compile cache; Langflow still parses the
+    # payload and runs the node code itself in every run
+    topology, _ = FlowCache().load(args.flow)
+    payload = json.loads(args.flow.read_bytes())
+    tweaks = flow_tweaks(topology, args.ollama_url, args.model)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                run_module,
+                index,
+                module,
+                payload,
+                tweaks,
+                render_prompt(instructions, specification, module),
+                args.out,
+            )
+            for index, module in enumerate(modules, 1)
+        ]
+        runs = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    node_totals: t.Dict[str, t.List[float]] = {}
+    for run in runs:
+        timings = json.loads((args.out / run["dir"] / "timings.json").read_text(encoding="utf-8"))
+        for timing in timings:
+            node_totals.setdefault(timing["node"], []).append(timing["seconds"])
+    summary = {
+        "flow": str(args.flow),
+        "model": args.model,
+        "workers": args.workers,
+        "seconds": round(elapsed, 3),
+        "runs": runs,
+        "node_mean_seconds": {
+            node: round(sum(samples) / len(samples), 3) for node, samples in node_totals.items()
+        },
+    }
+    (args.out / "summary.json").write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    failed = sum(1 for run in runs if run["status"] != "ok")
+    print(f"{len(runs) - failed}/{len(runs)} runs succeeded in {elapsed:.1f}s with {args.workers} workers")
+    for node, seconds in summary["node_mean_seconds"].items():
+        print(f"  {node}: {seconds:.2f}s mean")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run workflow.json for many modules.")
+    parser.add_argument("--modules", type=Path, required=True, help="JSONL file, one module per line")
+    parser.add_argument("--flow", type=Path, default=ROOT / "workflow.json")
+    parser.add_argument("--input-prompt", type=Path, default=ROOT / "inputPrompt.txt")
+    parser.add_argument(
+        "--prompt-template",
+        type=Path,
+        default=ROOT / "promptTemplate.txt",
+        help="Module specification placed before the instructions, as the shared prompt prefix",
+    )
+    parser.add_argument("--out", type=Path, default=Path("runs"))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--ollama-url", default=os.environ.get("OLLAMA_URL", "http://localhost:11434"))
+    parser.add_argument("--model", default="qwen2.5-coder:14b")
+    parser.add_argument("--skip-ollama-check", action="store_true")
+    main(parser.parse_args())
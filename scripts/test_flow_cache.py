@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from flow_cache import FlowCache, build_order, component_class_name
+
+CODE = "class Base:\n    pass\n\n\nclass Echo(Base):\n    value = 1\n"
+
+
+def _flow():
+    def node(node_id, code=CODE):
+        return {
+            "id": node_id,
+            "data": {
+                "type": "Echo",
+                "node": {
+                    "display_name": node_id,
+                    "template": {"code": {"value": code}, "text": {"value": node_id}},
+                    "outputs": [{"name": "out"}],
+                },
+            },
+        }
+
+    def edge(source, target):
+        return {
+            "source": source,
+            "target": target,
+            "data": {"sourceHandle": {"name": "out"}, "targetHandle": {"fieldName": "text"}},
+        }
+
+    return {"name": "test", "data": {"nodes": [node("c"), node("a"), node("b")], "edges": [edge("a", "b"), edge("b", "c")]}}
+
+
+def test_build_order():
+    edges = [{"source": "a", "target": "b"}, {"source": "a", "target": "c"}, {"source": "b", "target": "c"}]
+    assert build_order(["c", "b", "a"], edges) == ["a", "b", "c"]
+    assert build_order(["x", "y"], []) == ["x", "y"]
+
+
+def test_build_order_rejects_cycles_and_unknown_nodes():
+    with pytest.raises(ValueError, match="cycle"):
+        build_order(["a", "b"], [{"source": "a", "target": "b"}, {"source": "b", "target": "a"}])
+    with pytest.raises(ValueError, match="unknown node"):
+        build_order(["a"], [{"source": "a", "target": "z"}])
+
+
+def test_component_class_name():
+    assert component_class_name(CODE) == "Echo"
+    with pytest.raises(ValueError):
+        component_class_name("x = 1\n")
+
+
+def test_load_cold_warm_and_missing_code(tmp_path):
+    path = tmp_path / "flow.json"
+    path.write_text(json.dumps(_flow()))
+    cache = FlowCache(tmp_path / "cache")
+
+    topology, hit = cache.load(path)
+    assert not hit
+    assert topology["order"] == ["a", "b", "c"]
+    assert topology["nodes"][0]["params"] == {"text": "c"}
+    assert cache.load(path) == (topology, True)
+
+    # A topology hit without its compiled code is resolved again
+    for code in (tmp_path / "cache" / "code").iterdir():
+        code.unlink()
+    assert cache.load(path) == (topology, False)
+    assert cache.component_classes(topology)["a"].value == 1
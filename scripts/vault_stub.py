@@ -0,0 +1,230 @@
+"""In-memory stand-in for the Vault endpoints used by custom_components/vault_component.py.
+
+    python scripts/vault_stub.py --port 8200 --token-ttl 30 \
+        --secret 'secret/openai={"api_key": "sk-test"}'
+
+Supports AppRole login, token self-renewal and KV v2 reads and writes with
+versions. Every request can be delayed by --latency to mimic a remote Vault,
+and request counts are served on /stats.
+"""
+
+import argparse
+import json
+import secrets
+import threading
+import time
+import typing as t
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class VaultState:
+    def __init__(
+        self,
+        role_id: str,
+        secret_id: str,
+        token_ttl: int,
+        token_max_ttl: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        self.role_id = role_id
+        self.secret_id = secret_id
+        self.token_ttl = token_ttl
+        self.token_max_ttl = token_max_ttl or token_ttl * 10
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.counts: t.Dict[str, int] = {}
+        self.tokens: t.Dict[str, t.Tuple[float, float]] = {}  # token -> (expires_at, max_expires_at)
+        self.kv: t.Dict[t.Tuple[str, str], t.List[t.Dict[str, t.Any]]] = {}  # (mount, path) -> versions
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def put(self, mount: str, path: str, data: t.Dict[str, t.Any]) -> int:
+        with self.lock:
+            versions = self.kv.setdefault((mount, path), [])
+            versions.append(
+                {"data": data, "created_time": datetime.now(timezone.utc).isoformat()}
+            )
+            return len(versions)
+
+    def valid(self, token: t.Optional[str]) -> bool:
+        with self.lock:
+            expiry = self.tokens.get(token or "")
+            return expiry is not None and expiry[0] > time.time()
+
+
+def _kv_path(path: str) -> t.Optional[t.Tuple[str, str]]:
+    """`/v1/<mount>/data/<path>` -> (mount, path)."""
+    parts = path[len("/v1/") :].split("/", 2) if path.startswith("/v1/") else []
+    if len(parts) == 3 and parts[1] == "data" and parts[2]:
+        return parts[0], parts[2]
+    return None
+
+
+class VaultHandler(BaseHTTPRequestHandler):
+    server: "VaultStubServer"
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: t.Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> t.Dict[str, t.Any]:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        return json.loads(body or b"{}")
+
+    def _authorized(self) -> bool:
+        if self.server.state.valid(self.headers.get("X-Vault-Token")):
+            return True
+        self._send_json(403, {"errors": ["permission denied"]})
+        return False
+
+    def _auth(self, token: str, expires_at: float) -> t.Dict[str, t.Any]:
+        return {
+            "auth": {
+                "client_token": token,
+                "accessor": f"accessor-{token}",
+                "policies": ["default"],
+                "lease_duration": max(0, int(expires_at - time.time())),
+                "renewable": True,
+            }
+        }
+
+    def do_GET(self) -> None:
+        state = self.server.state
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            with state.lock:
+                self._send_json(200, {"counts": dict(state.counts), "tokens": len(state.tokens)})
+            return
+        time.sleep(state.latency)
+        location = _kv_path(url.path)
+        if location is None:
+            self._send_json(404, {"errors": []})
+            return
+        state.count("kv_read")
+        if not self._authorized():
+            return
+        with state.lock:
+            versions = state.kv.get(location, [])
+            requested = parse_qs(url.query).get("version", ["0"])[0]
+            number = int(requested) or len(versions)
+            if not 1 <= number <= len(versions):
+                self._send_json(404, {"errors": []})
+                return
+            version = versions[number - 1]
+        self._send_json(
+            200,
+            {
+                "request_id": secrets.token_hex(8),
+                "lease_id": "",
+                "renewable": False,
+                "lease_duration": 0,
+                "data": {
+                    "data": version["data"],
+                    "metadata": {
+                        "created_time": version["created_time"],
+                        "custom_metadata": None,
+                        "deletion_time": "",
+                        "destroyed": False,
+                        "version": number,
+                    },
+                },
+            },
+        )
+
+    def do_POST(self) -> None:
+        state = self.server.state
+        path = urlparse(self.path).path
+        if path == "/stats":
+            self._send_json(405, {"errors": []})
+            return
+        time.sleep(state.latency)
+        if path == "/v1/auth/approle/login":
+            state.count("login")
+            request = self._read_json()
+            if request.get("role_id") != state.role_id or request.get("secret_id") != state.secret_id:
+                self._send_json(400, {"errors": ["invalid role or secret ID"]})
+                return
+            token = f"hvs.{secrets.token_hex(12)}"
+            now = time.time()
+            expires_at = now + state.token_ttl
+            with state.lock:
+                state.tokens[token] = (expires_at, now + state.token_max_ttl)
+            self._send_json(200, self._auth(token, expires_at))
+            return
+        if path == "/v1/auth/token/renew-self":
+            state.count("renew")
+            token = self.headers.get("X-Vault-Token") or ""
+            if not self._authorized():
+                return
+            with state.lock:
+                _, max_expires_at = state.tokens[token]
+                expires_at = min(time.time() + state.token_ttl, max_expires_at)
+                state.tokens[token] = (expires_at, max_expires_at)
+            self._send_json(200, self._auth(token, expires_at))
+            return
+        location = _kv_path(path)
+        if location is not None:
+            state.count("kv_write")
+            if not self._authorized():
+                return
+            version = state.put(*location, self._read_json().get("data", {}))
+            self._send_json(200, {"data": {"version": version}})
+            return
+        self._send_json(404, {"errors": []})
+
+    do_PUT = do_POST
+
+
+class VaultStubServer(ThreadingHTTPServer):
+    def __init__(self, address: t.Tuple[str, int], state: VaultState) -> None:
+        super().__init__(address, VaultHandler)
+        self.state = state
+
+
+def serve(host: str, port: int, state: VaultState) -> VaultStubServer:
+    """Start the stub in a background thread and return the server."""
+    server = VaultStubServer((host, port), state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_secret(item: str) -> t.Tuple[str, str, t.Dict[str, t.Any]]:
+    """`mount/path={"key": "value"}` -> (mount, path, data)."""
+    location, _, data = item.partition("=")
+    mount, _, path = location.strip("/").partition("/")
+    return mount, path, json.loads(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory Vault stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--role-id", default="stub-role")
+    parser.add_argument("--secret-id", default="stub-secret")
+    parser.add_argument("--token-ttl", type=int, default=3600, help="Token lifetime")
+    parser.add_argument("--token-max-ttl", type=int, default=0, help="Renewal limit")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument(
+        "--secret",
+        action="append",
+        default=[],
+        help='Seed a secret as MOUNT/PATH=JSON, e.g. secret/openai={"api_key": "x"}',
+    )
+    args = parser.parse_args()
+    state = VaultState(args.role_id, args.secret_id, args.token_ttl, args.token_max_ttl, args.latency)
+    for item in args.secret:
+        state.put(*parse_secret(item))
+    server = VaultStubServer((args.host, args.port), state)
+    print(f"Vault stub listening on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,233 @@
+"""Local stand-in for the IBM Cloud IAM token endpoint and watsonx.ai chat API.
+
+Issues short-lived tokens so the watsonx client pool in
+custom_components/watsonx_comp.py can be exercised without IBM Cloud:
+
+    python scripts/watsonx_stub.py --port 8765 --token-ttl 30
+
+then set "IAM Token URL" on the component to
+http://127.0.0.1:8765/identity/token. Request counts are served on /stats.
+
+The chat endpoints (/ml/v1/text/chat and /ml/v1/text/chat_stream) reply with a
+fixed text, streamed word by word with configurable latencies. When a request
+binds tools and the last message is not a tool result, the reply is a native
+call of the first tool instead. scripts/bench_watsonx_stream.py drives them.
+"""
+
+import argparse
+import json
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Models listed by /ml/v1/foundation_model_specs, all with chat support
+STUB_MODELS = [
+    "ibm/granite-3-2-8b-instruct",
+    "ibm/granite-3-8b-instruct",
+    "meta-llama/llama-3-3-70b-instruct",
+    "meta-llama/llama-3-1-8b-instruct",
+    "mistralai/mistral-large",
+]
+
+
+class StubState:
+    def __init__(
+        self,
+        token_ttl: int,
+        reply: str = "The stub model has answered the question.",
+        first_token_latency: float = 0.0,
+        token_latency: float = 0.0,
+    ) -> None:
+        self.token_ttl = token_ttl
+        self.reply = reply
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.lock = threading.Lock()
+        self.counts: t.Dict[str, int] = {}
+        self.tokens = 0
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: t.Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send_event(self, index: int, payload: t.Any) -> None:
+        self.wfile.write(
+            f"id: {index}\nevent: message\ndata: {json.dumps(payload)}\n\n".encode()
+        )
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        state = self.server.state
+        path = urlparse(self.path).path
+        if path == "/stats":
+            with state.lock:
+                self._send_json(200, {"counts": dict(state.counts)})
+            return
+        if path.startswith("/v2/projects/"):
+            state.count("project")
+            self._send_json(
+                200,
+                {
+                    "metadata": {"guid": path.rsplit("/", 1)[-1]},
+                    "entity": {
+                        "storage": {"type": "bmcos_object_storage"},
+                        "compute": [
+                            {"type": "machine_learning", "guid": "stub", "name": "stub", "crn": "stub"}
+                        ],
+                    },
+                },
+            )
+            return
+        if path == "/ml/v1/foundation_model_specs":
+            state.count("model_specs")
+            resources = [
+                {"model_id": model_id, "functions": [{"id": "text_chat"}, {"id": "text_generation"}]}
+                for model_id in STUB_MODELS
+            ]
+            self._send_json(200, {"resources": resources, "total_count": len(resources)})
+            return
+        self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def _chat(self, stream: bool) -> None:
+        state = self.server.state
+        request = json.loads(self._read_body() or b"{}")
+        model_id = request.get("model_id", "unknown")
+        messages = request.get("messages", [])
+        tools = request.get("tools") or []
+        call_tool = bool(tools) and (not messages or messages[-1].get("role") != "tool")
+        state.count("chat_stream" if stream else "chat")
+        if call_tool:
+            state.count("tool_calls")
+
+        prompt = " ".join(str(message.get("content") or "") for message in messages)
+        base = {"id": f"chat-{time.time_ns()}", "model_id": model_id, "created": int(time.time())}
+        if call_tool:
+            function = tools[0]["function"]
+            arguments = {name: "stub" for name in function.get("parameters", {}).get("properties", {})}
+            tool_call = {
+                "id": f"call-{time.time_ns()}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": json.dumps(arguments)},
+            }
+            pieces: t.List[str] = []
+            finish_reason = "tool_calls"
+        else:
+            pieces = [word + " " for word in state.reply.split()]
+            pieces[-1] = pieces[-1].rstrip()
+            finish_reason = "stop"
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": max(1, len(pieces)),
+            "total_tokens": len(prompt.split()) + max(1, len(pieces)),
+        }
+
+        time.sleep(state.first_token_latency)
+        if not stream:
+            time.sleep(state.token_latency * max(0, len(pieces) - 1))
+            message: t.Dict[str, t.Any] = {"role": "assistant", "content": "".join(pieces)}
+            if call_tool:
+                message["tool_calls"] = [tool_call]
+            choice = {"index": 0, "message": message, "finish_reason": finish_reason}
+            self._send_json(200, {**base, "choices": [choice], "usage": usage})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        if call_tool:
+            delta = {"role": "assistant", "tool_calls": [{**tool_call, "index": 0}]}
+            self._send_event(0, {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(state.token_latency)
+            delta = {"role": "assistant", "content": piece}
+            self._send_event(index, {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        self._send_event(
+            len(pieces) + 1,
+            {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage},
+        )
+
+    def do_POST(self) -> None:
+        state = self.server.state
+        path = urlparse(self.path).path
+        if path in ("/ml/v1/text/chat", "/ml/v1/text/chat_stream"):
+            self._chat(stream=path.endswith("_stream"))
+            return
+        if path == "/identity/token":
+            state.count("iam_token")
+            form = parse_qs(self._read_body().decode())
+            if not form.get("apikey"):
+                self._send_json(400, {"errorMessage": "apikey is required"})
+                return
+            with state.lock:
+                state.tokens += 1
+                token = f"stub-token-{state.tokens}"
+            now = int(time.time())
+            self._send_json(
+                200,
+                {
+                    "access_token": token,
+                    "token_type": "Bearer",
+                    "expires_in": state.token_ttl,
+                    "expiration": now + state.token_ttl,
+                },
+            )
+            return
+        self._send_json(404, {"error": f"unknown path {self.path}"})
+
+
+class StubServer(ThreadingHTTPServer):
+    def __init__(self, address: t.Tuple[str, int], state: StubState) -> None:
+        super().__init__(address, StubHandler)
+        self.state = state
+
+
+def serve(host: str, port: int, token_ttl: int, **chat: t.Any) -> StubServer:
+    """Start the stub in a background thread and return the server.
+
+    `chat` is passed to StubState, e.g. `reply` or `first_token_latency`.
+    """
+    server = StubServer((host, port), StubState(token_ttl, **chat))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local watsonx IAM and chat stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-ttl", type=int, default=3600, help="Token lifetime")
+    parser.add_argument("--reply", default="The stub model has answered the question.")
+    parser.add_argument(
+        "--first-token-latency", type=float, default=0.0, help="Seconds before the first chunk"
+    )
+    parser.add_argument(
+        "--token-latency", type=float, default=0.0, help="Seconds between streamed chunks"
+    )
+    args = parser.parse_args()
+    server = StubServer(
+        (args.host, args.port),
+        StubState(args.token_ttl, args.reply, args.first_token_latency, args.token_latency),
+    )
+    print(f"watsonx stub listening on http://{args.host}:{args.port}")
+    server.serve_forever()